@@ -0,0 +1,188 @@
+"""Дополнительные мячи (мультимяч и режим хаоса) на массивах NumPy.
+
+Основной мяч игры остается объектом Ball: его запускает игрок, на него
+действуют SpeedController и бонусы. Все остальные мячи хранятся в
+BallArray подряд в массивах x, y, speed_x, speed_y и обновляются одним
+векторным шагом: движение, отскок от стен, отскок от ракетки с углом из
+Ball.check_collision и удар по первому пересеченному кирпичу через
+BrickGrid.first_collisions. В Python остается только вызов on_brick для
+мячей, которые попали по кирпичу в этом шаге. Отрисовка - один Surface.blits
+с готовым спрайтом.
+
+Правила совпадают с дискретным режимом Simulation (swept=False), но позиция
+хранится с дробной частью, а от стен мяч отражается только при движении
+наружу, поэтому не залипает в стене.
+
+Производительность (python benchmark.py suite --only balls_500): 500 мячей -
+update около 1 мс, draw около 2 мс на кадр при бюджете 16.7 мс.
+"""
+import math
+from typing import Callable, List, Optional
+import numpy as np
+import pygame
+from game_config import SCREEN_WIDTH, SCREEN_HEIGHT, WHITE
+from physics import round_like_rect
+
+BALL_SIZE = 15
+# Угол отклонения мячей, которые бонус отделяет от основного
+SPLIT_ANGLE = math.pi / 7
+
+
+class BallArray:
+    """Дополнительные мячи фиксированной емкости"""
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.speed_x = np.zeros(capacity, dtype=np.float64)
+        self.speed_y = np.zeros(capacity, dtype=np.float64)
+        self._sprite: Optional[pygame.Surface] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self) -> None:
+        """Удалить все мячи"""
+        self.count = 0
+
+    def snapshot(self) -> tuple:
+        """Копия живых мячей для Simulation.snapshot"""
+        n = self.count
+        if not n:
+            return (0,)
+        return (n, self.x[:n].copy(), self.y[:n].copy(),
+                self.speed_x[:n].copy(), self.speed_y[:n].copy())
+
+    def restore(self, state: tuple) -> None:
+        """Вернуть мячи из snapshot()"""
+        n = self.count = state[0]
+        if n:
+            self.x[:n], self.y[:n], self.speed_x[:n], self.speed_y[:n] = state[1:]
+
+    def spawn(self, x: float, y: float, speed_x: np.ndarray, speed_y: np.ndarray) -> int:
+        """Добавить мячи в точке с заданными скоростями; лишние отбрасываются"""
+        start = self.count
+        count = min(len(speed_x), self.capacity - start)
+        if count <= 0:
+            return 0
+        end = start + count
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.speed_x[start:end] = speed_x[:count]
+        self.speed_y[start:end] = speed_y[:count]
+        self.count = end
+        return count
+
+    def spawn_fan(self, x: float, y: float, speed: float, count: int) -> int:
+        """Выпустить веер мячей вверх в секторе +-60 градусов"""
+        if count <= 0:
+            return 0
+        angles = np.linspace(-math.pi / 3, math.pi / 3, count) if count > 1 else np.zeros(1)
+        return self.spawn(x, y, np.sin(angles) * speed, -np.cos(angles) * speed)
+
+    def split(self, ball) -> int:
+        """Два мяча из основного, с отклоненной на +-SPLIT_ANGLE скоростью"""
+        angles = np.array([-SPLIT_ANGLE, SPLIT_ANGLE])
+        cos, sin = np.cos(angles), np.sin(angles)
+        speed_x = ball.speed_x * cos - ball.speed_y * sin
+        speed_y = ball.speed_x * sin + ball.speed_y * cos
+        # Прилипший мяч еще стоит на ракетке - новые мячи сразу летят вверх
+        speed_y = -np.abs(speed_y) if ball.sticky else speed_y
+        return self.spawn(ball.x, ball.y, speed_x, speed_y)
+
+    def promote(self, ball) -> None:
+        """Сделать последний мяч массива основным (основной мяч потерян)"""
+        self.count -= 1
+        i = self.count
+        ball.x = float(self.x[i])
+        ball.y = float(self.y[i])
+        ball.rect.x = round_like_rect(ball.x)
+        ball.rect.y = round_like_rect(ball.y)
+        ball.speed_x = float(self.speed_x[i])
+        ball.speed_y = float(self.speed_y[i])
+        ball.active = True
+        ball.sticky = False
+
+    def update(self, paddle, brick_grid, dt: float = 1.0,
+               on_brick: Optional[Callable] = None) -> None:
+        """Продвинуть все мячи на dt кадров и обработать столкновения"""
+        n = self.count
+        if n == 0:
+            return
+        x, y = self.x[:n], self.y[:n]
+        speed_x, speed_y = self.speed_x[:n], self.speed_y[:n]
+        x += speed_x * dt
+        y += speed_y * dt
+
+        # Отскок от стен
+        wall = x <= 0
+        speed_x[wall] = np.abs(speed_x[wall])
+        wall = x + BALL_SIZE >= SCREEN_WIDTH
+        speed_x[wall] = -np.abs(speed_x[wall])
+        wall = y <= 0
+        speed_y[wall] = np.abs(speed_y[wall])
+
+        # Отскок от ракетки (Ball.check_collision)
+        left = np.floor(x + 0.5).astype(np.int64)
+        top = np.floor(y + 0.5).astype(np.int64)
+        rect = paddle.rect
+        hit = ((left < rect.right) & (left + BALL_SIZE > rect.left) &
+               (top < rect.bottom) & (top + BALL_SIZE > rect.top) & (speed_y > 0))
+        if hit.any():
+            relative = rect.centerx - (left[hit] + BALL_SIZE // 2)
+            bounce_angle = relative / (rect.width / 2) * (math.pi / 3)
+            speed_x[hit] = np.clip(-np.sin(bounce_angle) * 7, -10, 10)
+            speed_y[hit] = -np.abs(speed_y[hit])
+
+        # Удар по первому пересеченному кирпичу и отскок
+        hits = brick_grid.first_collisions(left, top, BALL_SIZE, BALL_SIZE)
+        hit = hits >= 0
+        if hit.any():
+            speed_y[hit] *= -1
+            if on_brick is not None:
+                bricks = brick_grid.packed_bricks
+                for index in hits[hit].tolist():
+                    brick = bricks[index]
+                    # Кирпич мог разрушить другой мяч в этом же шаге
+                    if brick in brick_grid:
+                        on_brick(brick)
+
+        # Мячи, ушедшие за нижнюю границу
+        alive = top <= SCREEN_HEIGHT
+        live_count = int(np.count_nonzero(alive))
+        if live_count != n:
+            for array in (self.x, self.y, self.speed_x, self.speed_y):
+                array[:live_count] = array[:n][alive]
+            self.count = live_count
+
+    def _ball_sprite(self) -> pygame.Surface:
+        """Спрайт мяча, как его рисует Ball.draw"""
+        if self._sprite is None:
+            sprite = pygame.Surface((BALL_SIZE, BALL_SIZE))
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert()
+            colorkey = (255, 0, 255)
+            sprite.fill(colorkey)
+            rect = sprite.get_rect()
+            pygame.draw.ellipse(sprite, WHITE, rect)
+            pygame.draw.ellipse(sprite, WHITE, rect, 2)
+            sprite.set_colorkey(colorkey, pygame.RLEACCEL)
+            self._sprite = sprite
+        return self._sprite
+
+    def draw(self, screen: pygame.Surface,
+             collect_rects: bool = False) -> Optional[List[pygame.Rect]]:
+        """Отрисовать все мячи одним пакетным вызовом.
+
+        С collect_rects=True возвращает прямоугольники нарисованных мячей.
+        """
+        n = self.count
+        if n == 0:
+            return [] if collect_rects else None
+        sprite = self._ball_sprite()
+        px = np.floor(self.x[:n] + 0.5).astype(np.int64).tolist()
+        py = np.floor(self.y[:n] + 0.5).astype(np.int64).tolist()
+        return screen.blits([(sprite, position) for position in zip(px, py)],
+                            doreturn=collect_rects)
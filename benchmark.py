@@ -0,0 +1,713 @@
+"""Замеры производительности игры.
+
+Запуск: python benchmark.py <сценарий> [параметры]
+"""
+import argparse
+import random
+import time
+from typing import Optional
+from simulation import Simulation, autopilot_input
+from game_config import FPS
+from quality import LEVEL_NAMES as QUALITY_LEVELS
+
+
+def bench_headless(args: argparse.Namespace) -> None:
+    """Шаги безголовой симуляции в секунду"""
+    sim = Simulation(args.difficulty, args.ball_speed)
+    steps = 0
+    start = time.perf_counter()
+    while steps < args.steps:
+        if sim.game_over:
+            sim.reset()
+        sim.step(autopilot_input(sim))
+        steps += 1
+    elapsed = time.perf_counter() - start
+    print(f"headless: {steps} шагов за {elapsed:.2f} с, "
+          f"{steps / elapsed:,.0f} шагов/с")
+
+
+def bench_batch(args: argparse.Namespace) -> None:
+    """Пакетная симуляция тысяч игр"""
+    from batch_sim import BatchSimulation
+
+    batch = BatchSimulation(args.envs, args.difficulty, seed=0)
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        batch.step(batch.autopilot_actions())
+        if batch.done.any():
+            batch.reset(batch.done)
+    elapsed = time.perf_counter() - start
+    frames = args.envs * args.steps
+    print(f"batch: {args.envs} игр x {args.steps} шагов за {elapsed:.2f} с, "
+          f"{args.steps / elapsed:,.0f} пакетных шагов/с, "
+          f"{frames / elapsed:,.0f} кадров/с "
+          f"({frames / elapsed / FPS:,.0f}x реального времени)")
+
+    mismatch = _batch_parity(args.parity, args.difficulty)
+    if mismatch is None:
+        print(f"совпадение с Simulation(swept=False): {args.parity} кадров")
+    else:
+        print(f"РАСХОЖДЕНИЕ с Simulation(swept=False) на кадре {mismatch[0]}: "
+              f"Simulation {mismatch[1]}, пакет {mismatch[2]}")
+
+
+def _batch_parity(frames: int, difficulty: str, seed: int = 0) -> Optional[tuple]:
+    """Одна игра пакета против Simulation(swept=False) на одинаковом вводе.
+
+    Возвращает (кадр, состояние Simulation, состояние пакета) при первом
+    расхождении мяча, ракетки или счета, иначе None. Пакет не моделирует
+    падающие бонусы, поэтому в Simulation они убираются, а направление
+    мяча после запуска берется из Simulation: генераторы у них разные.
+    """
+    import numpy as np
+    from batch_sim import BatchSimulation
+
+    sim = Simulation(seed=seed, difficulty=difficulty, swept=False)
+    batch = BatchSimulation(1, difficulty, seed=seed)
+    for frame in range(frames):
+        if sim.game_over:
+            break
+        inputs = autopilot_input(sim)
+        launched = sim.ball.sticky
+        sim.step(inputs)
+        sim.power_ups.clear()
+        batch.step(np.array([int(inputs.right) - int(inputs.left)]))
+        if launched:
+            ball = sim.ball
+            batch.ball_x[0], batch.ball_y[0] = ball.x, ball.y
+            batch.speed_x[0], batch.speed_y[0] = ball.speed_x, ball.speed_y
+        ball_x, ball_y = batch._ball_rect()
+        expected = (sim.ball.rect.x, sim.ball.rect.y, sim.paddle.rect.x, sim.paddle.score)
+        actual = (int(ball_x[0]), int(ball_y[0]), int(batch.paddle_x[0]), int(batch.score[0]))
+        if expected != actual:
+            return frame, expected, actual
+    return None
+
+
+def bench_collisions(args: argparse.Namespace) -> None:
+    """Стоимость поиска столкновения мяча: перебор списка против сетки"""
+    import pygame
+    from game_objects import Brick
+    from spatial_grid import BrickGrid
+
+    rng = random.Random(0)
+    for count in args.counts:
+        cols = max(10, int(count ** 0.5))
+        rows = (count + cols - 1) // cols
+        bricks = [Brick(i % cols * 80 + 15, i // cols * 40 + 50, (255, 0, 0))
+                  for i in range(count)]
+        grid = BrickGrid(80, 40, origin=(15, 50))
+        for brick in bricks:
+            grid.insert(brick)
+        balls = [pygame.Rect(rng.randrange(cols * 80), rng.randrange(rows * 40 + 50), 15, 15)
+                 for _ in range(args.queries)]
+
+        # Так работала исходная проверка в Game.update: копия списка и перебор
+        start = time.perf_counter()
+        for ball in balls:
+            for brick in bricks[:]:
+                if ball.colliderect(brick.rect):
+                    break
+        linear = (time.perf_counter() - start) / len(balls)
+
+        start = time.perf_counter()
+        for ball in balls:
+            grid.first_collision(ball)
+        indexed = (time.perf_counter() - start) / len(balls)
+
+        print(f"{count:>6} кирпичей: перебор {linear * 1e6:9.2f} мкс, "
+              f"сетка {indexed * 1e6:6.2f} мкс на проверку")
+
+
+def bench_effects(args: argparse.Namespace) -> None:
+    """Окончание временных эффектов: куча против обхода всех активных"""
+    from effects import EffectScheduler
+
+    for count in args.counts:
+        rng = random.Random(0)
+        durations = [rng.randint(60, 1800) for _ in range(count)]
+
+        # Обход: у каждого эффекта счетчик оставшихся кадров
+        timers = [[duration] for duration in durations]
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            expired = 0
+            for timer in timers:
+                timer[0] -= 1
+                if timer[0] == 0:
+                    expired += 1
+                    timer[0] = 1800
+        polled = (time.perf_counter() - start) / args.frames
+
+        scheduler = EffectScheduler()
+
+        def renew(duration: int = 1800) -> None:
+            scheduler.add("effect", duration, renew)
+
+        for duration in durations:
+            scheduler.add("effect", duration, renew)
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            scheduler.advance()
+        heap = (time.perf_counter() - start) / args.frames
+
+        print(f"{count:>7} эффектов: обход {polled * 1e6:9.1f} мкс, "
+              f"куча {heap * 1e6:6.1f} мкс на кадр "
+              f"({scheduler.expired / args.frames:.1f} истекает за кадр)")
+
+
+def bench_snapshot(args: argparse.Namespace) -> None:
+    """Снимок и восстановление состояния против copy.deepcopy"""
+    import copy
+    from simulation import FrameInput
+
+    sim = Simulation(seed=0, chaos_balls=args.chaos)
+    for _ in range(args.warmup):
+        sim.step(autopilot_input(sim))
+
+    def timed(action, count: int) -> float:
+        start = time.perf_counter()
+        for _ in range(count):
+            action()
+        return (time.perf_counter() - start) / count * 1e6
+
+    deep = timed(lambda: copy.deepcopy(sim), 20)
+    snapshot = sim.snapshot()
+    print(f"кадр {sim.frame}, кирпичей {len(sim.bricks)}, мячей {len(sim.balls) + 1}, "
+          f"частиц {len(sim.particles)}")
+    print(f"copy.deepcopy:        {deep:9.1f} мкс")
+    print(f"snapshot:             {timed(sim.snapshot, args.count):9.1f} мкс")
+    print(f"restore:              {timed(lambda: sim.restore(snapshot), args.count):9.1f} мкс")
+    with_particles = sim.snapshot(particles=True)
+    print(f"snapshot(particles):  "
+          f"{timed(lambda: sim.snapshot(particles=True), args.count):9.1f} мкс")
+    print(f"restore(particles):   "
+          f"{timed(lambda: sim.restore(with_particles), args.count):9.1f} мкс")
+
+    # Перебор ходов: из одного снимка разыгрываются варианты по depth шагов
+    rng = random.Random(0)
+    actions = [FrameInput(left=True), FrameInput(right=True), FrameInput()]
+    start = time.perf_counter()
+    for _ in range(args.rollouts):
+        sim.restore(snapshot)
+        action = rng.choice(actions)
+        for _ in range(args.depth):
+            sim.step(action)
+    elapsed = time.perf_counter() - start
+    sim.restore(snapshot)
+    print(f"перебор: {args.rollouts / elapsed:,.0f} вариантов по {args.depth} шагов в секунду")
+
+
+def _init_dummy_display():
+    """Окно в фиктивном видеодрайвере SDL для замеров отрисовки"""
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from game_config import SCREEN_WIDTH, SCREEN_HEIGHT
+    pygame.init()
+    return pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+
+def bench_particles(args: argparse.Namespace) -> None:
+    """Обновление и отрисовка большого числа живых частиц"""
+    import numpy as np
+    from particles import ParticleSystem
+
+    screen = _init_dummy_display()
+    system = ParticleSystem(capacity=args.count * 2, rng=np.random.default_rng(0))
+    rng = random.Random(0)
+    update_time = draw_time = 0.0
+    for _ in range(args.frames):
+        # Досыпаем частицы, чтобы живых оставалось около заданного числа
+        while len(system) < args.count:
+            system.spawn(rng.randrange(800), rng.randrange(600), (255, 165, 0), 15)
+        start = time.perf_counter()
+        system.update()
+        update_time += time.perf_counter() - start
+        start = time.perf_counter()
+        system.draw(screen)
+        draw_time += time.perf_counter() - start
+    update_ms = update_time / args.frames * 1000
+    draw_ms = draw_time / args.frames * 1000
+    print(f"particles: {args.count} живых, update {update_ms:.2f} мс, "
+          f"draw {draw_ms:.2f} мс, всего {update_ms + draw_ms:.2f} мс на кадр")
+
+
+def bench_render(args: argparse.Namespace) -> None:
+    """Полная перерисовка кадра против обновления измененных областей"""
+    import numpy as np
+    from game_config import SCREEN_WIDTH, SCREEN_HEIGHT
+    from game import Game
+
+    _init_dummy_display()
+    for mode in ("full", "dirty"):
+        random.seed(0)
+        game = Game(render_mode=mode)
+        game.reset_game()
+        game.sim.particles.rng = np.random.default_rng(0)
+        draw_time = 0.0
+        for _ in range(args.frames):
+            game.sim.step(autopilot_input(game.sim))
+            start = time.perf_counter()
+            game.draw()
+            draw_time += time.perf_counter() - start
+        if game.renderer is not None:
+            pixels = game.renderer.stats()["avg_pixels"]
+        else:
+            pixels = SCREEN_WIDTH * SCREEN_HEIGHT
+        print(f"{mode:>5}: {pixels:>9,.0f} пикселей на кадр, "
+              f"draw {draw_time / args.frames * 1000:.3f} мс")
+
+
+def bench_level(args: argparse.Namespace) -> None:
+    """Кадр смены уровня: построение в кадре против подготовки в потоке"""
+    import os
+    import tempfile
+    from game import Game
+    from level_pack import LevelPack, encode_pack
+    from prebuild import LevelPrebuilder
+
+    _init_dummy_display()
+    palette = [(255, 0, 0), (0, 200, 0), (0, 0, 255), (255, 200, 0)]
+    levels = [{"name": f"level {n}", "step": (20, 10), "origin": (1, 40), "brick": (18, 8),
+               "chance": 0.2, "power_ups": ["expand"],
+               "rows": [[(1 + (row + n) % 3) << 4 | (row + col) % 4 for col in range(args.cols)]
+                        for row in range(args.rows)]}
+              for n in range(4)]
+    fd, path = tempfile.mkstemp(suffix=".arkl")
+    with os.fdopen(fd, "wb") as f:
+        f.write(encode_pack(palette, levels))
+    try:
+        for mode in ("in_frame", "prebuilt"):
+            random.seed(0)
+            pack = LevelPack(path)
+            game = Game(render_mode="dirty", seed=0, level_pack=pack)
+            if mode == "in_frame":
+                game.prebuilder.close()
+                game.prebuilder = LevelPrebuilder()
+                game.sim.level_source = None
+            update_times, draw_times = [], []
+            for _ in range(args.transitions):
+                game.draw()
+                pending = game.prebuilder._pending
+                if pending is not None:
+                    # Уровень успевает подготовиться, пока игрок проходит текущий
+                    pending[1].result()
+                for brick in list(game.sim.bricks):
+                    game.sim.remove_brick(brick)
+                start = time.perf_counter()
+                game.sim.step(autopilot_input(game.sim))
+                middle = time.perf_counter()
+                game.draw()
+                end = time.perf_counter()
+                update_times.append((middle - start) * 1000)
+                draw_times.append((end - middle) * 1000)
+            frame = [u + d for u, d in zip(update_times, draw_times)]
+            print(f"{mode:>9}: {len(game.sim.bricks)} кирпичей, update "
+                  f"{sum(update_times) / len(frame):.2f} мс, draw "
+                  f"{sum(draw_times) / len(frame):.2f} мс, кадр смены в среднем "
+                  f"{sum(frame) / len(frame):.2f} мс, худший {max(frame):.2f} мс "
+                  f"{game.prebuilder.stats()}")
+            game.prebuilder.close()
+            pack.close()
+    finally:
+        os.remove(path)
+
+
+def bench_latency(args: argparse.Namespace) -> None:
+    """Задержка от опроса ввода до вывода: обычный цикл против режима низкой задержки"""
+    from game import Game
+
+    _init_dummy_display()
+    modes = [("обычный", False, FPS), ("низкая задержка", True, FPS),
+             (f"низкая задержка, {args.physics_hz} Гц", True, args.physics_hz)]
+    for name, low_latency, physics_hz in modes:
+        random.seed(0)
+        game = Game(seed=0, physics_hz=physics_hz, low_latency=low_latency)
+        game.input_source = lambda: autopilot_input(game.sim)
+        intervals = []
+        elapsed = 0.0
+        previous = time.perf_counter()
+        for _ in range(args.frames):
+            if game.game_state != "playing":
+                game.reset_game()
+            elapsed = game.run_frame(elapsed)
+            now = time.perf_counter()
+            intervals.append((now - previous) * 1000)
+            previous = now
+        age = game.latency.age.summary()
+        worst = game.latency.worst.summary()
+        mean = sum(intervals) / len(intervals)
+        jitter = (sum((x - mean) ** 2 for x in intervals) / len(intervals)) ** 0.5
+        print(f"{name}: опрос -> вывод p50 {age['p50']:.2f} / p99 {age['p99']:.2f} мс, "
+              f"худший случай p50 {worst['p50']:.2f} / p99 {worst['p99']:.2f} мс, "
+              f"период кадра {mean:.2f} ± {jitter:.2f} мс")
+        if args.histogram:
+            print("\n".join(game.latency.report()))
+        game.prebuilder.close()
+
+
+def bench_leaderboard(args: argparse.Namespace) -> None:
+    """Сохранение итога игры: запись в кадре против фонового писателя"""
+    import os
+    import shutil
+    import tempfile
+    from stats import summarize
+    from game import Game
+    from leaderboard import GameRecord, Leaderboard, connect
+
+    _init_dummy_display()
+    directory = tempfile.mkdtemp()
+    record = GameRecord(12345, 3, "normal", "medium", 5000, 120, 1, time.time())
+
+    # Прямая запись: то, что стоило бы сохранение в игровом цикле
+    conn = connect(os.path.join(directory, "sync.db"))
+    conn.execute("PRAGMA synchronous=FULL")
+    times = []
+    for _ in range(args.records):
+        start = time.perf_counter()
+        with conn:
+            conn.execute("INSERT INTO games (session_id, finished_at, score, level, difficulty, "
+                         "ball_speed, frames, bricks, seed) VALUES (0, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (record.finished_at, record.score, record.level, record.difficulty,
+                          record.ball_speed, record.frames, record.bricks, record.seed))
+        times.append((time.perf_counter() - start) * 1000)
+    conn.close()
+    s = summarize(times)
+    print(f"запись в кадре: p50 {s['p50']:.3f} мс, p99 {s['p99']:.3f} мс на игру")
+
+    leaderboard = Leaderboard(os.path.join(directory, "async.db"), flush_delay=0.05)
+    times = []
+    for _ in range(args.records):
+        start = time.perf_counter()
+        leaderboard.submit(record)
+        times.append((time.perf_counter() - start) * 1000)
+    s = summarize(times)
+    print(f"очередь писателя: p50 {s['p50'] * 1000:.1f} мкс, p99 {s['p99'] * 1000:.1f} мкс на игру")
+
+    # Время кадра игры, пока писатель пишет пачки в фоне, и без него
+    for busy in (False, True):
+        random.seed(0)
+        game = Game(seed=0)
+        game.input_source = lambda: autopilot_input(game.sim)
+        frames = []
+        for frame in range(args.frames):
+            if busy and frame % 10 == 0:
+                leaderboard.submit(record)
+            game.sim.paddle.lives = 3
+            start = time.perf_counter()
+            game.update()
+            game.draw()
+            frames.append((time.perf_counter() - start) * 1000)
+        s = summarize(frames)
+        label = "с записью каждые 10 кадров" if busy else "без записи"
+        print(f"кадр игры {label}: p50 {s['p50']:.3f} мс, p99 {s['p99']:.3f} мс")
+        game.prebuilder.close()
+    leaderboard.close()
+    print(leaderboard.stats())
+    shutil.rmtree(directory)
+
+
+def bench_idle(args: argparse.Namespace) -> None:
+    """Нагрузка процессора на неподвижных экранах: главное меню и конец игры"""
+    import sys
+    import pygame
+    from game import Game
+
+    real_flip, real_update = pygame.display.flip, pygame.display.update
+    for screen in ("menu", "game_over"):
+        _init_dummy_display()
+        game = Game(scores_path=None)
+        # Game.quit закрыл бы pygame, а шрифты в text_cache переживают оба замера
+        game.quit = sys.exit
+        # Выводы кадра считаются по вызовам flip и update
+        frames = [0]
+
+        def flip(*flip_args):
+            frames[0] += 1
+            return real_flip(*flip_args)
+
+        def update(*update_args):
+            frames[0] += 1
+            return real_update(*update_args)
+
+        pygame.display.flip, pygame.display.update = flip, update
+        # Замер заканчивается событием QUIT, как при закрытии окна
+        pygame.time.set_timer(pygame.QUIT, int(args.seconds * 1000), loops=1)
+        start_cpu, start = time.process_time(), time.perf_counter()
+        try:
+            if screen == "menu":
+                game.show_main_menu()
+            else:
+                game.game_state = "game_over"
+                while True:
+                    game.run_frame(0.0)
+        except SystemExit:
+            pass
+        finally:
+            pygame.display.flip, pygame.display.update = real_flip, real_update
+            game.prebuilder.close()
+        cpu, wall = time.process_time() - start_cpu, time.perf_counter() - start
+        print(f"{screen:>9}: процессор {cpu:.2f} с за {wall:.1f} с = {cpu / wall:.1%} ядра, "
+              f"выводов кадра {frames[0] / wall:.1f}/с")
+
+
+def bench_timestep(args: argparse.Namespace) -> None:
+    """Дискретная и непрерывная физика при крупном шаге"""
+    for swept in (False, True):
+        for dt in args.dts:
+            random.seed(0)
+            sim = Simulation(swept=swept)
+            frames = steps = inside = 0
+            start = time.perf_counter()
+            while frames < args.frames:
+                if sim.game_over:
+                    sim.reset()
+                sim.step(autopilot_input(sim), dt)
+                frames += dt
+                steps += 1
+                # Мяч внутри кирпича означает пропущенное столкновение
+                if sim.ball.active and sim.brick_grid.first_collision(sim.ball.rect):
+                    inside += 1
+            elapsed = time.perf_counter() - start
+            mode = "swept" if swept else "discrete"
+            print(f"{mode:>8} dt={dt}: {frames / elapsed:>9,.0f} игровых кадров/с, "
+                  f"мяч внутри кирпича в {inside} шагах, счет {sim.paddle.score}")
+
+
+def bench_env(args: argparse.Namespace) -> None:
+    """Шаги среды для агентов в секунду: вектор состояния и пиксели"""
+    from env import VectorEnv
+
+    for observation in args.observations:
+        envs = VectorEnv(args.envs, observation, seed=0, frame_skip=args.frame_skip,
+                         downsample=args.downsample)
+        envs.reset()
+        actions = [0] * args.envs
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            # Действия автопилота: запустить мяч и держать ракетку под ним
+            for i, env in enumerate(envs.envs):
+                sim = env.game.sim
+                inputs = autopilot_input(sim)
+                actions[i] = 3 if inputs.launch else 1 if inputs.left else 2 if inputs.right else 0
+            observations, *_ = envs.step(actions)
+        elapsed = time.perf_counter() - start
+        envs.close()
+        steps = args.envs * args.steps
+        print(f"{observation:>6}: наблюдение {observations.shape} {observations.dtype}, "
+              f"{steps / elapsed:,.0f} шагов среды/с, "
+              f"{steps * args.frame_skip / elapsed:,.0f} игровых кадров/с")
+
+
+def bench_sprites(args: argparse.Namespace) -> None:
+    """Методы draw объектов против атласа спрайтов: вызовы и время кадра"""
+    from itertools import chain
+    import pygame
+    from frame_bench import Scenario, ScenarioDriver
+    from game import Game
+
+    _init_dummy_display()
+    calls = [0]
+
+    class CountingSurface(pygame.Surface):
+        """Экран, который считает вызовы отрисовки"""
+
+        def blit(self, *a, **k):
+            calls[0] += 1
+            return super().blit(*a, **k)
+
+        def blits(self, *a, **k):
+            calls[0] += 1
+            return super().blits(*a, **k)
+
+    # Вызовы pygame.draw считаются обертками на время замера
+    originals = {name: getattr(pygame.draw, name) for name in ("rect", "line", "ellipse")}
+
+    def counted(function):
+        def wrapper(*a, **k):
+            calls[0] += 1
+            return function(*a, **k)
+        return wrapper
+
+    screen = CountingSurface(pygame.display.get_surface().get_size())
+    scenarios = [Scenario("baseline"), Scenario("power_ups_50", power_ups=50),
+                 Scenario("bricks_2000", bricks=2000)]
+    for scenario in scenarios:
+        random.seed(0)
+        game = Game(seed=0)
+        driver = ScenarioDriver(game, scenario)
+        driver.before_frame()
+        sim = game.sim
+        # Часть кирпичей повреждена, чтобы рисовались и трещины
+        for brick in list(sim.bricks)[::3]:
+            brick.health = max(1, brick.max_health - 1)
+            brick.max_health = brick.health + 1
+
+        def immediate() -> None:
+            for obj in chain((sim.paddle, sim.ball), sim.bricks, sim.power_ups):
+                obj.draw(screen)
+
+        def atlas() -> None:
+            game.sprites.draw(screen, chain((sim.paddle, sim.ball), sim.bricks, sim.power_ups))
+
+        results = []
+        for draw in (immediate, atlas):
+            # Первый кадр дорисовывает в атлас новые виды кирпичей
+            draw()
+            for name, function in originals.items():
+                setattr(pygame.draw, name, counted(function))
+            calls[0] = 0
+            draw()
+            frame_calls = calls[0]
+            for name, function in originals.items():
+                setattr(pygame.draw, name, function)
+            start = time.perf_counter()
+            for _ in range(args.frames):
+                draw()
+            results.append((frame_calls, (time.perf_counter() - start) / args.frames * 1000))
+        (old_calls, old_ms), (new_calls, new_ms) = results
+        print(f"{scenario.name:>13}: draw {old_calls:>5} вызовов {old_ms:6.3f} мс -> "
+              f"атлас {new_calls} {new_ms:6.3f} мс ({old_ms / new_ms:.1f}x)")
+
+
+def bench_suite(args: argparse.Namespace) -> None:
+    """Набор сценариев времени кадра с отчетом в JSON"""
+    import frame_bench
+    from frame_bench import Scenario
+
+    if args.custom:
+        scenarios = [Scenario("custom", bricks=args.bricks, power_ups=args.power_ups,
+                              particles=args.particles, balls=args.balls,
+                              sticky=args.sticky, game_over=args.game_over)]
+    else:
+        scenarios = [s for s in frame_bench.DEFAULT_SCENARIOS
+                     if not args.only or s.name in args.only]
+    report = frame_bench.run_suite(scenarios, args.frames, args.renderer, args.quality)
+    frame_bench.print_report(report)
+    if args.out:
+        frame_bench.save_report(report, args.out)
+        print(f"отчет сохранен в {args.out}")
+
+
+def bench_diff(args: argparse.Namespace) -> None:
+    """Сравнение двух отчетов набора сценариев"""
+    import frame_bench
+    frame_bench.diff_reports(args.old, args.new, args.threshold)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Замеры производительности арканоида")
+    sub = parser.add_subparsers(dest="scenario", required=True)
+
+    headless = sub.add_parser("headless", help="скорость безголовой симуляции")
+    headless.add_argument("--steps", type=int, default=100_000)
+    headless.add_argument("--difficulty", default="normal")
+    headless.add_argument("--ball-speed", default="medium")
+    headless.set_defaults(func=bench_headless)
+
+    batch = sub.add_parser("batch", help="векторизованная пакетная симуляция")
+    batch.add_argument("--envs", type=int, default=10_000)
+    batch.add_argument("--steps", type=int, default=1_000)
+    batch.add_argument("--difficulty", default="normal")
+    batch.add_argument("--parity", type=int, default=5_000,
+                       help="кадров сверки одной игры с Simulation(swept=False)")
+    batch.set_defaults(func=bench_batch)
+
+    collisions = sub.add_parser("collisions", help="поиск столкновений с кирпичами")
+    collisions.add_argument("--counts", type=int, nargs="+",
+                            default=[60, 500, 2_000, 10_000, 40_000])
+    collisions.add_argument("--queries", type=int, default=2_000)
+    collisions.set_defaults(func=bench_collisions)
+
+    effects = sub.add_parser("effects", help="планировщик временных эффектов")
+    effects.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1_000, 10_000])
+    effects.add_argument("--frames", type=int, default=600)
+    effects.set_defaults(func=bench_effects)
+
+    snapshot = sub.add_parser("snapshot", help="снимок состояния против copy.deepcopy")
+    snapshot.add_argument("--warmup", type=int, default=600)
+    snapshot.add_argument("--chaos", type=int, default=0)
+    snapshot.add_argument("--count", type=int, default=20_000)
+    snapshot.add_argument("--rollouts", type=int, default=2_000)
+    snapshot.add_argument("--depth", type=int, default=30)
+    snapshot.set_defaults(func=bench_snapshot)
+
+    particles = sub.add_parser("particles", help="система частиц под нагрузкой")
+    particles.add_argument("--count", type=int, default=50_000)
+    particles.add_argument("--frames", type=int, default=120)
+    particles.set_defaults(func=bench_particles)
+
+    render = sub.add_parser("render", help="полная перерисовка против грязных прямоугольников")
+    render.add_argument("--frames", type=int, default=3_000)
+    render.set_defaults(func=bench_render)
+
+    level = sub.add_parser("level", help="кадр смены уровня: в кадре против фонового потока")
+    level.add_argument("--cols", type=int, default=40)
+    level.add_argument("--rows", type=int, default=30)
+    level.add_argument("--transitions", type=int, default=20)
+    level.set_defaults(func=bench_level)
+
+    latency = sub.add_parser("latency", help="задержка ввода: обычный цикл против --low-latency")
+    latency.add_argument("--frames", type=int, default=600)
+    latency.add_argument("--physics-hz", type=int, default=240)
+    latency.add_argument("--histogram", action="store_true", help="напечатать гистограммы")
+    latency.set_defaults(func=bench_latency)
+
+    scores = sub.add_parser("leaderboard", help="сохранение рекордов: в кадре против фонового потока")
+    scores.add_argument("--records", type=int, default=200)
+    scores.add_argument("--frames", type=int, default=600)
+    scores.set_defaults(func=bench_leaderboard)
+
+    idle = sub.add_parser("idle", help="нагрузка процессора в меню и на экране конца игры")
+    idle.add_argument("--seconds", type=float, default=10.0)
+    idle.set_defaults(func=bench_idle)
+
+    timestep = sub.add_parser("timestep", help="физика с крупным шагом")
+    timestep.add_argument("--frames", type=int, default=20_000)
+    timestep.add_argument("--dts", type=int, nargs="+", default=[1, 3, 6])
+    timestep.set_defaults(func=bench_timestep)
+
+    env = sub.add_parser("env", help="среда для агентов: state против pixels")
+    env.add_argument("--envs", type=int, default=8)
+    env.add_argument("--steps", type=int, default=1_000)
+    env.add_argument("--frame-skip", type=int, default=4)
+    env.add_argument("--downsample", type=int, default=1)
+    env.add_argument("--observations", nargs="+", choices=["state", "pixels"],
+                     default=["state", "pixels"])
+    env.set_defaults(func=bench_env)
+
+    sprites = sub.add_parser("sprites", help="методы draw объектов против атласа спрайтов")
+    sprites.add_argument("--frames", type=int, default=300)
+    sprites.set_defaults(func=bench_sprites)
+
+    suite = sub.add_parser("suite", help="время кадра update/draw по сценариям нагрузки")
+    suite.add_argument("--frames", type=int, default=600)
+    suite.add_argument("--renderer", choices=["full", "dirty"], default="full")
+    suite.add_argument("--quality", choices=QUALITY_LEVELS, default="high",
+                       help="фиксированный уровень качества эффектов")
+    suite.add_argument("--out", help="сохранить отчет в JSON")
+    suite.add_argument("--only", nargs="+", help="запустить только указанные сценарии")
+    suite.add_argument("--custom", action="store_true",
+                       help="один сценарий из параметров ниже")
+    suite.add_argument("--bricks", type=int, default=60)
+    suite.add_argument("--power-ups", type=int, default=0)
+    suite.add_argument("--particles", type=int, default=0)
+    suite.add_argument("--balls", type=int, default=0)
+    suite.add_argument("--sticky", action="store_true")
+    suite.add_argument("--game-over", action="store_true")
+    suite.set_defaults(func=bench_suite)
+
+    diff = sub.add_parser("diff", help="сравнить два JSON-отчета набора")
+    diff.add_argument("old")
+    diff.add_argument("new")
+    diff.add_argument("--threshold", type=float, default=10.0,
+                      help="порог замедления в процентах для пометки")
+    diff.set_defaults(func=bench_diff)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Запись кадров игры в фоновом потоке без остановки игрового цикла.
+
+После вывода кадра на экран FrameCapture.capture копирует пиксели экрана в
+свободный буфер из заранее выделенного кольца (одно копирование памяти,
+около 0.3 мс для 800x600) и передает его потоку записи. Поток переводит
+кадр в RGB, сразу возвращает буфер в кольцо и пишет кадр на диск:
+
+    raw - все кадры подряд в frames.rgb (rgb24), например для
+          ffmpeg -f rawvideo -pixel_format rgb24 -video_size 800x600
+                 -framerate 60 -i frames.rgb capture.mp4
+    png - отдельные файлы frame_00000.png, ...
+
+PNG кодируется здесь же через zlib: pygame.image.save держит GIL все время
+кодирования (десятки миллисекунд на кадр) и останавливал бы игру, а
+zlib.compress GIL отпускает.
+
+Если диск не успевает и свободных буферов нет, игровой цикл не ждет:
+    drop     - кадр пропускается;
+    throttle - кадр пропускается, а запись переходит на каждый второй,
+               четвертый... кадр и возвращается к полной частоте, когда
+               очередь RECOVER_FRAMES кадров подряд не переполнялась.
+
+Счетчики (stats): записано, потеряно при переполнении, пропущено из-за
+прореживания. По окончании записи рядом сохраняется capture.json с
+размером кадра, частотой и счетчиками.
+"""
+import json
+import os
+import queue
+import struct
+import threading
+import zlib
+from typing import Dict, List
+import numpy as np
+import pygame
+from game_config import FPS
+
+FORMATS = ("raw", "png")
+POLICIES = ("drop", "throttle")
+# Самое редкое прореживание при throttle: каждый MAX_STRIDE-й кадр
+MAX_STRIDE = 8
+# Сколько кадров без переполнения нужно, чтобы удвоить частоту записи
+RECOVER_FRAMES = 120
+
+
+def encode_png(rgb: np.ndarray, level: int = 3) -> bytes:
+    """PNG из массива (высота, ширина, 3) uint8"""
+    height, width, _ = rgb.shape
+    # Каждая строка начинается с байта фильтра 0 (без фильтра)
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 1:] = rgb.reshape(height, width * 3)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (struct.pack(">I", len(data)) + kind + data +
+                struct.pack(">I", zlib.crc32(kind + data)))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    # zlib отпускает GIL на время сжатия, поэтому кодирование не мешает игре
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) +
+            chunk(b"IDAT", zlib.compress(rows, level)) + chunk(b"IEND", b""))
+
+
+class FrameCapture:
+    """Запись кадров экрана через кольцо буферов и поток записи"""
+
+    def __init__(self, directory: str, surface: pygame.Surface, fmt: str = "raw",
+                 buffers: int = 8, policy: str = "drop", every: int = 1,
+                 level: int = 3, fps: int = FPS):
+        if fmt not in FORMATS:
+            raise ValueError(f"формат {fmt!r}: ожидается один из {FORMATS}")
+        if policy not in POLICIES:
+            raise ValueError(f"режим {policy!r}: ожидается один из {POLICIES}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.format = fmt
+        self.policy = policy
+        self.every = every
+        self.level = level
+        self.fps = fps
+
+        # Геометрия кадра и номера байтов R, G, B в пикселе (little-endian)
+        self.width, self.height = surface.get_size()
+        self.pitch = surface.get_pitch()
+        self.bytesize = surface.get_bytesize()
+        self.channels = [mask.bit_length() // 8 - 1 for mask in surface.get_masks()[:3]]
+
+        # Кольцо буферов: номера свободных и заполненных (с номером кадра)
+        self._ring: List[np.ndarray] = [np.empty(self.pitch * self.height, dtype=np.uint8)
+                                        for _ in range(buffers)]
+        self._free: queue.SimpleQueue = queue.SimpleQueue()
+        for index in range(buffers):
+            self._free.put(index)
+        self._filled: queue.SimpleQueue = queue.SimpleQueue()
+
+        self.stride = every
+        self._calm = 0
+        self.presented = 0
+        self.captured = 0
+        self.written = 0
+        self.dropped = 0
+        self.skipped = 0
+        self.max_pending = 0
+
+        self._raw = open(os.path.join(directory, "frames.rgb"), "wb") if fmt == "raw" else None
+        self._thread = threading.Thread(target=self._run, name="frame-capture", daemon=True)
+        self._thread.start()
+
+    def capture(self, surface: pygame.Surface) -> None:
+        """Скопировать выведенный кадр в кольцо; никогда не ждет поток записи"""
+        self.presented += 1
+        if self.presented % self.stride:
+            self.skipped += 1
+            return
+        try:
+            index = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            if self.policy == "throttle":
+                self.stride = min(self.stride * 2, self.every * MAX_STRIDE)
+                self._calm = 0
+            return
+        np.copyto(self._ring[index], np.frombuffer(surface.get_buffer(), dtype=np.uint8))
+        self._filled.put((index, self.captured))
+        self.captured += 1
+        self.max_pending = max(self.max_pending, len(self._ring) - self._free.qsize())
+        if self.stride > self.every:
+            self._calm += 1
+            if self._calm >= RECOVER_FRAMES:
+                self.stride = max(self.stride // 2, self.every)
+                self._calm = 0
+
+    def _to_rgb(self, data: np.ndarray, rgb: np.ndarray) -> None:
+        """Пиксели буфера кольца в массив (высота, ширина, 3) RGB"""
+        rows = data.reshape(self.height, self.pitch)[:, :self.width * self.bytesize]
+        pixels = rows.reshape(self.height, self.width, self.bytesize)
+        for channel, byte in enumerate(self.channels):
+            rgb[:, :, channel] = pixels[:, :, byte]
+
+    def _run(self) -> None:
+        """Поток записи: переводит кадры в RGB и пишет их на диск"""
+        rgb = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        while True:
+            item = self._filled.get()
+            if item is None:
+                break
+            index, number = item
+            self._to_rgb(self._ring[index], rgb)
+            self._free.put(index)
+            if self._raw is not None:
+                self._raw.write(rgb)
+            else:
+                path = os.path.join(self.directory, f"frame_{number:05d}.png")
+                with open(path, "wb") as f:
+                    f.write(encode_png(rgb, self.level))
+            self.written += 1
+
+    def stats(self) -> Dict:
+        """Счетчики записи"""
+        return {"presented": self.presented, "written": self.written,
+                "dropped": self.dropped, "skipped": self.skipped,
+                "pending": len(self._ring) - self._free.qsize(),
+                "max_pending": self.max_pending, "stride": self.stride}
+
+    def close(self) -> Dict:
+        """Дописать очередь, остановить поток и сохранить capture.json"""
+        self._filled.put(None)
+        self._thread.join()
+        if self._raw is not None:
+            self._raw.close()
+        stats = self.stats()
+        meta = {"format": self.format, "width": self.width, "height": self.height,
+                "fps": self.fps / self.every, "policy": self.policy, **stats}
+        if self.format == "raw":
+            meta["pixel_format"] = "rgb24"
+        with open(os.path.join(self.directory, "capture.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        return stats
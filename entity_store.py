@@ -0,0 +1,122 @@
+"""Хранилище сущностей со стабильными дескрипторами.
+
+Сущности одного типа (кирпичи, бонусы) лежат подряд в плотном списке items,
+поэтому обход идет по непрерывному массиву без копий. Добавление кладет
+сущность в конец, удаление переносит последнюю сущность на место удаленной
+(swap-remove) - обе операции O(1), в отличие от list.remove.
+
+Положение сущности в items при удалениях меняется, поэтому снаружи на нее
+ссылаются дескриптором Handle: номер слота и поколение. Освобожденные слоты
+переиспользуются через список свободных, а поколение слота растет при каждом
+удалении, так что устаревший дескриптор не находит чужую сущность.
+
+Частицы и дополнительные мячи хранятся отдельно, в массивах NumPy
+(particles.py, balls.py): они не нужны по одной и обрабатываются векторно.
+
+Кирпичи и бонусы, наоборот, хранятся объектами, а не массивами по
+компонентам (прямоугольник, прочность, цвет, тип) с классами-видами. Их
+немного (десятки, в наборах уровней - тысячи), и код работает с ними по
+одному: Brick.hit, столкновения через pygame.Rect, draw и sprite_key,
+применение бонуса. Вид над массивами превратил бы каждое чтение rect и
+health в вызов свойства и создание Rect, а непрерывности в памяти в Python
+это не дает - в списке все равно лежат указатели на объекты. Там, где
+нужен векторный доступ, массивы строятся отдельно: BrickGrid упаковывает
+прямоугольники кирпичей в NumPy (spatial_grid.py), снимок хранит прочность
+кирпичей кортежем (Simulation.snapshot).
+"""
+from typing import Generic, Iterator, List, NamedTuple, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Handle(NamedTuple):
+    """Стабильная ссылка на сущность в хранилище"""
+    slot: int
+    generation: int
+
+
+class EntityStore(Generic[T]):
+    """Плотное хранилище сущностей с удалением за O(1)"""
+
+    def __init__(self):
+        # Плотные данные: сущности и слоты, которым они принадлежат
+        self.items: List[T] = []
+        self._slots: List[int] = []
+        # Разреженная часть: слот -> позиция в items (-1 - свободен) и поколение
+        self._index: List[int] = []
+        self._generation: List[int] = []
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __bool__(self) -> bool:
+        return bool(self.items)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.items)
+
+    def __contains__(self, handle: Handle) -> bool:
+        slot, generation = handle
+        return (0 <= slot < len(self._index) and self._index[slot] >= 0
+                and self._generation[slot] == generation)
+
+    def add(self, item: T) -> Handle:
+        """Добавить сущность и вернуть ее дескриптор"""
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._index)
+            self._index.append(-1)
+            self._generation.append(0)
+        self._index[slot] = len(self.items)
+        self.items.append(item)
+        self._slots.append(slot)
+        return Handle(slot, self._generation[slot])
+
+    def get(self, handle: Handle) -> Optional[T]:
+        """Сущность по дескриптору или None, если она удалена"""
+        if handle not in self:
+            return None
+        return self.items[self._index[handle.slot]]
+
+    def remove(self, handle: Handle) -> T:
+        """Удалить сущность по дескриптору"""
+        if handle not in self:
+            raise KeyError(handle)
+        return self.remove_at(self._index[handle.slot])
+
+    def remove_at(self, position: int) -> T:
+        """Удалить сущность по позиции в items: на ее место встает последняя"""
+        items, slots = self.items, self._slots
+        item = items[position]
+        slot = slots[position]
+        last_item = items.pop()
+        last_slot = slots.pop()
+        if position < len(items):
+            items[position] = last_item
+            slots[position] = last_slot
+            self._index[last_slot] = position
+        self._index[slot] = -1
+        self._generation[slot] += 1
+        self._free.append(slot)
+        return item
+
+    def copy(self) -> "EntityStore[T]":
+        """Независимая копия хранилища с теми же сущностями и дескрипторами"""
+        store = EntityStore.__new__(EntityStore)
+        store.items = self.items.copy()
+        store._slots = self._slots.copy()
+        store._index = self._index.copy()
+        store._generation = self._generation.copy()
+        store._free = self._free.copy()
+        return store
+
+    def clear(self) -> None:
+        """Удалить все сущности (выданные дескрипторы становятся недействительными)"""
+        for slot in self._slots:
+            self._index[slot] = -1
+            self._generation[slot] += 1
+            self._free.append(slot)
+        self.items.clear()
+        self._slots.clear()
@@ -0,0 +1,234 @@
+"""Среда для обучения агентов в стиле Gym: reset() / step(action).
+
+ArkanoidEnv оборачивает Game без его бесконечного цикла: шаг среды - это
+frame_skip шагов симуляции с одним и тем же действием, затем наблюдение.
+Окно не нужно: Game рисует в поверхность, созданную средой.
+
+Наблюдения:
+    "state"  - вектор float32: ракетка, мяч, жизни, число доп. мячей и
+               прочность кирпичей на сетке 6x10 встроенной раскладки.
+    "pixels" - кадр uint8 формы (высота, ширина, 3) в RGB без копирования.
+               Поверхность Game создается через pygame.image.frombuffer
+               поверх массива NumPy, поэтому наблюдение - это срез этого
+               массива, а downsample=k - шаг среза [::k, ::k], тоже без копии.
+               Кадр рисуется один раз за шаг среды, после последнего шага
+               симуляции, рендерером грязных прямоугольников (renderer.py):
+               буфер кадра живет между шагами, поэтому кирпичи и панель не
+               перерисовываются каждый раз. Наблюдение действительно до следующего step/reset;
+               чтобы сохранить кадр (стек кадров, буфер опыта), его копируют.
+
+pygame.surfarray.pixels3d здесь не подходит: пока жив полученный массив,
+поверхность заблокирована и blit в нее падает, а агент обычно держит
+прошлое наблюдение во время следующего шага.
+
+VectorEnv выполняет N сред подряд в одном процессе и отдает наблюдения
+пакетом: кадры всех сред лежат в одном массиве (N, высота, ширина, 4),
+поэтому пакет пикселей тоже собирается без копирования. Закончившиеся
+среды сбрасываются сами.
+
+Награда - прирост счета за шаг, terminated - конец игры, truncated -
+превышение max_steps шагов среды.
+
+Производительность (python benchmark.py env, 8 сред, frame_skip=4,
+автопилот, CPython 3.11, одно ядро): state - около 16 000 шагов среды/с,
+pixels - около 10 000 шагов/с (полная перерисовка кадра вместо грязных
+прямоугольников дала бы ~500); downsample не меняет скорость - срез
+бесплатен, цена пикселей - это отрисовка.
+"""
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pygame
+from game import Game
+from game_config import SCREEN_WIDTH, SCREEN_HEIGHT
+from simulation import FrameInput, NO_INPUT
+from batch_sim import (BRICK_ROWS, BRICK_COLS, BRICK_STEP_X, BRICK_STEP_Y,
+                       BRICK_OFFSET_X, BRICK_OFFSET_Y, MAX_SPEED)
+
+# Действия: 0 - ничего, 1 - влево, 2 - вправо, 3 - запуск мяча
+ACTIONS = (NO_INPUT, FrameInput(left=True), FrameInput(right=True), FrameInput(launch=True))
+OBSERVATIONS = ("state", "pixels")
+# Ракетка (2), мяч (5), жизни, дополнительные мячи и сетка кирпичей
+STATE_SIZE = 9 + BRICK_ROWS * BRICK_COLS
+
+
+class ArkanoidEnv:
+    """Одна игра с интерфейсом reset() / step(action)"""
+
+    def __init__(self, observation: str = "state", frame_skip: int = 4, downsample: int = 1,
+                 difficulty: str = "normal", ball_speed: str = "medium",
+                 max_steps: int = 10_000, seed: Optional[int] = None,
+                 buffer: Optional[np.ndarray] = None):
+        if observation not in OBSERVATIONS:
+            raise ValueError(f"наблюдение {observation!r}: ожидается одно из {OBSERVATIONS}")
+        self.observation = observation
+        self.frame_skip = frame_skip
+        self.downsample = downsample
+        self.max_steps = max_steps
+        self.action_count = len(ACTIONS)
+
+        # Пиксели кадра; buffer передает VectorEnv, чтобы кадры сред лежали подряд.
+        # В режиме state кадр не рисуется и буфер не нужен
+        if observation == "pixels":
+            if buffer is None:
+                buffer = np.zeros((SCREEN_HEIGHT, SCREEN_WIDTH, 4), dtype=np.uint8)
+            screen = pygame.image.frombuffer(buffer, (SCREEN_WIDTH, SCREEN_HEIGHT), "RGBX")
+            self.pixels: Optional[np.ndarray] = buffer[::downsample, ::downsample, :3]
+            self.observation_shape: Tuple[int, ...] = self.pixels.shape
+        else:
+            screen = pygame.Surface((1, 1))
+            self.pixels = None
+            self.observation_shape = (STATE_SIZE,)
+
+        pygame.font.init()
+        # Буфер кадра сохраняется между шагами, поэтому рендерер грязных
+        # прямоугольников перерисовывает только изменившиеся области
+        render_mode = "dirty" if observation == "pixels" else "full"
+        self.game = Game(render_mode=render_mode, seed=seed, screen=screen)
+        self.game.difficulty = difficulty
+        self.game.ball_speed_setting = ball_speed
+        self.game.input_source = self._current_input
+        self._input = NO_INPUT
+        self.steps = 0
+
+    def _current_input(self) -> FrameInput:
+        return self._input
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, Dict]:
+        """Начать новую игру; seed задает зерна этой и следующих игр"""
+        if seed is not None:
+            self.game.session_rng = random.Random(seed)
+        self.game.reset_game()
+        self.steps = 0
+        return self.observe(), self._info()
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool, bool, Dict]:
+        """Выполнить действие frame_skip шагов симуляции подряд"""
+        reward, terminated, truncated = self._advance(action)
+        return self.observe(), reward, terminated, truncated, self._info()
+
+    def _advance(self, action: int) -> Tuple[float, bool, bool]:
+        """Шаги симуляции без наблюдения: награда, terminated, truncated"""
+        game = self.game
+        score = game.sim.paddle.score
+        self._input = ACTIONS[action]
+        for _ in range(self.frame_skip):
+            game.update()
+            if game.game_state != "playing":
+                break
+        self.steps += 1
+        terminated = game.sim.game_over
+        truncated = not terminated and self.steps >= self.max_steps
+        return float(game.sim.paddle.score - score), terminated, truncated
+
+    def observe(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Наблюдение текущего состояния (вектор пишется в out, если он передан)"""
+        if self.observation == "pixels":
+            self.game.render()
+            return self.pixels
+        return self.state(out)
+
+    def state(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Вектор состояния: координаты нормированы на размер экрана"""
+        if out is None:
+            out = np.empty(STATE_SIZE, dtype=np.float32)
+        sim = self.game.sim
+        paddle, ball = sim.paddle, sim.ball
+        out[:9] = (paddle.rect.centerx / SCREEN_WIDTH, paddle.rect.width / SCREEN_WIDTH,
+                   ball.x / SCREEN_WIDTH, ball.y / SCREEN_HEIGHT,
+                   ball.speed_x / MAX_SPEED, ball.speed_y / MAX_SPEED, ball.sticky,
+                   paddle.lives, len(sim.balls))
+        grid = out[9:]
+        grid[:] = 0
+        for brick in sim.bricks:
+            col = (brick.rect.x - BRICK_OFFSET_X) // BRICK_STEP_X
+            row = (brick.rect.y - BRICK_OFFSET_Y) // BRICK_STEP_Y
+            if 0 <= col < BRICK_COLS and 0 <= row < BRICK_ROWS:
+                grid[row * BRICK_COLS + col] = brick.health
+        return out
+
+    def _info(self) -> Dict:
+        sim = self.game.sim
+        return {"score": sim.paddle.score, "lives": sim.paddle.lives,
+                "level": sim.level, "frame": sim.frame}
+
+    def close(self) -> None:
+        """Остановить фоновые потоки игры и дописать таблицу рекордов и захват кадров"""
+        game = self.game
+        game.prebuilder.close()
+        if game.leaderboard is not None:
+            game.leaderboard.close()
+            game.leaderboard = None
+        if game.capture is not None:
+            game.capture.close()
+            game.capture = None
+
+
+class VectorEnv:
+    """N сред в одном процессе с пакетными наблюдениями и автосбросом"""
+
+    def __init__(self, count: int, observation: str = "state", seed: Optional[int] = None,
+                 **kwargs):
+        self.count = count
+        self.observation = observation
+        buffers: List[Optional[np.ndarray]] = [None] * count
+        if observation == "pixels":
+            self._buffers = np.zeros((count, SCREEN_HEIGHT, SCREEN_WIDTH, 4), dtype=np.uint8)
+            buffers = list(self._buffers)
+        self.envs = [ArkanoidEnv(observation, seed=None if seed is None else seed + i,
+                                 buffer=buffers[i], **kwargs)
+                     for i in range(count)]
+        first = self.envs[0]
+        self.action_count = first.action_count
+        self.observation_shape = (count,) + first.observation_shape
+        if observation == "pixels":
+            step = first.downsample
+            self._observations = self._buffers[:, ::step, ::step, :3]
+        else:
+            self._observations = np.zeros(self.observation_shape, dtype=np.float32)
+        self.rewards = np.zeros(count, dtype=np.float32)
+        self.terminated = np.zeros(count, dtype=bool)
+        self.truncated = np.zeros(count, dtype=bool)
+
+    def _set_observation(self, i: int, observation: np.ndarray) -> None:
+        # Пиксели уже лежат в общем буфере, вектор состояния копируется в строку пакета
+        if self.observation == "state":
+            self._observations[i] = observation
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, List[Dict]]:
+        """Сбросить все среды"""
+        infos = []
+        for i, env in enumerate(self.envs):
+            observation, info = env.reset(None if seed is None else seed + i)
+            self._set_observation(i, observation)
+            infos.append(info)
+        return self._observations, infos
+
+    def step(self, actions: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray,
+                                                    np.ndarray, List[Dict]]:
+        """Шаг всех сред; закончившиеся сразу начинают новую игру.
+
+        Последнее наблюдение закончившейся игры лежит в info["final_observation"].
+        """
+        infos = []
+        for i, env in enumerate(self.envs):
+            reward, terminated, truncated = env._advance(actions[i])
+            self.rewards[i] = reward
+            self.terminated[i] = terminated
+            self.truncated[i] = truncated
+            info = env._info()
+            if terminated or truncated:
+                info["final_observation"] = env.observe().copy()
+                observation, _ = env.reset()
+                self._set_observation(i, observation)
+            elif self.observation == "pixels":
+                env.observe()
+            else:
+                env.observe(self._observations[i])
+            infos.append(info)
+        return self._observations, self.rewards, self.terminated, self.truncated, infos
+
+    def close(self) -> None:
+        """Закрыть все среды"""
+        for env in self.envs:
+            env.close()
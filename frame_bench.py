@@ -0,0 +1,221 @@
+"""Сценарии замера времени кадра для Game.update и Game.draw.
+
+Каждый сценарий настраивает игру под фиктивным видеодрайвером SDL
+(число кирпичей, падающих бонусов, живых частиц, дополнительных мячей,
+мяч на ракетке или в игре, экран окончания игры) и прогоняет заданное число кадров. Для каждой фазы
+считаются p50/p95/p99 времени, а отдельным проходом под tracemalloc - объем
+памяти, выделяемой за кадр. Результаты сохраняются в JSON, два файла можно
+сравнить командой python benchmark.py diff.
+"""
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
+import pygame
+from game_config import SCREEN_WIDTH
+from game_objects import Brick, PowerUp, POWER_UP_TYPES
+from simulation import autopilot_input
+from spatial_grid import BrickGrid
+from stats import summarize
+
+PHASES = ("update", "draw")
+
+
+class Scenario(NamedTuple):
+    """Нагрузка для замера"""
+    name: str
+    bricks: int = 60
+    power_ups: int = 0
+    particles: int = 0
+    balls: int = 0
+    sticky: bool = False
+    game_over: bool = False
+
+
+DEFAULT_SCENARIOS = [
+    Scenario("baseline"),
+    Scenario("sticky_ball", sticky=True),
+    Scenario("bricks_2000", bricks=2000),
+    Scenario("power_ups_50", power_ups=50),
+    Scenario("particles_5000", particles=5000),
+    Scenario("balls_500", balls=500),
+    Scenario("game_over", game_over=True),
+    Scenario("stress", bricks=2000, power_ups=50, particles=5000),
+]
+
+
+class ScenarioDriver:
+    """Поддерживает заданную нагрузку в игре на протяжении замера"""
+
+    def __init__(self, game, scenario: Scenario, seed: int = 0):
+        self.game = game
+        self.scenario = scenario
+        self.rng = random.Random(seed)
+        sim = game.sim
+        sim.particles.rng = np.random.default_rng(seed)
+
+        if scenario.bricks != 60:
+            self._fill_bricks(scenario.bricks)
+
+        if scenario.sticky:
+            game.input_source = lambda: autopilot_input(sim)._replace(launch=False)
+        else:
+            game.input_source = lambda: autopilot_input(sim)
+            sim.ball.sticky = False
+
+        if scenario.game_over:
+            sim.game_over = True
+            game.game_state = "game_over"
+
+    def _fill_bricks(self, count: int) -> None:
+        """Равномерная сетка из count кирпичей в верхней части экрана"""
+        sim = self.game.sim
+        cols = max(1, math.ceil(math.sqrt(count * SCREEN_WIDTH / 300)))
+        rows = math.ceil(count / cols)
+        cell_w = SCREEN_WIDTH // cols
+        cell_h = max(4, 300 // rows)
+        bricks = []
+        for i in range(count):
+            brick = Brick(i % cols * cell_w, 50 + i // cols * cell_h, (0, 0, 255), 3,
+                          sim.brick_rng)
+            brick.rect.size = (max(2, cell_w - 2), max(2, cell_h - 2))
+            bricks.append(brick)
+        sim.load_bricks(bricks, BrickGrid(cell_w, cell_h, origin=(0, 50)))
+
+    def before_frame(self) -> None:
+        """Досоздать бонусы и частицы до заданного количества"""
+        sim = self.game.sim
+        while len(sim.power_ups) < self.scenario.power_ups:
+            sim.add_power_up(PowerUp(self.rng.randrange(SCREEN_WIDTH - 30),
+                                     self.rng.randrange(0, 300),
+                                     self.rng.choice(POWER_UP_TYPES)))
+        # Бонусы не должны менять ракетку и мяч по ходу замера
+        for power_up in sim.power_ups:
+            if power_up.rect.bottom >= sim.paddle.rect.top - 5:
+                power_up.rect.y = 0
+        while len(sim.particles) < self.scenario.particles:
+            sim.particles.spawn(self.rng.randrange(SCREEN_WIDTH), self.rng.randrange(500),
+                                (255, 165, 0), 15)
+        missing = self.scenario.balls - len(sim.balls)
+        if missing > 0:
+            sim.balls.spawn_fan(SCREEN_WIDTH / 2, 400, 6, missing)
+        # Потерянный мяч не должен завершать замер
+        sim.paddle.lives = max(sim.paddle.lives, 3)
+
+
+def run_scenario(scenario: Scenario, frames: int, render_mode: str = "full",
+                 warmup: int = 30, quality: str = "high") -> Dict:
+    """Прогнать сценарий и вернуть сводку по фазам"""
+    from game import Game
+
+    random.seed(0)
+    # Уровень качества фиксирован, чтобы отчеты были сравнимы
+    game = Game(render_mode=render_mode, seed=0, quality=quality)
+    driver = ScenarioDriver(game, scenario)
+    timings: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+
+    # Проход замера времени
+    gc.collect()
+    for frame in range(warmup + frames):
+        driver.before_frame()
+        start = time.perf_counter()
+        game.update()
+        middle = time.perf_counter()
+        game.draw()
+        end = time.perf_counter()
+        if frame >= warmup:
+            timings["update"].append((middle - start) * 1000)
+            timings["draw"].append((end - middle) * 1000)
+
+    # Отдельный проход под tracemalloc: он сам замедляет кадр
+    alloc_frames = min(frames, 120)
+    allocations: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+    tracemalloc.start()
+    for _ in range(alloc_frames):
+        driver.before_frame()
+        for phase in PHASES:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            getattr(game, phase)()
+            _, peak = tracemalloc.get_traced_memory()
+            allocations[phase].append((peak - base) / 1024)
+    tracemalloc.stop()
+
+    result = {"scenario": scenario._asdict(), "frames": frames, "phases": {}}
+    for phase in PHASES:
+        result["phases"][phase] = {
+            "ms": summarize(timings[phase]),
+            "alloc_kib": summarize(allocations[phase]),
+        }
+    frame_total = [u + d for u, d in zip(timings["update"], timings["draw"])]
+    result["phases"]["frame"] = {"ms": summarize(frame_total)}
+    return result
+
+
+def run_suite(scenarios: List[Scenario], frames: int, render_mode: str = "full",
+              quality: str = "high") -> Dict:
+    """Прогнать набор сценариев"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "render_mode": render_mode,
+            "quality": quality,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {scenario.name: run_scenario(scenario, frames, render_mode,
+                                                   quality=quality)
+                    for scenario in scenarios},
+    }
+
+
+def print_report(report: Dict) -> None:
+    """Таблица с результатами набора"""
+    print(f"{'сценарий':<16}{'фаза':<8}{'p50 мс':>9}{'p95 мс':>9}{'p99 мс':>9}{'пик КиБ':>10}")
+    for name, result in report["results"].items():
+        for phase, data in result["phases"].items():
+            ms = data["ms"]
+            alloc = data.get("alloc_kib", {}).get("p50")
+            alloc_text = f"{alloc:>10.1f}" if alloc is not None else f"{'':>10}"
+            print(f"{name:<16}{phase:<8}{ms['p50']:>9.3f}{ms['p95']:>9.3f}"
+                  f"{ms['p99']:>9.3f}{alloc_text}")
+
+
+def save_report(report: Dict, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def diff_reports(old_path: str, new_path: str, threshold: float = 10.0) -> None:
+    """Сравнить два JSON-отчета по p50/p95/p99 каждой фазы"""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)["results"]
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)["results"]
+
+    print(f"{'сценарий':<16}{'фаза':<8}{'метрика':<8}{'было':>9}{'стало':>9}{'изм.':>9}")
+    for name in old:
+        if name not in new:
+            print(f"{name:<16}нет в новом отчете")
+            continue
+        for phase, data in old[name]["phases"].items():
+            new_data: Optional[dict] = new[name]["phases"].get(phase)
+            if new_data is None:
+                continue
+            for metric in ("p50", "p95", "p99"):
+                before = data["ms"][metric]
+                after = new_data["ms"][metric]
+                change = (after - before) / before * 100 if before else 0.0
+                mark = " !" if change > threshold else ""
+                print(f"{name:<16}{phase:<8}{metric:<8}{before:>9.3f}{after:>9.3f}"
+                      f"{change:>+8.1f}%{mark}")
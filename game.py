@@ -1,46 +1,137 @@
 import pygame
-import sys
 import random
-from typing import List
-from game_objects import Paddle, Ball, Brick, PowerUp, Particle
-from game_config import GameConfig, SpeedController
-
-# Константы
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 600
-FPS = 60
+import sys
+import time
+from itertools import chain
+from typing import Callable, List, Optional, Tuple
+from game_config import (GameConfig, SCREEN_WIDTH, SCREEN_HEIGHT, FPS,
+                         BLACK, WHITE, RED, GREEN, YELLOW, GRAY, LIGHT_BLUE)
+from simulation import Simulation, SimSnapshot, FrameInput, BRICK_COLORS
+from text_cache import text_cache
+from hud import Hud
+from renderer import DirtyRectRenderer
+from physics import FixedTimestep
+from replay import ReplayWriter, read_replay
+from profiler import FrameProfiler, NULL_PROFILER
+from capture import FrameCapture
+from sprites import SpriteAtlas
+from level_pack import LevelPack
+from quality import QualityGovernor
+from prebuild import LevelPrebuilder
+from latency import FramePacer, LatencyStats
+from leaderboard import Leaderboard, GameRecord, UPDATED_EVENT
 
-# Цвета
-BLACK = (0, 0, 0)
-WHITE = (255, 255, 255)
-RED = (255, 0, 0)
-GREEN = (0, 255, 0)
-BLUE = (0, 0, 255)
-YELLOW = (255, 255, 0)
-ORANGE = (255, 165, 0)
-PURPLE = (128, 0, 128)
-GRAY = (128, 128, 128)
-LIGHT_BLUE = (100, 100, 255)
+# События, после которых неподвижный экран (меню, конец игры) рисуется заново
+REDRAW_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED,
+                 pygame.WINDOWSIZECHANGED, UPDATED_EVENT)
+# Сколько лучших результатов показывать в меню
+MENU_SCORES = 3
 
 class Game:
     """Основной класс игры"""
     
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Арканоид")
+    def __init__(self, render_mode: str = "full", physics_hz: int = FPS, render_fps: int = FPS,
+                 seed: Optional[int] = None, record_path: Optional[str] = None,
+                 profile: bool = False, trace_path: str = "frame_trace.json",
+                 chaos_balls: int = 0, level_pack: Optional[LevelPack] = None,
+                 screen: Optional[pygame.Surface] = None, capture_dir: Optional[str] = None,
+                 capture_format: str = "raw", capture_policy: str = "drop",
+                 quality: str = "auto", low_latency: bool = False,
+                 latency_report: bool = False, scores_path: Optional[str] = None):
+        # screen - готовая поверхность вместо окна (среда для обучения агентов, env.py)
+        if screen is None:
+            screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Арканоид")
+        self.screen = screen
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
-        self.title_font = pygame.font.Font(None, 48)
+        self.text = text_cache
+        self.font = self.text.font(None, 36)
+        self.small_font = self.text.font(None, 24)
+        self.title_font = self.text.font(None, 48)
+        self.hud = Hud(self.font, self.small_font, self.text)
+        
+        # Все виды кирпичей, ракетки, мяча и бонусов рисуются заранее в атлас
+        self.sprites = SpriteAtlas()
+        self.sprites.prepare([color for color, _ in BRICK_COLORS] +
+                             (level_pack.palette if level_pack is not None else []))
+        
+        # Затемнение для экрана окончания игры создается один раз
+        self.game_over_overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.game_over_overlay.set_alpha(180)
+        self.game_over_overlay.fill(BLACK)
+        
+        # "full" - перерисовка всего экрана, "dirty" - только измененных областей
+        self.renderer = DirtyRectRenderer(self) if render_mode == "dirty" else None
+        
+        # Следующий уровень (и слой кирпичей для dirty) готовится в фоновом потоке
+        self.prebuilder = LevelPrebuilder(self.renderer.render_bricks
+                                          if self.renderer is not None else None)
+        
+        # Физика идет фиксированными шагами независимо от частоты отрисовки;
+        # render_fps=0 - отрисовка без ограничения частоты
+        self.timestep = FixedTimestep(1.0 / physics_hz)
+        self.step_frames = FPS / physics_hz
+        self.render_fps = render_fps
+        
+        # Режим низкой задержки ввода (latency.py): поздний опрос и точный темп;
+        # шаги физики одного кадра разносятся по его периоду
+        self.low_latency = low_latency and render_fps > 0
+        self.pacer = FramePacer(render_fps)
+        # Шаги физики кадра считаются целочисленно: кадр дает physics_hz
+        # единиц, шаг стоит render_fps, поэтому скорость игры не зависит от
+        # соотношения частот (100 Гц при 60 кадрах - то 1, то 2 шага)
+        self.physics_hz = physics_hz
+        self.step_credit = 0
+        self.substeps = -(-physics_hz // render_fps) if render_fps > 0 else 1
+        self.latency = LatencyStats()
+        self.latency_report = latency_report
+        
+        # Источник ввода вместо клавиатуры (боты, сценарии замеров)
+        self.input_source: Optional[Callable[[], FrameInput]] = None
+        
+        # Зерна игр сессии и запись ввода для точного повтора
+        self.session_rng = random.Random(seed)
+        self.recorder = ReplayWriter(record_path) if record_path else None
+        
+        # Запись выведенных кадров в фоновом потоке (capture.py)
+        self.capture = (FrameCapture(capture_dir, self.screen, capture_format,
+                                     policy=capture_policy)
+                        if capture_dir else None)
+        
+        # Профилировщик кадра: F3 - включить и показать график, F4 - сохранить трассу
+        self.profiler = NULL_PROFILER
+        self.trace_path = trace_path
+        self.profile_font = self.text.font(None, 18)
+        
+        # Уровень качества эффектов по времени кадров (quality.py); F6 - сводка
+        self.quality = QualityGovernor(quality)
+        self.show_quality = False
+        
+        # Рекорды и статистика игр в SQLite; пишет фоновый поток (leaderboard.py)
+        self.leaderboard = Leaderboard(scores_path) if scores_path else None
+        self.new_record = False
         
         self.difficulty = "normal"
         self.ball_speed_setting = "medium"
+        self.chaos_balls = chaos_balls
+        self.level_pack = level_pack
         self.game_state = "menu"  # "menu", "playing", "game_over", "level_complete"
+        # Неподвижный экран уже выведен и не требует перерисовки
+        self.screen_current = False
+        # Быстрое сохранение: F5 - запомнить, F9 - вернуться (симуляция и ее снимок)
+        self.saved_state: Optional[Tuple[Simulation, SimSnapshot]] = None
         
         self.reset_game()
+        if profile:
+            self.set_profiling(True)
     
     def show_main_menu(self) -> None:
-        """Показать главное меню"""
+        """Показать главное меню.
+        
+        Меню неподвижно, поэтому оно перерисовывается только после нажатия
+        клавиши или когда окно нужно показать заново, а в остальное время
+        цикл спит в pygame.event.wait и не нагружает процессор.
+        """
         menu_active = True
         selected_difficulty = self.difficulty
         selected_speed = self.ball_speed_setting
@@ -50,144 +141,225 @@ class Game:
         
         difficulty_index = difficulties.index(selected_difficulty)
         speed_index = speeds.index(selected_speed)
+        needs_redraw = True
         
         while menu_active:
-            self.screen.fill(BLACK)
-            
-            # Заголовок
-            title_text = self.title_font.render("АРКАНОИД", True, YELLOW)
-            self.screen.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, 50))
-            
-            # Выбор сложности
-            difficulty_text = self.font.render("Уровень сложности:", True, WHITE)
-            self.screen.blit(difficulty_text, (SCREEN_WIDTH // 2 - 150, 150))
-            
-            for i, diff in enumerate(difficulties):
-                color = GREEN if i == difficulty_index else WHITE
-                diff_text = self.small_font.render(f"{diff.upper()}", True, color)
-                self.screen.blit(diff_text, (SCREEN_WIDTH // 2 - 50 + i * 100, 200))
-            
-            # Выбор скорости мяча
-            speed_text = self.font.render("Скорость мяча:", True, WHITE)
-            self.screen.blit(speed_text, (SCREEN_WIDTH // 2 - 100, 250))
-            
-            for i, speed in enumerate(speeds):
-                color = LIGHT_BLUE if i == speed_index else WHITE
-                speed_display = {
-                    "slow": "Медленно",
-                    "medium": "Средне", 
-                    "fast": "Быстро",
-                    "very_fast": "Очень быстро"
-                }
-                speed_name = speed_display.get(speed, speed)
-                speed_text = self.small_font.render(f"{speed_name}", True, color)
-                self.screen.blit(speed_text, (SCREEN_WIDTH // 2 - 80 + i * 160, 300))
-            
-            # Информация о настройках
-            settings = GameConfig.get_difficulty_settings(difficulties[difficulty_index])
-            info_text = self.small_font.render(
-                f"Скорость мяча: {settings['ball_speed']} | "
-                f"Жизни: {settings['initial_lives']} | "
-                f"Шанс бонуса: {settings['power_up_chance']*100}%", 
-                True, GRAY
-            )
-            self.screen.blit(info_text, (SCREEN_WIDTH // 2 - 200, 350))
+            if needs_redraw:
+                self._draw_menu(difficulties, difficulty_index, speeds, speed_index)
+                pygame.display.flip()
+                needs_redraw = False
             
-            # Кнопка старта
-            start_text = self.font.render("НАЧАТЬ ИГРУ (ПРОБЕЛ)", True, GREEN)
-            self.screen.blit(start_text, (SCREEN_WIDTH // 2 - start_text.get_width() // 2, 450))
-            
-            # Управление
-            controls_text = self.small_font.render(
-                "Управление: ← → перемещение, ПРОБЕЛ запуск мяча, R перезапуск", 
-                True, GRAY
-            )
-            self.screen.blit(controls_text, (SCREEN_WIDTH // 2 - controls_text.get_width() // 2, 500))
-            
-            pygame.display.flip()
-            
-            for event in pygame.event.get():
+            for event in [pygame.event.wait()] + pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
+                
+                if event.type in REDRAW_EVENTS:
+                    needs_redraw = True
                 
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_LEFT:
                         difficulty_index = (difficulty_index - 1) % len(difficulties)
                         selected_difficulty = difficulties[difficulty_index]
+                        needs_redraw = True
                     elif event.key == pygame.K_RIGHT:
                         difficulty_index = (difficulty_index + 1) % len(difficulties)
                         selected_difficulty = difficulties[difficulty_index]
+                        needs_redraw = True
                     elif event.key == pygame.K_UP:
                         speed_index = (speed_index - 1) % len(speeds)
                         selected_speed = speeds[speed_index]
+                        needs_redraw = True
                     elif event.key == pygame.K_DOWN:
                         speed_index = (speed_index + 1) % len(speeds)
                         selected_speed = speeds[speed_index]
+                        needs_redraw = True
                     elif event.key == pygame.K_SPACE:
                         self.difficulty = selected_difficulty
                         self.ball_speed_setting = selected_speed
                         self.reset_game()
                         self.game_state = "playing"
                         menu_active = False
-            
-            self.clock.tick(FPS)
+        
+        # Время ожидания в меню не должно попасть в шаги физики
+        self.clock.tick()
+    
+    def _draw_menu(self, difficulties: List[str], difficulty_index: int,
+                   speeds: List[str], speed_index: int) -> None:
+        """Нарисовать главное меню с выбранными настройками"""
+        self.screen.fill(BLACK)
+        
+        # Заголовок
+        title_text = self.text.render(self.title_font, "АРКАНОИД", YELLOW)
+        self.screen.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, 50))
+        
+        # Выбор сложности
+        difficulty_text = self.text.render(self.font, "Уровень сложности:", WHITE)
+        self.screen.blit(difficulty_text, (SCREEN_WIDTH // 2 - 150, 150))
+        
+        for i, diff in enumerate(difficulties):
+            color = GREEN if i == difficulty_index else WHITE
+            diff_text = self.text.render(self.small_font, f"{diff.upper()}", color)
+            self.screen.blit(diff_text, (SCREEN_WIDTH // 2 - 50 + i * 100, 200))
+        
+        # Выбор скорости мяча
+        speed_text = self.text.render(self.font, "Скорость мяча:", WHITE)
+        self.screen.blit(speed_text, (SCREEN_WIDTH // 2 - 100, 250))
+        
+        for i, speed in enumerate(speeds):
+            color = LIGHT_BLUE if i == speed_index else WHITE
+            speed_display = {
+                "slow": "Медленно",
+                "medium": "Средне", 
+                "fast": "Быстро",
+                "very_fast": "Очень быстро"
+            }
+            speed_name = speed_display.get(speed, speed)
+            speed_text = self.text.render(self.small_font, f"{speed_name}", color)
+            self.screen.blit(speed_text, (SCREEN_WIDTH // 2 - 80 + i * 160, 300))
+        
+        # Информация о настройках
+        settings = GameConfig.get_difficulty_settings(difficulties[difficulty_index])
+        info_text = self.text.render(self.small_font, 
+            f"Скорость мяча: {settings['ball_speed']} | "
+            f"Жизни: {settings['initial_lives']} | "
+            f"Шанс бонуса: {settings['power_up_chance']*100}%", 
+            GRAY
+        )
+        self.screen.blit(info_text, (SCREEN_WIDTH // 2 - 200, 350))
+        
+        # Лучшие результаты из кэша таблицы рекордов
+        if self.leaderboard is not None:
+            top = self.leaderboard.top()[:MENU_SCORES]
+            if top:
+                line = "Рекорды: " + "   ".join(
+                    f"{place}. {entry.score} (ур. {entry.level})"
+                    for place, entry in enumerate(top, 1))
+                scores_text = self.text.render(self.small_font, line, YELLOW)
+                self.screen.blit(scores_text,
+                                 (SCREEN_WIDTH // 2 - scores_text.get_width() // 2, 395))
+        
+        # Кнопка старта
+        start_text = self.text.render(self.font, "НАЧАТЬ ИГРУ (ПРОБЕЛ)", GREEN)
+        self.screen.blit(start_text, (SCREEN_WIDTH // 2 - start_text.get_width() // 2, 450))
+        
+        # Управление
+        controls_text = self.text.render(self.small_font, 
+            "Управление: ← → перемещение, ПРОБЕЛ запуск мяча, R перезапуск", 
+            GRAY
+        )
+        self.screen.blit(controls_text, (SCREEN_WIDTH // 2 - controls_text.get_width() // 2, 500))
     
     def reset_game(self) -> None:
         """Сброс состояния игры"""
-        settings = GameConfig.get_difficulty_settings(self.difficulty)
-        
-        self.paddle = Paddle(SCREEN_WIDTH // 2 - 50, SCREEN_HEIGHT - 50, settings["paddle_speed"])
-        self.paddle.lives = settings["initial_lives"]
-        
-        self.ball = Ball(self.paddle.rect.centerx, self.paddle.rect.top - 10)
-        self.ball.sticky = True
-        
-        # Устанавливаем выбранную скорость
-        self.ball.speed_controller.set_ball_speed(self.ball, self.ball_speed_setting)
-        
-        self.bricks: List[Brick] = []
-        self.power_ups: List[PowerUp] = []
-        self.particles: List[Particle] = []
-        
-        self.level = 1
+        self.sim = Simulation(self.difficulty, self.ball_speed_setting,
+                              seed=self.session_rng.getrandbits(63),
+                              chaos_balls=self.chaos_balls, level_pack=self.level_pack)
+        self.sim.profiler = self.profiler
+        self.apply_quality()
+        self.prebuilder.attach(self.sim)
+        if self.recorder is not None:
+            self.recorder.begin_segment(self.sim, self.step_frames)
         self.game_state = "playing"
-        self.create_level()
+        self._clear_pending_input()
+
+    # Состояние игры хранится в симуляции
+    @property
+    def paddle(self):
+        return self.sim.paddle
+
+    @property
+    def ball(self):
+        return self.sim.ball
+
+    @property
+    def bricks(self):
+        return self.sim.bricks
+
+    @property
+    def power_ups(self):
+        return self.sim.power_ups
+
+    @property
+    def particles(self):
+        return self.sim.particles
+
+    @property
+    def level(self) -> int:
+        return self.sim.level
+
+    def set_profiling(self, enabled: bool) -> None:
+        """Включить или выключить профилировщик кадра и его график"""
+        if enabled == self.profiler.enabled:
+            return
+        self.profiler = FrameProfiler() if enabled else NULL_PROFILER
+        self.sim.profiler = self.profiler
+        self._update_overlay()
+    
+    def apply_quality(self) -> None:
+        """Передать бюджеты текущего уровня качества частицам, кирпичам и панели"""
+        level = self.quality.level
+        self.sim.particles.spawn_scale = level.particle_scale
+        self.sim.particles.life_scale = level.life_scale
+        self.hud.refresh_interval = level.hud_interval
+        if self.sprites.brick_details != level.brick_details:
+            self.sprites.brick_details = level.brick_details
+            self.prebuilder.details = level.brick_details
+            if self.renderer is not None:
+                self.renderer.invalidate()
+    
+    def _update_overlay(self) -> None:
+        """Назначить рендереру рисование графика и сводки качества"""
+        if self.renderer is not None:
+            enabled = self.profiler.enabled or self.show_quality
+            self.renderer.overlay = self._draw_overlay if enabled else None
     
-    def create_level(self) -> None:
-        """Создание уровня с кирпичами"""
-        self.bricks.clear()
-        
-        brick_colors = [
-            (RED, 1), (ORANGE, 1), (YELLOW, 1), 
-            (GREEN, 2), (BLUE, 2), (PURPLE, 3)
-        ]
-        
-        for row in range(6):
-            color, health = brick_colors[row]
-            for col in range(10):
-                brick_x = col * 80 + 15
-                brick_y = row * 40 + 50
-                self.bricks.append(Brick(brick_x, brick_y, color, health + self.level - 1))
+    def _draw_overlay(self, screen: pygame.Surface) -> pygame.Rect:
+        """Нарисовать включенные панели поверх кадра, вернуть их общую область"""
+        rects = []
+        if self.profiler.enabled:
+            rects.append(self._draw_profile(screen))
+        if self.show_quality:
+            rects.append(self.quality.draw_overlay(screen, self.profile_font))
+        return rects[0].unionall(rects[1:])
     
-    def spawn_particles(self, x: int, y: int, color: tuple, count: int = 10) -> None:
-        """Создание частиц эффектов"""
-        for _ in range(count):
-            self.particles.append(Particle(x, y, color))
+    def export_trace(self) -> None:
+        """Сохранить записанные замеры в формате Chrome Trace Event"""
+        if self.profiler.enabled:
+            count = self.profiler.export_chrome_trace(self.trace_path)
+            print(f"Трасса кадров: {self.trace_path} ({count} событий)")
     
-    def handle_events(self) -> None:
-        """Обработка событий"""
-        for event in pygame.event.get():
+    def _draw_profile(self, screen: pygame.Surface) -> pygame.Rect:
+        """Нарисовать график профилировщика поверх кадра"""
+        self.profiler.mark("draw")
+        rect = self.profiler.draw_overlay(screen, self.profile_font)
+        self.profiler.mark("overlay")
+        return rect
+    
+    def _clear_pending_input(self) -> None:
+        """Сбросить команды, накопленные обработчиком событий"""
+        self.pending_launch = False
+        self.pending_speed_up = False
+        self.pending_speed_down = False
+
+    def handle_events(self, block: bool = False) -> None:
+        """Обработка событий; block=True - спать до первого события"""
+        events = []
+        if block:
+            events.append(pygame.event.wait())
+            self.profiler.mark("idle")
+        for event in events + pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                self.quit()
+            
+            if event.type in REDRAW_EVENTS:
+                self.screen_current = False
             
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
                     if self.game_state == "menu":
                         self.show_main_menu()
                     elif self.ball.sticky:
-                        self.ball.launch()
+                        self.pending_launch = True
                 elif event.key == pygame.K_r and self.game_state != "playing":
                     self.reset_game()
                 elif event.key == pygame.K_ESCAPE:
@@ -195,160 +367,306 @@ class Game:
                     self.show_main_menu()
                 elif event.key == pygame.K_EQUALS or event.key == pygame.K_PLUS:
                     # Увеличить скорость (для тестирования)
-                    self.ball.speed_controller.increase_speed(self.ball)
+                    self.pending_speed_up = True
                 elif event.key == pygame.K_MINUS:
                     # Уменьшить скорость (для тестирования)
-                    self.ball.speed_controller.decrease_speed(self.ball)
+                    self.pending_speed_down = True
+                elif event.key == pygame.K_F3:
+                    self.set_profiling(not self.profiler.enabled)
+                elif event.key == pygame.K_F4:
+                    self.export_trace()
+                elif event.key == pygame.K_F5 and self.game_state != "menu":
+                    self.save_state()
+                elif event.key == pygame.K_F9 and self.game_state != "menu":
+                    self.load_state()
+                elif event.key == pygame.K_F6:
+                    self.show_quality = not self.show_quality
+                    self._update_overlay()
             
             if event.type == pygame.MOUSEBUTTONDOWN and self.ball.sticky:
-                self.ball.launch()
+                self.pending_launch = True
+    
+    def save_state(self) -> None:
+        """Запомнить состояние текущей игры вместе с частицами"""
+        self.saved_state = (self.sim, self.sim.snapshot(particles=True))
+    
+    def load_state(self) -> bool:
+        """Вернуться к сохраненному состоянию текущей игры"""
+        if self.saved_state is None or self.saved_state[0] is not self.sim:
+            return False
+        if self.recorder is not None:
+            # Запись ввода повторяется с начала игры и не может описать откат
+            print("Возврат к сохранению недоступен во время записи ввода")
+            return False
+        self.sim.restore(self.saved_state[1])
+        self.game_state = "game_over" if self.sim.game_over else "playing"
+        self.screen_current = False
+        self.timestep.reset()
+        self._clear_pending_input()
+        if self.renderer is not None:
+            self.renderer.invalidate()
+        return True
+    
+    def read_input(self) -> FrameInput:
+        """Собрать ввод текущего кадра для симуляции"""
+        keys = pygame.key.get_pressed()
+        inputs = FrameInput(
+            left=bool(keys[pygame.K_LEFT]),
+            right=bool(keys[pygame.K_RIGHT]),
+            launch=self.pending_launch,
+            speed_up=self.pending_speed_up,
+            speed_down=self.pending_speed_down,
+        )
+        self._clear_pending_input()
+        return inputs
     
     def update(self) -> None:
         """Обновление состояния игры"""
         if self.game_state != "playing":
             return
         
-        # Управление ракеткой
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT]:
-            self.paddle.move(-1)
-        if keys[pygame.K_RIGHT]:
-            self.paddle.move(1)
-        
-        # Если мяч прилип, двигаем его вместе с ракеткой
-        if self.ball.sticky:
-            self.ball.reset(self.paddle)
-        
-        # Обновление мяча
-        self.ball.move()
-        
-        # Проверка столкновения мяча с ракеткой
-        self.ball.check_collision(self.paddle)
-        
-        # Проверка столкновения мяча с кирпичами
-        for brick in self.bricks[:]:
-            if self.ball.active and self.ball.rect.colliderect(brick.rect):
-                destroyed, power_up_type = brick.hit()
-                
-                if destroyed:
-                    self.bricks.remove(brick)
-                    self.paddle.score += brick.max_health * 10
-                    
-                    # Создание эффекта разрушения
-                    self.spawn_particles(brick.rect.centerx, brick.rect.centery, brick.color, 15)
-                    
-                    # Создание бонуса
-                    if power_up_type:
-                        self.power_ups.append(
-                            PowerUp(brick.rect.centerx - 15, brick.rect.centery, power_up_type)
-                        )
-                
-                # Отскок мяча
-                self.ball.speed_y *= -1
-                break
+        inputs = self.input_source() if self.input_source is not None else self.read_input()
+        if self.recorder is not None:
+            self.recorder.record(inputs)
+        self.sim.step(inputs, self.step_frames)
         
-        # Обновление бонусов
-        for power_up in self.power_ups[:]:
-            power_up.move()
-            
-            if not power_up.active:
-                self.power_ups.remove(power_up)
-            elif power_up.rect.colliderect(self.paddle.rect):
-                power_up.apply(self.paddle, self.ball)
-                self.power_ups.remove(power_up)
-                
-                # Эффект подбора бонуса
-                self.spawn_particles(power_up.rect.centerx, power_up.rect.centery, 
-                                   power_up.colors[power_up.type], 8)
-        
-        # Обновление частиц
-        for particle in self.particles[:]:
-            if not particle.update():
-                self.particles.remove(particle)
-        
-        # Увеличиваем скорость с каждым уровнем
-        self.ball.speed_controller.calculate_level_speed_increase(self.ball, self.level)
-        
-        # Проверка условий завершения уровня
-        if not self.bricks:
-            self.level += 1
-            self.ball.reset(self.paddle)
-            self.create_level()
-        
-        # Проверка потери мяча
-        if not self.ball.active:
-            self.paddle.lives -= 1
-            if self.paddle.lives <= 0:
-                self.game_state = "game_over"
-            else:
-                self.ball.reset(self.paddle)
+        if self.sim.game_over:
+            self.game_state = "game_over"
+            self.save_result()
     
-    def draw(self) -> None:
-        """Отрисовка игры"""
-        self.screen.fill(BLACK)
-        
-        if self.game_state == "menu":
+    def save_result(self) -> None:
+        """Отдать итог законченной игры в таблицу рекордов (без ожидания диска)"""
+        if self.leaderboard is None:
             return
+        sim = self.sim
+        self.new_record = sim.paddle.score > self.leaderboard.best()
+        self.leaderboard.submit(GameRecord(sim.paddle.score, sim.level, self.difficulty,
+                                           self.ball_speed_setting, sim.frame,
+                                           sim.bricks_destroyed, sim.seed, time.time()))
+    
+    def draw(self, alpha: float = 1.0) -> None:
+        """Отрисовка игры и вывод кадра на экран (alpha - доля шага физики для интерполяции)"""
+        profiler = self.profiler
+        with self.sim.interpolated(alpha):
+            dirty = self._draw_frame()
+        profiler.mark("draw")
+        
+        # В режиме dirty панели рисует сам рендерер, чтобы стереть их в следующем кадре
+        if (profiler.enabled or self.show_quality) and dirty is None:
+            self._draw_overlay(self.screen)
+        
+        self.present(dirty)
+        profiler.mark("flip")
+        if self.capture is not None:
+            self.capture.capture(self.screen)
+            profiler.mark("capture")
+    
+    def render(self) -> None:
+        """Нарисовать текущее состояние в self.screen без вывода на экран"""
+        self._draw_frame()
+    
+    def present(self, dirty: Optional[List[pygame.Rect]] = None) -> None:
+        """Вывести кадр: весь экран или только перечисленные области"""
+        if dirty is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+    
+    def _draw_frame(self) -> Optional[List[pygame.Rect]]:
+        """Отрисовка текущего состояния игры.
         
-        # Отрисовка игровых объектов
-        self.paddle.draw(self.screen)
-        self.ball.draw(self.screen)
-        
-        for brick in self.bricks:
-            brick.draw(self.screen)
+        Возвращает измененные области экрана или None, если перерисован весь экран.
+        """
+        if self.renderer is not None:
+            if self.game_state == "playing":
+                return self.renderer.draw()
+            # Меню и экран окончания игры рисуются целиком
+            self.renderer.invalidate()
         
-        for power_up in self.power_ups:
-            power_up.draw(self.screen)
+        self.screen.fill(BLACK)
         
-        for particle in self.particles:
-            particle.draw(self.screen)
+        if self.game_state == "menu":
+            return None
         
-        # Отрисовка интерфейса
-        score_text = self.font.render(f"Счет: {self.paddle.score}", True, WHITE)
-        lives_text = self.font.render(f"Жизни: {self.paddle.lives}", True, WHITE)
-        level_text = self.font.render(f"Уровень: {self.level}", True, WHITE)
+        # Отрисовка игровых объектов: спрайты из атласа одним пакетным вызовом
+        self.sprites.draw(self.screen, chain((self.paddle, self.ball), self.bricks, self.power_ups))
+        self.sim.balls.draw(self.screen)
+        self.particles.draw(self.screen)
         
-        # Информация о скорости
+        # Отрисовка интерфейса (надписи перерисовываются только при изменении)
         speed_info = self.ball.speed_controller.get_current_speed_info(self.ball)
-        speed_text = self.small_font.render(f"Скорость: {speed_info['total']:.1f}", True, GRAY)
-        
-        self.screen.blit(score_text, (10, 10))
-        self.screen.blit(lives_text, (SCREEN_WIDTH - 150, 10))
-        self.screen.blit(level_text, (SCREEN_WIDTH // 2 - 60, 10))
-        self.screen.blit(speed_text, (10, SCREEN_HEIGHT - 30))
+        self.hud.update(self.paddle.score, self.paddle.lives, self.level, speed_info["total"])
+        self.hud.draw(self.screen)
         
         # Сообщения
         if self.ball.sticky:
-            message = self.small_font.render("Нажмите ПРОБЕЛ или ЛКМ для запуска мяча", True, YELLOW)
+            message = self.text.render(self.small_font, "Нажмите ПРОБЕЛ или ЛКМ для запуска мяча", YELLOW)
             self.screen.blit(message, (SCREEN_WIDTH // 2 - 180, SCREEN_HEIGHT - 60))
         
         if self.game_state == "game_over":
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            overlay.set_alpha(180)
-            overlay.fill(BLACK)
-            self.screen.blit(overlay, (0, 0))
+            self.screen.blit(self.game_over_overlay, (0, 0))
             
-            game_over_text = self.font.render("ИГРА ОКОНЧЕНА", True, RED)
-            score_text = self.font.render(f"Финальный счет: {self.paddle.score}", True, WHITE)
-            restart_text = self.small_font.render("Нажмите R для перезапуска или ESC для меню", True, YELLOW)
+            game_over_text = self.text.render(self.font, "ИГРА ОКОНЧЕНА", RED)
+            score_text = self.text.render(self.font, f"Финальный счет: {self.paddle.score}", WHITE)
+            restart_text = self.text.render(self.small_font, "Нажмите R для перезапуска или ESC для меню", YELLOW)
             
             self.screen.blit(game_over_text, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 - 50))
             self.screen.blit(score_text, (SCREEN_WIDTH // 2 - 120, SCREEN_HEIGHT // 2))
             self.screen.blit(restart_text, (SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT // 2 + 50))
-        
-        pygame.display.flip()
+            
+            if self.leaderboard is not None:
+                if self.new_record:
+                    record_text = self.text.render(self.font, "НОВЫЙ РЕКОРД!", GREEN)
+                else:
+                    record_text = self.text.render(
+                        self.small_font, f"Рекорд: {self.leaderboard.best()}", GRAY)
+                self.screen.blit(record_text, (SCREEN_WIDTH // 2 - record_text.get_width() // 2,
+                                               SCREEN_HEIGHT // 2 + 90))
+        
+        return None
+    
+    def quit(self) -> None:
+        """Завершить программу, дописав запись ввода, кадры и трассу кадров"""
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.capture is not None:
+            stats = self.capture.close()
+            print(f"Запись кадров: {self.capture.directory}, записано {stats['written']}, "
+                  f"потеряно {stats['dropped']}, пропущено {stats['skipped']}")
+        self.export_trace()
+        if self.latency_report:
+            print("\n".join(["Задержка ввода" + (" (низкая задержка)" if self.low_latency else "")]
+                            + self.latency.report()))
+        self.prebuilder.close()
+        if self.leaderboard is not None:
+            self.leaderboard.close()
+        pygame.quit()
+        sys.exit()
+    
+    def play_replay(self, path: str) -> None:
+        """Показать записанную сессию в реальном времени"""
+        for segment in read_replay(path):
+            self.sim = segment.simulation()
+            self.sim.profiler = self.profiler
+            self.apply_quality()
+            self.prebuilder.attach(self.sim)
+            self.game_state = "playing"
+            timestep = FixedTimestep(segment.dt / FPS)
+            inputs = segment.inputs()
+            elapsed = 0.0
+            finished = False
+            while not finished:
+                self.profiler.begin_frame()
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        self.quit()
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                        finished = True
+                self.profiler.mark("events")
+                for _ in range(timestep.advance(elapsed)):
+                    frame_input = next(inputs, None)
+                    if frame_input is None:
+                        finished = True
+                        break
+                    self.sim.step(frame_input, segment.dt)
+                if self.sim.game_over:
+                    self.game_state = "game_over"
+                self.draw(timestep.alpha)
+                elapsed = self.clock.tick(self.render_fps) / 1000.0
+                self.profiler.mark("idle")
+                self.profiler.end_frame()
+            
+            if segment.checksum is not None and self.sim.checksum() != segment.checksum:
+                print("Повтор разошелся с записью")
     
     def run(self) -> None:
         """Главный игровой цикл"""
         self.show_main_menu()  # Показываем меню при запуске
         
+        elapsed = 0.0
         while True:
-            self.handle_events()
-            
-            if self.game_state == "menu":
-                self.show_main_menu()
+            elapsed = self.run_frame(elapsed)
+    
+    def run_frame(self, elapsed: float) -> float:
+        """Один кадр главного цикла; возвращает время кадра для шагов физики"""
+        frame_start = time.perf_counter()
+        profiler = self.profiler
+        profiler.begin_frame()
+        # Экран окончания игры неподвижен: он нарисован один раз, и до
+        # ввода игрок ничего не увидит нового - цикл спит в ожидании событий
+        idle = self.game_state == "game_over" and self.screen_current
+        self.handle_events(block=idle)
+        if not self.low_latency:
+            self.latency.sampled()
+        profiler.mark("events")
+        
+        paced = False
+        if self.game_state == "menu":
+            self.show_main_menu()
+            self.timestep.reset()
+        elif self.game_state == "game_over":
+            if not self.screen_current:
+                self.draw()
+                self.screen_current = True
+            self.timestep.reset()
+        else:
+            waited = 0.0
+            if self.low_latency:
+                waited = self._play_late_frame()
+                paced = self.pacer.period > 0
             else:
+                for _ in range(self.timestep.advance(elapsed)):
+                    self.update()
+                self.draw(self.timestep.alpha)
+                self.latency.presented()
+            self.screen_current = False
+            # Качество подстраивается по занятому времени кадров игры
+            busy = time.perf_counter() - frame_start - waited
+            if self.quality.record(busy * 1000):
+                self.apply_quality()
+        if self.game_state != "playing":
+            # После меню и паузы отсчет темпа и задержки начинается заново
+            self.pacer.reset()
+            self.latency.reset()
+            self.step_credit = 0
+        
+        # В режиме низкой задержки кадр уже выдержан FramePacer
+        elapsed = self.clock.tick(0 if paced else self.render_fps) / 1000.0
+        if idle:
+            # Время ожидания ввода не должно попасть в шаги физики
+            elapsed = 0.0
+        profiler.mark("idle")
+        profiler.end_frame()
+        return elapsed
+    
+    def _play_late_frame(self) -> float:
+        """Кадр режима низкой задержки (latency.py); возвращает время ожидания.
+        
+        Шаги физики кадра разнесены по его периоду, перед каждым ввод
+        опрашивается заново, последний опрос - за pacer.lead до вывода.
+        Кадр без шага (физика реже кадров) все равно опрашивает ввод.
+        """
+        pacer = self.pacer
+        waited = 0.0
+        self.step_credit += self.physics_hz * (1 + pacer.begin_frame())
+        steps, self.step_credit = divmod(self.step_credit, self.render_fps)
+        polls = max(1, min(steps, self.substeps))
+        step_period = pacer.period / polls
+        # Шаги догона пропущенных кадров делаются при первом опросе
+        batch = steps - (polls - 1)
+        for poll in range(polls):
+            start = time.perf_counter()
+            pacer.wait_until_offset((polls - 1 - poll) * step_period)
+            waited += time.perf_counter() - start
+            self.profiler.mark("idle")
+            self.handle_events()
+            self.latency.sampled()
+            self.profiler.mark("events")
+            if self.game_state != "playing":
+                return waited
+            for _ in range(batch):
                 self.update()
-                self.draw()
-            
-            self.clock.tick(FPS)
\ No newline at end of file
+            batch = 1
+        self.draw()
+        pacer.end_frame(self.latency.presented())
+        return waited
@@ -1,6 +1,23 @@
 import random
 from typing import Dict, Tuple, List
 
+# Размеры экрана и частота кадров
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+FPS = 60
+
+# Цвета
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+YELLOW = (255, 255, 0)
+ORANGE = (255, 165, 0)
+PURPLE = (128, 0, 128)
+GRAY = (128, 128, 128)
+LIGHT_BLUE = (100, 100, 255)
+
 class GameConfig:
     """Класс для управления настройками игры"""
     
@@ -40,6 +57,15 @@ class GameConfig:
         "very_fast": 10
     }
     
+    # Длительность временных эффектов бонусов в кадрах (effects.py)
+    POWER_UP_DURATIONS = {
+        "expand": 900,
+        "shrink": 600,
+        "power_ball": 600,
+        "speed_boost": 300,
+        "slow_down": 300
+    }
+    
     @staticmethod
     def get_difficulty_settings(difficulty: str) -> Dict:
         """Получить настройки для выбранного уровня сложности"""
@@ -55,6 +81,9 @@ class GameConfig:
         """Получить список доступных скоростей мяча"""
         return list(GameConfig.BALL_SPEEDS.keys())
 
+# Временные эффекты бонусов, которые меняют скорость мяча
+SPEED_EFFECTS = ("speed_boost", "slow_down")
+
 class SpeedController:
     """Класс для управления скоростью мяча"""
     
@@ -63,6 +92,8 @@ class SpeedController:
         self.current_speed_multiplier = 1.0
         self.max_speed = 12
         self.min_speed = 3
+        # Планировщик временных эффектов (EffectScheduler); задает Simulation
+        self.effects = None
         
     def set_ball_speed(self, ball, speed_level: str) -> None:
         """Установить скорость мяча по уровню"""
@@ -131,8 +162,28 @@ class SpeedController:
             ball.speed_x = direction_x * new_speed * ratio_x
             ball.speed_y = direction_y * new_speed * ratio_y
     
+    def apply_timed(self, ball, key: str, factor: float, duration: int):
+        """Умножить скорость мяча на factor на duration кадров.
+        
+        Возвращает дескриптор эффекта; без планировщика изменение постоянное.
+        """
+        self._scale_ball(ball, factor)
+        if self.effects is None:
+            return None
+        return self.effects.add(key, duration, lambda: self._scale_ball(ball, 1 / factor))
+    
+    def _scale_ball(self, ball, factor: float) -> None:
+        """Умножить скорость мяча с сохранением направления"""
+        ball.speed_x *= factor
+        ball.speed_y *= factor
+    
     def reset_speed(self, ball) -> None:
         """Сбросить скорость к базовой"""
+        # Скорость сбрасывается целиком, поэтому ожидающие отмены ускорения и
+        # замедления снимаются: истекая, они пересчитали бы базовую скорость
+        if self.effects is not None:
+            for key in SPEED_EFFECTS:
+                self.effects.cancel_key(key)
         self.current_speed_multiplier = 1.0
         self._apply_speed_to_ball(ball, self.base_speed)
     
@@ -162,11 +213,11 @@ class PowerUpEffects:
     @staticmethod
     def apply_speed_boost(ball, speed_controller: SpeedController, duration: int = 300) -> Dict:
         """Применить временное ускорение мяча"""
-        speed_controller.increase_speed(ball, 1.3)
-        return {"type": "speed_boost", "duration": duration, "active": True}
+        effect = speed_controller.apply_timed(ball, "speed_boost", 1.3, duration)
+        return {"type": "speed_boost", "duration": duration, "active": True, "effect": effect}
     
     @staticmethod
     def apply_slow_down(ball, speed_controller: SpeedController, duration: int = 300) -> Dict:
         """Применить временное замедление мяча"""
-        speed_controller.decrease_speed(ball, 0.7)
-        return {"type": "slow_down", "duration": duration, "active": True}
\ No newline at end of file
+        effect = speed_controller.apply_timed(ball, "slow_down", 0.7, duration)
+        return {"type": "slow_down", "duration": duration, "active": True, "effect": effect}
\ No newline at end of file
@@ -2,33 +2,48 @@ import pygame
 import random
 import math
 from typing import List, Tuple, Optional
-from game_config import SpeedController
+from game_config import GameConfig, SpeedController
+from physics import round_like_rect
+from text_cache import text_cache
+
+# Типы бонусов; порядок важен для наборов уровней и выбора бонуса при ударе
+POWER_UP_TYPES = ["expand", "shrink", "life", "power_ball", "multi_ball"]
 
 class Paddle:
     """Класс для ракетки игрока"""
     
     def __init__(self, x: int, y: int, speed: int = 8):
         self.rect = pygame.Rect(x, y, 100, 20)
+        # Точная позиция: при мелком шаге физики сдвиг за шаг дробный
+        self.x = float(self.rect.x)
         self.speed = speed
         self.color = (0, 255, 0)  # GREEN
         self.lives = 3
         self.score = 0
     
-    def move(self, direction: int) -> None:
-        """Перемещение ракетки"""
-        self.rect.x += direction * self.speed
+    def move(self, direction: int, dt: float = 1.0) -> None:
+        """Перемещение ракетки (dt - длительность шага в кадрах)"""
+        # Ракетку сдвинули снаружи (сброс, смена размера) - позиция из rect
+        if round_like_rect(self.x) != self.rect.x:
+            self.x = float(self.rect.x)
+        self.x += direction * self.speed * dt
         
         # Ограничение движения в пределах экрана
-        if self.rect.left < 0:
-            self.rect.left = 0
-        if self.rect.right > 800:  # SCREEN_WIDTH
-            self.rect.right = 800
+        if self.x < 0:
+            self.x = 0.0
+        if self.x + self.rect.width > 800:  # SCREEN_WIDTH
+            self.x = float(800 - self.rect.width)
+        self.rect.x = round_like_rect(self.x)
     
     def draw(self, screen: pygame.Surface) -> None:
         """Отрисовка ракетки"""
         pygame.draw.rect(screen, self.color, self.rect)
         pygame.draw.rect(screen, (255, 255, 255), self.rect, 2)  # WHITE
     
+    def sprite_key(self) -> Optional[tuple]:
+        """Вид ракетки в атласе спрайтов (sprites.py)"""
+        return ("paddle", self.color, self.rect.size)
+    
     def shrink(self) -> None:
         """Уменьшение размера ракетки"""
         if self.rect.width > 50:
@@ -46,9 +61,14 @@ class Paddle:
 class Ball:
     """Класс для мяча"""
     
-    def __init__(self, x: int, y: int):
+    def __init__(self, x: int, y: int, rng: Optional[random.Random] = None):
         self.rect = pygame.Rect(x, y, 15, 15)
-        self.speed_x = 5 * random.choice([-1, 1])
+        # Источник случайности (по умолчанию общий модуль random)
+        self.rng = rng if rng is not None else random
+        # Точная позиция для непрерывной физики (rect хранит целые пиксели)
+        self.x = float(self.rect.x)
+        self.y = float(self.rect.y)
+        self.speed_x = 5 * self.rng.choice([-1, 1])
         self.speed_y = -5
         self.color = (255, 255, 255)  # WHITE
         self.active = True
@@ -56,11 +76,16 @@ class Ball:
         self.power_ball = False  # Мяч разрушает блоки за один удар
         self.speed_controller = SpeedController()
     
-    def move(self) -> None:
-        """Перемещение мяча"""
+    def move(self, dt: float = 1.0) -> None:
+        """Перемещение мяча (dt - длительность шага в кадрах)"""
         if self.active and not self.sticky:
-            self.rect.x += self.speed_x
-            self.rect.y += self.speed_y
+            if round_like_rect(self.x) != self.rect.x or round_like_rect(self.y) != self.rect.y:
+                self.x = float(self.rect.x)
+                self.y = float(self.rect.y)
+            self.x += self.speed_x * dt
+            self.y += self.speed_y * dt
+            self.rect.x = round_like_rect(self.x)
+            self.rect.y = round_like_rect(self.y)
             
             # Отскок от стен
             if self.rect.left <= 0 or self.rect.right >= 800:  # SCREEN_WIDTH
@@ -79,17 +104,29 @@ class Ball:
             pygame.draw.ellipse(screen, color, self.rect)
             pygame.draw.ellipse(screen, (255, 255, 255), self.rect, 2)  # WHITE
     
+    def sprite_key(self) -> Optional[tuple]:
+        """Вид мяча в атласе спрайтов (None - мяч не рисуется)"""
+        if not self.active:
+            return None
+        return ("ball", (255, 255, 0) if self.power_ball else self.color, self.rect.size)
+    
     def reset(self, paddle: 'Paddle') -> None:
         """Сброс мяча на ракетку"""
         self.rect.centerx = paddle.rect.centerx
         self.rect.bottom = paddle.rect.top - 5
-        self.speed_x = 5 * random.choice([-1, 1])
+        self.x = float(self.rect.x)
+        self.y = float(self.rect.y)
+        self.speed_x = 5 * self.rng.choice([-1, 1])
         self.speed_y = -5
         self.active = True
         self.sticky = True
         self.power_ball = False
         self.speed_controller.reset_speed(self)
     
+    def end_power_ball(self) -> None:
+        """Окончание эффекта силового мяча"""
+        self.power_ball = False
+    
     def launch(self) -> None:
         """Запуск мяча с ракетки"""
         if self.sticky:
@@ -115,21 +152,27 @@ class Ball:
             return True
         return False
 
-# Остальные классы Brick, PowerUp, Particle остаются без изменений
+# Остальные классы Brick, PowerUp остаются без изменений
 class Brick:
     """Класс для кирпича"""
     
-    def __init__(self, x: int, y: int, color: Tuple[int, int, int], health: int = 1):
+    def __init__(self, x: int, y: int, color: Tuple[int, int, int], health: int = 1,
+                 rng: Optional[random.Random] = None):
         self.rect = pygame.Rect(x, y, 75, 30)
+        self.rng = rng if rng is not None else random
         self.color = color
         self.health = health
         self.max_health = health
         self.power_up_chance = 0.2  # 20% шанс выпадения бонуса
+        self.power_up_types = POWER_UP_TYPES  # Таблица бонусов (повтор типа - больший вес)
+        self.handle = None  # Дескриптор в хранилище сущностей симуляции
     
-    def draw(self, screen: pygame.Surface) -> None:
-        """Отрисовка кирпича"""
+    def draw(self, screen: pygame.Surface, details: bool = True) -> None:
+        """Отрисовка кирпича (details - рамка и трещины, см. quality.py)"""
         if self.health > 0:
             pygame.draw.rect(screen, self.color, self.rect)
+            if not details:
+                return
             
             # Рисуем трещины для поврежденных кирпичей
             if self.health < self.max_health:
@@ -143,6 +186,14 @@ class Brick:
             
             pygame.draw.rect(screen, (255, 255, 255), self.rect, 2)  # WHITE
     
+    def sprite_key(self, details: bool = True) -> Optional[tuple]:
+        """Вид кирпича в атласе спрайтов (None - кирпич не рисуется)"""
+        if self.health <= 0:
+            return None
+        if not details:
+            return ("brick", self.color, None, self.rect.size)
+        return ("brick", self.color, self.health < self.max_health, self.rect.size)
+    
     def hit(self) -> Tuple[bool, Optional[str]]:
         """Обработка попадания по кирпичу"""
         self.health -= 1
@@ -150,8 +201,8 @@ class Brick:
         
         # Проверка на выпадение бонуса
         power_up = None
-        if destroyed and random.random() < self.power_up_chance:
-            power_up = random.choice(["expand", "shrink", "life", "power_ball"])
+        if destroyed and self.power_up_types and self.rng.random() < self.power_up_chance:
+            power_up = self.rng.choice(self.power_up_types)
         
         return destroyed, power_up
 
@@ -160,21 +211,27 @@ class PowerUp:
     
     def __init__(self, x: int, y: int, type: str):
         self.rect = pygame.Rect(x, y, 30, 30)
+        self.y = float(self.rect.y)
         self.type = type
         self.speed = 3
         self.active = True
+        self.handle = None  # Дескриптор в хранилище сущностей симуляции
         
         # Цвета для разных типов бонусов
         self.colors = {
             "expand": (0, 255, 0),  # GREEN
             "shrink": (255, 0, 0),  # RED
             "life": (255, 255, 0),  # YELLOW
-            "power_ball": (255, 165, 0)  # ORANGE
+            "power_ball": (255, 165, 0),  # ORANGE
+            "multi_ball": (100, 100, 255)  # LIGHT_BLUE
         }
     
-    def move(self) -> None:
-        """Перемещение бонуса"""
-        self.rect.y += self.speed
+    def move(self, dt: float = 1.0) -> None:
+        """Перемещение бонуса (dt - длительность шага в кадрах)"""
+        if round_like_rect(self.y) != self.rect.y:
+            self.y = float(self.rect.y)
+        self.y += self.speed * dt
+        self.rect.y = round_like_rect(self.y)
         if self.rect.top > 600:  # SCREEN_HEIGHT
             self.active = False
     
@@ -185,56 +242,46 @@ class PowerUp:
             pygame.draw.rect(screen, (255, 255, 255), self.rect, 2)  # WHITE
             
             # Рисуем символ бонуса
-            font = pygame.font.Font(None, 20)
+            font = text_cache.font(None, 20)
             symbols = {
                 "expand": "+",
                 "shrink": "-",
                 "life": "♥",
-                "power_ball": "★"
+                "power_ball": "★",
+                "multi_ball": "x3"
             }
-            text = font.render(symbols[self.type], True, (255, 255, 255))  # WHITE
+            text = text_cache.render(font, symbols[self.type], (255, 255, 255))  # WHITE
             text_rect = text.get_rect(center=self.rect.center)
             screen.blit(text, text_rect)
     
-    def apply(self, paddle: 'Paddle', ball: 'Ball') -> None:
-        """Применение эффекта бонуса"""
-        if self.type == "expand":
-            paddle.grow()
-        elif self.type == "shrink":
-            paddle.shrink()
+    def sprite_key(self) -> Optional[tuple]:
+        """Вид бонуса в атласе спрайтов (None - бонус не рисуется)"""
+        if not self.active:
+            return None
+        return ("power_up", self.type, self.rect.size)
+    
+    def apply(self, paddle: 'Paddle', ball: 'Ball', effects=None) -> None:
+        """Применение эффекта бонуса (мультимяч добавляет мячи в Simulation).
+        
+        С планировщиком effects (EffectScheduler) размер ракетки и силовой мяч
+        действуют POWER_UP_DURATIONS кадров, без него - до сброса.
+        """
+        durations = GameConfig.POWER_UP_DURATIONS
+        if self.type in ("expand", "shrink"):
+            # Каждый бонус отменяется отдельно; упор в предел размера не отменяется
+            width = paddle.rect.width
+            if self.type == "expand":
+                paddle.grow()
+                undo = paddle.shrink
+            else:
+                paddle.shrink()
+                undo = paddle.grow
+            if effects is not None and paddle.rect.width != width:
+                effects.add(self.type, durations[self.type], undo)
         elif self.type == "life":
             paddle.lives += 1
         elif self.type == "power_ball":
             ball.power_ball = True
-
-class Particle:
-    """Класс для частиц эффектов"""
-    
-    def __init__(self, x: int, y: int, color: Tuple[int, int, int]):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.size = random.randint(2, 5)
-        self.speed_x = random.uniform(-3, 3)
-        self.speed_y = random.uniform(-3, 3)
-        self.life = random.randint(20, 40)
-    
-    def update(self) -> bool:
-        """Обновление состояния частицы"""
-        self.x += self.speed_x
-        self.y += self.speed_y
-        self.life -= 1
-        self.size = max(0, self.size - 0.1)
-        return self.life > 0 and self.size > 0
-    
-    def draw(self, screen: pygame.Surface) -> None:
-        """Отрисовка частицы"""
-        if self.life > 0:
-            alpha = min(255, self.life * 6)
-            color_with_alpha = (*self.color, alpha)
-            
-            # Создаем поверхность с альфа-каналом
-            particle_surface = pygame.Surface((int(self.size * 2), int(self.size * 2)), pygame.SRCALPHA)
-            pygame.draw.circle(particle_surface, color_with_alpha, 
-                             (int(self.size), int(self.size)), int(self.size))
-            screen.blit(particle_surface, (int(self.x - self.size), int(self.y - self.size)))
\ No newline at end of file
+            if effects is not None:
+                effects.add("power_ball", durations["power_ball"], ball.end_power_ball,
+                            mode="refresh")
@@ -0,0 +1,59 @@
+"""Игровая панель: счет, жизни, уровень и скорость мяча.
+
+Надписи перерисовываются только тогда, когда меняются отображаемые значения;
+в остальных кадрах панель просто блитит готовые поверхности. При
+refresh_interval > 1 (уровень качества, quality.py) надписи обновляются
+не чаще раза в столько вызовов update: новое значение появится с задержкой.
+"""
+from typing import List, Optional, Tuple
+import pygame
+from game_config import SCREEN_WIDTH, SCREEN_HEIGHT, WHITE, GRAY
+from text_cache import TextCache, text_cache
+
+
+class Hud:
+    """Панель с информацией об игре"""
+
+    def __init__(self, font: pygame.font.Font, small_font: pygame.font.Font,
+                 cache: TextCache = text_cache):
+        self.font = font
+        self.small_font = small_font
+        self.cache = cache
+        self.renders = 0
+        self.refresh_interval = 1
+        self._since_render = 0
+        self._values: Optional[tuple] = None
+        self._items: List[Tuple[pygame.Surface, Tuple[int, int]]] = []
+
+    def update(self, score: int, lives: int, level: int, speed: float) -> bool:
+        """Обновить значения; возвращает True, если надписи изменились"""
+        values = (score, lives, level, f"{speed:.1f}")
+        if values == self._values:
+            return False
+        self._since_render += 1
+        if self._since_render < self.refresh_interval and self._values is not None:
+            return False
+        self._since_render = 0
+        self._values = values
+        self.renders += 1
+
+        render = self.cache.render
+        self._items = [
+            (render(self.font, f"Счет: {score}", WHITE), (10, 10)),
+            (render(self.font, f"Жизни: {lives}", WHITE), (SCREEN_WIDTH - 150, 10)),
+            (render(self.font, f"Уровень: {level}", WHITE), (SCREEN_WIDTH // 2 - 60, 10)),
+            (render(self.small_font, f"Скорость: {values[3]}", GRAY), (10, SCREEN_HEIGHT - 30)),
+        ]
+        return True
+
+    def invalidate(self) -> None:
+        """Заставить панель перерисоваться при следующем обновлении"""
+        self._values = None
+
+    def rects(self) -> List[pygame.Rect]:
+        """Области экрана, которые занимает панель"""
+        return [surface.get_rect(topleft=pos) for surface, pos in self._items]
+
+    def draw(self, screen: pygame.Surface) -> None:
+        """Вывести панель на экран"""
+        screen.blits(self._items, doreturn=False)
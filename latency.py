@@ -0,0 +1,190 @@
+"""Режим низкой задержки ввода: поздний опрос, точный темп кадров и замер задержки.
+
+Обычный цикл Game.run опрашивает события в начале кадра, затем считает
+физику, рисует и засыпает в clock.tick до следующего кадра. Нажатие,
+пришедшее во время сна, ждет начала следующего кадра, а весь кадр
+выводится уже после этого - худший случай около периода кадра плюс время
+работы кадра. clock.tick спит через SDL_Delay и ошибается на миллисекунду
+и больше.
+
+В режиме низкой задержки (--low-latency) FramePacer планирует не начало,
+а вывод кадра: кадр начинается за lead секунд до срока вывода, где lead -
+90-й перцентиль недавнего времени от опроса ввода до вывода плюс запас.
+Сон до начала - гибрид: time.sleep до последних spin секунд, дальше
+активное ожидание по perf_counter, поэтому кадр начинается с точностью до
+десятков микросекунд. Если шагов физики за кадр несколько
+(--physics-hz больше частоты кадров), они разносятся по периоду кадра и
+перед каждым ввод опрашивается заново: ракетка движется под кадром
+несколькими шагами по свежему вводу, а последний опрос отстоит от вывода
+только на шаг физики и отрисовку. Частоты не обязаны делиться нацело:
+шаги копятся целочисленно (Game.step_credit), и кадр делает то 1, то 2
+шага при 100 Гц и 60 кадрах или шаг через кадр при 30 Гц. Отдельные шаги
+только для ракетки не годятся: ввод шагов симуляции пишется в повтор
+(replay.py) и должен полностью описывать игру.
+
+LatencyStats пишет для каждого выведенного кадра две гистограммы:
+    age   - возраст последнего опроса ввода к моменту вывода (лучший случай);
+    worst - время от предыдущего опроса до вывода: нажатие сразу после
+            предыдущего опроса попадает на экран только сейчас.
+Сводка печатается при выходе (--latency-report) и в python benchmark.py latency.
+"""
+import time
+from typing import Dict, List, Optional
+
+# Последние секунды ожидания проходят в активном цикле, а не в time.sleep
+SPIN_SECONDS = 0.0015
+# Запас к оценке времени от опроса до вывода
+LEAD_MARGIN = 0.0005
+# Сколько пропущенных кадров догонять шагами физики; дольше - пауза, не догоняем
+MAX_CATCHUP = 2
+
+
+def precise_sleep_until(deadline: float, spin: float = SPIN_SECONDS) -> None:
+    """Ждать момента perf_counter: сон, затем активное ожидание"""
+    remaining = deadline - time.perf_counter()
+    if remaining > spin:
+        time.sleep(remaining - spin)
+    while time.perf_counter() < deadline:
+        pass
+
+
+class FramePacer:
+    """Темп кадров по сроку вывода с поздним началом кадра"""
+
+    def __init__(self, fps: int, window: int = 60, spin: float = SPIN_SECONDS):
+        self.period = 1.0 / fps if fps > 0 else 0.0
+        self.spin = spin
+        self.present_deadline = time.perf_counter()
+        self._work = [0.0] * window
+        self._work_count = 0
+        self.lead = LEAD_MARGIN
+        self.missed = 0
+
+    def begin_frame(self) -> int:
+        """Назначить срок вывода кадра; возвращает число пропущенных кадров для догона"""
+        now = time.perf_counter()
+        self.present_deadline += self.period
+        late = 0
+        if self.period and now + self.lead > self.present_deadline:
+            late = int((now + self.lead - self.present_deadline) // self.period)
+            self.missed += late
+            # Не успеваем к сроку: следующий срок от текущего момента
+            self.present_deadline = now + self.lead
+        return late if late <= MAX_CATCHUP else 0
+
+    def wait_until_offset(self, offset: float) -> None:
+        """Ждать момента за lead + offset секунд до срока вывода"""
+        if self.period:
+            precise_sleep_until(self.present_deadline - self.lead - offset, self.spin)
+
+    def end_frame(self, work: float) -> None:
+        """Учесть время от последнего опроса ввода до вывода"""
+        window = len(self._work)
+        self._work[self._work_count % window] = work
+        self._work_count += 1
+        recent = sorted(self._work[:min(self._work_count, window)])
+        self.lead = recent[int(0.9 * (len(recent) - 1))] + LEAD_MARGIN
+
+    def reset(self) -> None:
+        """Начать отсчет сроков заново (после меню или паузы)"""
+        self.present_deadline = time.perf_counter()
+
+
+class LatencyHistogram:
+    """Гистограмма задержек с корзинами фиксированной ширины"""
+
+    def __init__(self, bucket_ms: float = 0.25, max_ms: float = 100.0):
+        self.bucket_ms = bucket_ms
+        self.counts = [0] * (int(max_ms / bucket_ms) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float) -> None:
+        self.counts[min(len(self.counts) - 1, int(ms / self.bucket_ms))] += 1
+        self.total += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        """Верхняя граница корзины, в которую попадает перцентиль q"""
+        if not self.total:
+            return 0.0
+        rank = q / 100 * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return (index + 1) * self.bucket_ms
+        return self.max_ms
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "frames": self.total,
+            "mean": self.sum_ms / self.total if self.total else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max_ms,
+        }
+
+    def bars(self, width: int = 40, rows: int = 12) -> List[str]:
+        """Текстовые столбцы гистограммы, корзины укрупнены до rows строк"""
+        used = [i for i, count in enumerate(self.counts) if count]
+        if not used:
+            return []
+        first, last = used[0], used[-1]
+        step = max(1, (last - first + rows) // rows)
+        groups = [(start, sum(self.counts[start:start + step]))
+                  for start in range(first, last + 1, step)]
+        peak = max(count for _, count in groups)
+        lines = []
+        for start, count in groups:
+            low = start * self.bucket_ms
+            high = (start + step) * self.bucket_ms
+            bar = "#" * max(1 if count else 0, round(count / peak * width))
+            lines.append(f"{low:6.2f}-{high:6.2f} мс {count:>6} {bar}")
+        return lines
+
+
+class LatencyStats:
+    """Задержка от опроса ввода до вывода кадра"""
+
+    def __init__(self):
+        self.age = LatencyHistogram()
+        self.worst = LatencyHistogram()
+        self.last_sample: Optional[float] = None
+        self._previous_sample: Optional[float] = None
+
+    def sampled(self) -> None:
+        """Ввод опрошен (события разобраны, состояние клавиш обновлено)"""
+        self._previous_sample = self.last_sample
+        self.last_sample = time.perf_counter()
+
+    def presented(self) -> float:
+        """Кадр выведен; возвращает возраст последнего опроса в секундах"""
+        now = time.perf_counter()
+        if self.last_sample is None:
+            return 0.0
+        age = now - self.last_sample
+        self.age.record(age * 1000)
+        if self._previous_sample is not None:
+            self.worst.record((now - self._previous_sample) * 1000)
+        return age
+
+    def reset(self) -> None:
+        """Забыть опросы: после меню или паузы задержка не показательна"""
+        self.last_sample = None
+        self._previous_sample = None
+
+    def report(self) -> List[str]:
+        """Строки сводки для печати"""
+        lines = []
+        for name, histogram in (("опрос -> вывод", self.age),
+                                ("худший случай", self.worst)):
+            s = histogram.summary()
+            lines.append(f"{name}: кадров {s['frames']}, среднее {s['mean']:.2f} мс, "
+                         f"p50 {s['p50']:.2f}, p95 {s['p95']:.2f}, p99 {s['p99']:.2f}, "
+                         f"макс {s['max']:.2f} мс")
+            lines.extend("  " + line for line in histogram.bars())
+        return lines
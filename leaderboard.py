@@ -0,0 +1,238 @@
+"""Таблица рекордов и статистика игр в SQLite без задержек в игровом цикле.
+
+Каждая законченная игра (счет, достигнутый уровень, сложность, скорость
+мяча, кадры, разрушенные кирпичи, зерно) записывается в базу вместе с
+номером сеанса - одного запуска программы. Запись на диск (и fsync при
+фиксации транзакции) заняла бы в игровом цикле миллисекунды, поэтому
+Game только кладет запись в очередь (около микросекунды), а базу ведет
+отдельный поток:
+    - записи, пришедшие за flush_delay секунд, пишутся одной транзакцией;
+    - журнал WAL с synchronous=NORMAL: фиксация не ждет fsync, а читатели
+      не блокируют писателя (можно смотреть таблицу командой ниже во
+      время игры);
+    - после записи поток сам перечитывает лучшие результаты и подменяет
+      кэш; меню берет из кэша готовый список и перерисовывается по событию
+      UPDATED_EVENT, которое поток кладет в очередь pygame.
+Главный поток с соединением SQLite не работает вовсе.
+
+Просмотр: python leaderboard.py arkanoid_scores.db [--sessions N]
+"""
+import argparse
+import queue
+import sqlite3
+import threading
+import time
+from typing import List, NamedTuple, Optional
+import pygame
+
+# Событие pygame: кэш таблицы рекордов обновлен
+UPDATED_EVENT = pygame.event.custom_type()
+# Сколько записей писать одной транзакцией не больше
+MAX_BATCH = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    games INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    finished_at REAL NOT NULL,
+    score INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    difficulty TEXT NOT NULL,
+    ball_speed TEXT NOT NULL,
+    frames INTEGER NOT NULL,
+    bricks INTEGER NOT NULL,
+    seed INTEGER
+);
+CREATE INDEX IF NOT EXISTS games_by_score ON games(score DESC);
+"""
+
+
+class GameRecord(NamedTuple):
+    """Итог одной игры"""
+    score: int
+    level: int
+    difficulty: str
+    ball_speed: str
+    frames: int
+    bricks: int
+    seed: Optional[int]
+    finished_at: float
+
+
+class ScoreEntry(NamedTuple):
+    """Строка таблицы рекордов"""
+    score: int
+    level: int
+    difficulty: str
+    ball_speed: str
+    finished_at: float
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Открыть базу в режиме WAL и создать таблицы"""
+    conn = sqlite3.connect(path, timeout=5.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def read_top(conn: sqlite3.Connection, size: int) -> List[ScoreEntry]:
+    """Лучшие результаты по убыванию счета"""
+    rows = conn.execute("SELECT score, level, difficulty, ball_speed, finished_at FROM games "
+                        "ORDER BY score DESC, finished_at LIMIT ?", (size,))
+    return [ScoreEntry(*row) for row in rows]
+
+
+class Leaderboard:
+    """Таблица рекордов с фоновым писателем и кэшем для меню"""
+
+    def __init__(self, path: str, size: int = 10, flush_delay: float = 0.5):
+        self.path = path
+        self.size = size
+        self.flush_delay = flush_delay
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        # Кэш для главного потока: список подменяется целиком
+        self._top: List[ScoreEntry] = []
+        self.version = 0
+        # Лучший из отданных писателю счетов: кэш может еще не успеть обновиться
+        self._submitted_best = 0
+        self.error: Optional[str] = None
+
+        self.submitted = 0
+        self.written = 0
+        self.batches = 0
+        self.write_time = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="leaderboard", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: GameRecord) -> None:
+        """Отдать итог игры писателю; не обращается к диску"""
+        self.submitted += 1
+        self._submitted_best = max(self._submitted_best, record.score)
+        self._queue.put(("game", record))
+
+    def refresh(self) -> None:
+        """Перечитать таблицу рекордов в фоне"""
+        self._queue.put(("refresh", None))
+
+    def top(self) -> List[ScoreEntry]:
+        """Лучшие результаты из кэша (последнее прочитанное потоком)"""
+        return self._top
+
+    def best(self) -> int:
+        """Лучший счет из кэша и еще не записанных игр (0, если игр нет)"""
+        top = self._top
+        return max(top[0].score if top else 0, self._submitted_best)
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Дописать очередь, закрыть сеанс и остановить поток"""
+        self._queue.put(("close", None))
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        """Счетчики писателя"""
+        return {"submitted": self.submitted, "written": self.written, "batches": self.batches,
+                "write_ms": self.write_time * 1000, "error": self.error}
+
+    def _run(self) -> None:
+        try:
+            conn = connect(self.path)
+            with conn:
+                session = conn.execute("INSERT INTO sessions (started_at) VALUES (?)",
+                                       (time.time(),)).lastrowid
+            top = read_top(conn, self.size)
+        except sqlite3.Error as error:
+            self._fail(error)
+            return
+        self._publish(top)
+
+        closing = False
+        while not closing:
+            batch = [self._queue.get()]
+            # Записи, пришедшие следом, попадают в ту же транзакцию
+            deadline = time.monotonic() + self.flush_delay
+            while batch[-1][0] != "close" and len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            closing = batch[-1][0] == "close"
+            games = [record for kind, record in batch if kind == "game"]
+            try:
+                start = time.perf_counter()
+                with conn:
+                    if games:
+                        conn.executemany(
+                            "INSERT INTO games (session_id, finished_at, score, level, difficulty, "
+                            "ball_speed, frames, bricks, seed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            [(session, r.finished_at, r.score, r.level, r.difficulty,
+                              r.ball_speed, r.frames, r.bricks, r.seed) for r in games])
+                        conn.execute("UPDATE sessions SET games = games + ? WHERE id = ?",
+                                     (len(games), session))
+                    if closing:
+                        conn.execute("UPDATE sessions SET ended_at = ? WHERE id = ?",
+                                     (time.time(), session))
+                if games:
+                    self.write_time += time.perf_counter() - start
+                    self.written += len(games)
+                    self.batches += 1
+                if not closing:
+                    self._publish(read_top(conn, self.size))
+            except sqlite3.Error as error:
+                self._fail(error)
+                break
+        conn.close()
+
+    def _publish(self, top: List[ScoreEntry]) -> None:
+        """Подменить кэш и разбудить меню"""
+        self._top = top
+        self.version += 1
+        try:
+            pygame.event.post(pygame.event.Event(UPDATED_EVENT))
+        except pygame.error:
+            # Видеосистема не инициализирована (безголовый запуск) - будить некого
+            pass
+
+    def _fail(self, error: sqlite3.Error) -> None:
+        self.error = str(error)
+        print(f"Таблица рекордов {self.path} недоступна: {error}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Таблица рекордов и статистика сеансов")
+    parser.add_argument("path", nargs="?", default="arkanoid_scores.db")
+    parser.add_argument("--top", type=int, default=10, help="сколько лучших результатов показать")
+    parser.add_argument("--sessions", type=int, default=5, help="сколько последних сеансов показать")
+    args = parser.parse_args()
+
+    conn = connect(args.path)
+    print("Рекорды:")
+    for place, entry in enumerate(read_top(conn, args.top), 1):
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.finished_at))
+        print(f"{place:>3}. {entry.score:>8}  уровень {entry.level:>3}  "
+              f"{entry.difficulty}/{entry.ball_speed}  {when}")
+    print("Сеансы:")
+    rows = conn.execute(
+        "SELECT s.id, s.started_at, s.ended_at, s.games, MAX(g.score), MAX(g.level), "
+        "GROUP_CONCAT(DISTINCT g.difficulty), GROUP_CONCAT(DISTINCT g.ball_speed) "
+        "FROM sessions s LEFT JOIN games g ON g.session_id = s.id "
+        "GROUP BY s.id ORDER BY s.id DESC LIMIT ?", (args.sessions,))
+    for session, started, ended, games, best, level, difficulties, speeds in rows:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(started))
+        length = f"{(ended - started) / 60:.0f} мин" if ended else "не закрыт"
+        print(f"  #{session} {when} ({length}): игр {games}, лучший счет {best or 0}, "
+              f"макс. уровень {level or 0}, сложность {difficulties or '-'}, "
+              f"скорость {speeds or '-'}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""Наборы уровней: компактный двоичный формат, ленивое чтение через mmap.
+
+Уровни пишутся в текстовом формате и собираются в двоичный набор командой
+    python level_pack.py build levels/classic.txt levels/classic.arkl
+
+LevelPack открывает набор через mmap и при открытии читает только заголовок,
+палитру и таблицу смещений. Уровень N декодируется при обращении к нему,
+поэтому время запуска и память не зависят от числа и размера уровней.
+
+Двоичный формат (little-endian):
+    b"ARKLVL", версия (u8), число уровней (u32), число цветов палитры (u8),
+    палитра: RGB по 3 байта, таблица смещений: u32 на уровень.
+    Уровень:
+        столбцы, строки (u8, u8), шаг сетки (u16, u16), начало сетки (i16, i16),
+        размер кирпича (u16, u16), шанс бонуса в процентах (u8),
+        длина названия (u8) + utf-8,
+        число бонусов в таблице (u8) + номер типа бонуса (u8) на каждый,
+        ячейки построчно: байт на ячейку, старшие 4 бита - прочность
+        (0 - пусто), младшие 4 бита - номер цвета в палитре.
+
+Текстовый формат:
+    # комментарий
+    color R 255 0 0           # цвет палитры: буква и RGB
+    level Название            # начало уровня
+    step 80 40                # шаг сетки (по умолчанию 80 40)
+    origin 15 50              # левый верхний угол сетки (по умолчанию 15 50)
+    brick 75 30               # размер кирпича (по умолчанию 75 30)
+    chance 0.2                # шанс выпадения бонуса (по умолчанию 0.2)
+    power_ups expand life     # таблица бонусов; повтор типа увеличивает его вес
+    R1 R1 .. O2               # строки сетки: буква цвета + прочность, ".." - пусто
+    end
+"""
+import argparse
+import mmap
+import struct
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from game_objects import Brick, POWER_UP_TYPES
+from spatial_grid import BrickGrid
+
+MAGIC = b"ARKLVL"
+VERSION = 1
+HEADER = struct.Struct("<6sBIB")
+LEVEL_HEADER = struct.Struct("<BBHHhhHHB")
+MAX_HEALTH = 15
+MAX_COLORS = 16
+
+
+class LevelData(NamedTuple):
+    """Декодированный уровень набора"""
+    name: str
+    cols: int
+    rows: int
+    step: Tuple[int, int]
+    origin: Tuple[int, int]
+    brick_size: Tuple[int, int]
+    power_up_chance: float
+    power_ups: List[str]
+    cells: bytes
+    palette: List[Tuple[int, int, int]]
+
+    def bricks(self, rng=None, bonus_health: int = 0) -> List[Brick]:
+        """Кирпичи уровня построчно (прочность увеличивается на bonus_health)"""
+        step_x, step_y = self.step
+        origin_x, origin_y = self.origin
+        width, height = self.brick_size
+        bricks = []
+        for i, cell in enumerate(self.cells):
+            if cell >> 4 == 0:
+                continue
+            row, col = divmod(i, self.cols)
+            brick = Brick(origin_x + col * step_x, origin_y + row * step_y,
+                          self.palette[cell & 0x0F], (cell >> 4) + bonus_health, rng)
+            if (width, height) != (75, 30):
+                brick.rect.size = (width, height)
+            brick.power_up_chance = self.power_up_chance
+            brick.power_up_types = self.power_ups
+            bricks.append(brick)
+        return bricks
+
+    def grid(self) -> BrickGrid:
+        """Пустой индекс столкновений с ячейкой по шагу сетки уровня"""
+        return BrickGrid(self.step[0], self.step[1], origin=self.origin)
+
+
+class LevelPack:
+    """Набор уровней, открытый через mmap"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, colors = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path}: не набор уровней арканоида или устаревшая версия")
+        if count == 0:
+            self.close()
+            raise ValueError(f"{path}: в наборе нет ни одного уровня")
+        pos = HEADER.size
+        raw = self._data[pos:pos + colors * 3]
+        self.palette = [tuple(raw[i:i + 3]) for i in range(0, len(raw), 3)]
+        pos += colors * 3
+        self._offsets = struct.unpack_from(f"<{count}I", self._data, pos)
+        self._cache: Optional[Tuple[int, LevelData]] = None
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __enter__(self) -> "LevelPack":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Закрыть файл набора"""
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def level(self, number: int) -> LevelData:
+        """Уровень по номеру (с нуля); декодируется только он"""
+        if self._cache is not None and self._cache[0] == number:
+            return self._cache[1]
+        data = self._data
+        pos = self._offsets[number]
+        (cols, rows, step_x, step_y, origin_x, origin_y,
+         width, height, chance) = LEVEL_HEADER.unpack_from(data, pos)
+        pos += LEVEL_HEADER.size
+        name_length = data[pos]
+        name = data[pos + 1:pos + 1 + name_length].decode("utf-8")
+        pos += 1 + name_length
+        table_length = data[pos]
+        power_ups = [POWER_UP_TYPES[i] for i in data[pos + 1:pos + 1 + table_length]]
+        pos += 1 + table_length
+        level = LevelData(name, cols, rows, (step_x, step_y), (origin_x, origin_y),
+                          (width, height), chance / 100, power_ups,
+                          data[pos:pos + cols * rows], self.palette)
+        self._cache = (number, level)
+        return level
+
+
+def parse_text(text: str, source: str = "<text>") -> Tuple[List[Tuple[int, int, int]], List[dict]]:
+    """Разобрать текстовый формат: палитра и описания уровней"""
+    palette: List[Tuple[int, int, int]] = []
+    letters: Dict[str, int] = {}
+    levels: List[dict] = []
+    level: Optional[dict] = None
+
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        where = f"{source}:{number}"
+        word, _, rest = line.partition(" ")
+        args = rest.split()
+
+        if level is None:
+            if word == "color":
+                if len(args) != 4 or len(args[0]) != 1:
+                    raise ValueError(f"{where}: ожидается color <буква> R G B")
+                if len(palette) >= MAX_COLORS:
+                    raise ValueError(f"{where}: в палитре не больше {MAX_COLORS} цветов")
+                letters[args[0]] = len(palette)
+                palette.append(tuple(int(v) for v in args[1:]))
+            elif word == "level":
+                level = {"name": rest.strip(), "step": (80, 40), "origin": (15, 50),
+                         "brick": (75, 30), "chance": 0.2,
+                         "power_ups": list(POWER_UP_TYPES), "rows": []}
+            else:
+                raise ValueError(f"{where}: неизвестная команда {word!r}")
+            continue
+
+        if word == "end":
+            if not level["rows"]:
+                raise ValueError(f"{where}: уровень {level['name']!r} без кирпичей")
+            levels.append(level)
+            level = None
+        elif word in ("step", "origin", "brick"):
+            level[word] = (int(args[0]), int(args[1]))
+        elif word == "chance":
+            level["chance"] = float(args[0])
+        elif word == "power_ups":
+            unknown = [name for name in args if name not in POWER_UP_TYPES]
+            if unknown:
+                raise ValueError(f"{where}: неизвестные бонусы {unknown}")
+            level["power_ups"] = args
+        else:
+            row = []
+            for token in line.split():
+                if set(token) == {"."}:
+                    row.append(0)
+                    continue
+                letter, health = token[0], token[1:]
+                if letter not in letters or not health.isdigit():
+                    raise ValueError(f"{where}: ячейка {token!r} - нужна буква цвета и прочность")
+                if not 1 <= int(health) <= MAX_HEALTH:
+                    raise ValueError(f"{where}: прочность от 1 до {MAX_HEALTH}")
+                row.append(int(health) << 4 | letters[letter])
+            level["rows"].append(row)
+
+    if level is not None:
+        raise ValueError(f"{source}: уровень {level['name']!r} не закрыт командой end")
+    return palette, levels
+
+
+def encode_pack(palette: List[Tuple[int, int, int]], levels: List[dict]) -> bytes:
+    """Собрать двоичный набор из разобранных уровней"""
+    records = []
+    for level in levels:
+        cols = max(len(row) for row in level["rows"])
+        rows = len(level["rows"])
+        if cols > 255 or rows > 255:
+            raise ValueError(f"уровень {level['name']!r}: сетка больше 255x255")
+        out = bytearray(LEVEL_HEADER.pack(cols, rows, *level["step"], *level["origin"],
+                                          *level["brick"], round(level["chance"] * 100)))
+        name = level["name"].encode("utf-8")[:255]
+        out.append(len(name))
+        out += name
+        out.append(len(level["power_ups"]))
+        out += bytes(POWER_UP_TYPES.index(kind) for kind in level["power_ups"])
+        for row in level["rows"]:
+            out += bytes(row) + bytes(cols - len(row))
+        records.append(bytes(out))
+
+    header = bytearray(HEADER.pack(MAGIC, VERSION, len(records), len(palette)))
+    for color in palette:
+        header += bytes(color)
+    offset = len(header) + 4 * len(records)
+    offsets = []
+    for record in records:
+        offsets.append(offset)
+        offset += len(record)
+    header += struct.pack(f"<{len(records)}I", *offsets)
+    return bytes(header) + b"".join(records)
+
+
+def build(source: str, target: str) -> int:
+    """Собрать набор из текстового файла, вернуть число уровней"""
+    with open(source, encoding="utf-8") as f:
+        palette, levels = parse_text(f.read(), source)
+    if not levels:
+        raise ValueError(f"{source}: в наборе нет ни одного уровня")
+    with open(target, "wb") as f:
+        f.write(encode_pack(palette, levels))
+    return len(levels)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Наборы уровней арканоида")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="собрать двоичный набор из текста")
+    build_parser.add_argument("source")
+    build_parser.add_argument("target")
+    info_parser = sub.add_parser("info", help="список уровней набора")
+    info_parser.add_argument("pack")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build(args.source, args.target)
+        print(f"{args.target}: {count} уровней")
+    else:
+        with LevelPack(args.pack) as pack:
+            for number in range(len(pack)):
+                level = pack.level(number)
+                bricks = sum(1 for cell in level.cells if cell >> 4)
+                print(f"{number + 1:>4}  {level.name:<24} {level.cols}x{level.rows}, "
+                      f"{bricks} кирпичей, бонус {level.power_up_chance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,85 @@
+import argparse
 import pygame
 from game import Game
+from replay import run_headless
+from level_pack import LevelPack
+from quality import MODES as QUALITY_MODES
 
 def main():
     """Основная функция запуска игры"""
+    parser = argparse.ArgumentParser(description="Арканоид")
+    parser.add_argument("--renderer", choices=["full", "dirty"], default="full",
+                        help="полная перерисовка кадра или только измененных областей")
+    parser.add_argument("--physics-hz", type=int, default=60,
+                        help="частота шагов физики")
+    parser.add_argument("--render-fps", type=int, default=60,
+                        help="ограничение частоты отрисовки (0 - без ограничения)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="зерно случайных чисел сессии")
+    parser.add_argument("--record", metavar="ФАЙЛ",
+                        help="записывать ввод игрока для точного повтора")
+    parser.add_argument("--replay", metavar="ФАЙЛ",
+                        help="повторить записанную сессию")
+    parser.add_argument("--headless", action="store_true",
+                        help="повтор без окна с максимальной скоростью")
+    parser.add_argument("--profile", action="store_true",
+                        help="включить профилировщик кадра (F3 - график, F4 - сохранить трассу)")
+    parser.add_argument("--trace", metavar="ФАЙЛ", default="frame_trace.json",
+                        help="файл трассы Chrome Trace Event для F4 и выхода из игры")
+    parser.add_argument("--chaos", type=int, default=0, metavar="N",
+                        help="режим хаоса: при запуске мяча вылетает N мячей")
+    parser.add_argument("--levels", metavar="ФАЙЛ",
+                        help="набор уровней (python level_pack.py build ...)")
+    parser.add_argument("--capture", metavar="ПАПКА",
+                        help="записывать выведенные кадры в папку в фоновом потоке")
+    parser.add_argument("--capture-format", choices=["raw", "png"], default="raw",
+                        help="raw - один файл rgb24 для ffmpeg, png - файл на кадр")
+    parser.add_argument("--capture-policy", choices=["drop", "throttle"], default="drop",
+                        help="при отставании диска пропускать кадры или прореживать запись")
+    parser.add_argument("--quality", choices=QUALITY_MODES, default="auto",
+                        help="уровень качества эффектов: auto - по времени кадров (F6 - сводка)")
+    parser.add_argument("--low-latency", action="store_true",
+                        help="поздний опрос ввода и точный темп кадров; с --physics-hz "
+                             "больше частоты кадров шаги физики разносятся по кадру")
+    parser.add_argument("--latency-report", action="store_true",
+                        help="напечатать при выходе гистограммы задержки от ввода до вывода")
+    parser.add_argument("--scores", metavar="ФАЙЛ", default="arkanoid_scores.db",
+                        help="база SQLite с рекордами и статистикой игр")
+    parser.add_argument("--no-scores", action="store_true",
+                        help="не сохранять результаты игр")
+    args = parser.parse_args()
+    
+    if args.replay and args.headless:
+        replay_headless(args.replay)
+        return
+    
     # Инициализация Pygame
     pygame.init()
     
     # Создание и запуск игры
-    game = Game()
-    game.run()
+    level_pack = LevelPack(args.levels) if args.levels else None
+    game = Game(render_mode=args.renderer, physics_hz=args.physics_hz,
+                render_fps=args.render_fps, seed=args.seed, record_path=args.record,
+                profile=args.profile, trace_path=args.trace, chaos_balls=args.chaos,
+                level_pack=level_pack, capture_dir=args.capture,
+                capture_format=args.capture_format, capture_policy=args.capture_policy,
+                quality=args.quality, low_latency=args.low_latency,
+                latency_report=args.latency_report,
+                scores_path=None if args.no_scores or args.replay else args.scores)
+    if args.replay:
+        game.play_replay(args.replay)
+        game.quit()
+    else:
+        game.run()
+
+def replay_headless(path: str) -> None:
+    """Повтор записи без окна с отчетом о скорости и совпадении"""
+    for number, result in enumerate(run_headless(path), 1):
+        status = {True: "совпадает", False: "РАСХОДИТСЯ", None: "нет контрольной суммы"}
+        speed = result.frames / result.elapsed if result.elapsed > 0 else 0.0
+        print(f"игра {number}: {result.frames} кадров за {result.elapsed:.3f} с "
+              f"({speed:,.0f} кадров/с), счет {result.score}, уровень {result.level}, "
+              f"состояние {status[result.matches]}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
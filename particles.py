@@ -0,0 +1,192 @@
+"""Система частиц на массивах NumPy (struct-of-arrays).
+
+Все живые частицы лежат в начале массивов фиксированной емкости: x, y, vx,
+vy, size, life и индекс цвета в палитре. Обновление выполняется
+векторно, умершие частицы вытесняются сжатием массивов без выделения
+памяти под объекты. Отрисовка берет готовые спрайты кругов из кэша по ключу
+(цвет, радиус, корзина прозрачности) и выводит их одним вызовом Surface.blits.
+
+Производительность (python benchmark.py particles, фиктивный видеодрайвер SDL):
+50 000 живых частиц - update около 1 мс, draw около 40 мс на кадр (прежние
+объекты Particle: около 380 мс и 220 мс). Цель "50 000 частиц при 60
+кадрах/с" достигнута только для update: draw не укладывается в кадр втрое.
+Время draw - накладные расходы на каждую частицу, а не пиксели: около 7 мс
+уходит на сборку последовательности для blits (кортежи Python), остальное -
+сам Surface.blits, около 0.35 мкс на спрайт даже за краем экрана. Поэтому
+частицы за краем отбрасываются до сборки. Смешивание пикселей на NumPy
+(выборка кругов по трафаретам и таблица смешивания) проверено и медленнее:
+около миллиона пикселей за кадр дают большие временные массивы. В кадр
+помещается около 15 000 частиц (draw около 10 мс); в игре число частиц
+ограничивает регулятор качества (quality.py).
+"""
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pygame
+
+# Число градаций прозрачности в кэше спрайтов
+ALPHA_BUCKETS = 16
+MAX_RADIUS = 5
+
+
+class ParticleSystem:
+    """Частицы эффектов фиксированной емкости"""
+
+    def __init__(self, capacity: int = 65536, rng: Optional[np.random.Generator] = None):
+        self.capacity = capacity
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.count = 0
+        # Бюджеты уровня качества (quality.py): доля частиц и доля времени жизни
+        self.spawn_scale = 1.0
+        self.life_scale = 1.0
+
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int16)
+        self.color = np.zeros(capacity, dtype=np.uint8)
+
+        # Палитра цветов: цвет -> индекс и обратно
+        self.palette: List[Tuple[int, int, int]] = []
+        self._palette_index: Dict[Tuple[int, int, int], int] = {}
+
+        self._sprites: List[Optional[pygame.Surface]] = []
+        self._sprite_table = np.empty(0, dtype=object)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self) -> None:
+        """Удалить все частицы"""
+        self.count = 0
+
+    def snapshot(self) -> tuple:
+        """Копия живых частиц и состояния генератора для Simulation.snapshot"""
+        n = self.count
+        arrays = tuple(array[:n].copy() for array in
+                       (self.x, self.y, self.vx, self.vy, self.size, self.life, self.color))
+        return n, arrays, self.rng.bit_generator.state
+
+    def restore(self, state: tuple) -> None:
+        """Вернуть частицы из snapshot() (палитра только растет, индексы цветов верны)"""
+        n, arrays, rng_state = state
+        for array, saved in zip((self.x, self.y, self.vx, self.vy, self.size, self.life,
+                                 self.color), arrays):
+            array[:n] = saved
+        self.count = n
+        self.rng.bit_generator.state = rng_state
+
+    def _color_index(self, color: Tuple[int, int, int]) -> int:
+        """Индекс цвета в палитре (новый цвет добавляется)"""
+        color = tuple(color)
+        index = self._palette_index.get(color)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(color)
+            self._palette_index[color] = index
+        return index
+
+    def spawn(self, x: float, y: float, color: Tuple[int, int, int], count: int = 10) -> int:
+        """Создать частицы в точке; при переполнении лишние отбрасываются"""
+        start = self.count
+        if self.spawn_scale != 1.0:
+            count = int(count * self.spawn_scale + 0.5)
+        count = min(count, self.capacity - start)
+        if count <= 0:
+            return 0
+        end = start + count
+        rng = self.rng
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.vx[start:end] = rng.uniform(-3, 3, count)
+        self.vy[start:end] = rng.uniform(-3, 3, count)
+        self.size[start:end] = rng.integers(2, 6, count)
+        self.life[start:end] = rng.integers(20, 41, count)
+        if self.life_scale != 1.0:
+            self.life[start:end] = np.maximum(1, self.life[start:end] * self.life_scale)
+        self.color[start:end] = self._color_index(color)
+        self.count = end
+        return count
+
+    def update(self) -> None:
+        """Обновить все частицы и сжать массивы, убрав умершие"""
+        n = self.count
+        if n == 0:
+            return
+        x, y, size, life = self.x[:n], self.y[:n], self.size[:n], self.life[:n]
+        x += self.vx[:n]
+        y += self.vy[:n]
+        life -= 1
+        np.maximum(size - 0.1, 0, out=size)
+
+        alive = (life > 0) & (size > 0)
+        live_count = int(np.count_nonzero(alive))
+        if live_count != n:
+            for array in (self.x, self.y, self.vx, self.vy, self.size, self.life, self.color):
+                array[:live_count] = array[:n][alive]
+            self.count = live_count
+
+    def _sprite_key_count(self) -> int:
+        return len(self.palette) * (MAX_RADIUS + 1) * ALPHA_BUCKETS
+
+    def _build_sprite(self, key: int) -> Optional[pygame.Surface]:
+        """Отрисовать круг для ключа кэша"""
+        color_index, rest = divmod(key, (MAX_RADIUS + 1) * ALPHA_BUCKETS)
+        radius, bucket = divmod(rest, ALPHA_BUCKETS)
+        if radius == 0 or bucket == 0:
+            return None
+        color = self.palette[color_index]
+        colorkey = (0, 0, 0) if color != (0, 0, 0) else (255, 255, 255)
+
+        # Поверхность с цветовым ключом и общей прозрачностью: RLE-блит
+        # такого спрайта почти вдвое быстрее попиксельной альфы
+        sprite = pygame.Surface((radius * 2, radius * 2))
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()
+        sprite.fill(colorkey)
+        pygame.draw.circle(sprite, color, (radius, radius), radius)
+        sprite.set_colorkey(colorkey, pygame.RLEACCEL)
+        alpha = min(255, (bucket * 256 + 128) // ALPHA_BUCKETS)
+        sprite.set_alpha(alpha, pygame.RLEACCEL)
+        return sprite
+
+    def _ensure_sprites(self) -> None:
+        """Достроить таблицу спрайтов для новых цветов палитры"""
+        total = self._sprite_key_count()
+        if len(self._sprites) < total:
+            for key in range(len(self._sprites), total):
+                self._sprites.append(self._build_sprite(key))
+            self._sprite_table = np.empty(total, dtype=object)
+            self._sprite_table[:] = self._sprites
+
+    def draw(self, screen: pygame.Surface,
+             collect_rects: bool = False) -> Optional[List[pygame.Rect]]:
+        """Отрисовать все частицы одним пакетным вызовом.
+
+        С collect_rects=True возвращает прямоугольники нарисованных спрайтов.
+        """
+        n = self.count
+        if n == 0:
+            return [] if collect_rects else None
+        self._ensure_sprites()
+
+        size = self.size[:n]
+        radius = size.astype(np.int32)
+        alpha = np.minimum(255, self.life[:n].astype(np.int32) * 6)
+        bucket = alpha * ALPHA_BUCKETS // 256
+        width, height = screen.get_size()
+        x, y = self.x[:n], self.y[:n]
+        visible = ((radius > 0) & (bucket > 0) & (x + size > 0) & (y + size > 0) &
+                   (x - size < width) & (y - size < height))
+        if not visible.all():
+            radius, bucket, size = radius[visible], bucket[visible], size[visible]
+            x, y, color = x[visible], y[visible], self.color[:n][visible]
+        else:
+            color = self.color[:n]
+
+        keys = (color.astype(np.int32) * (MAX_RADIUS + 1) + radius) * ALPHA_BUCKETS + bucket
+        sprites = self._sprite_table[keys].tolist()
+        px = (x - size).astype(np.int32).tolist()
+        py = (y - size).astype(np.int32).tolist()
+        return screen.blits(list(zip(sprites, zip(px, py))), doreturn=collect_rects)
@@ -0,0 +1,205 @@
+"""Физика мяча с непрерывной (swept) проверкой столкновений и фиксированный шаг.
+
+Ball.move сдвигает мяч сразу на speed_x/speed_y и проверяет пересечения только
+в конечной точке, поэтому на большой скорости мяч проскакивает кирпичи и
+ракетку. sweep_ball рассматривает весь отрезок движения за шаг: находит самое
+раннее касание со стеной, ракеткой или кирпичом (swept AABB), переносит мяч в
+точку касания, отражает скорость и продолжает движение на оставшуюся часть
+шага. Поэтому шаг можно делать крупным: при ускоренной прокрутке без экрана и
+при множителях SpeedController около 2.0.
+
+FixedTimestep отделяет частоту физики от частоты отрисовки: кадр накапливает
+реальное время и выполняет целое число шагов фиксированной длины, а остаток
+(alpha) используется для интерполяции положения объектов при отрисовке.
+"""
+import math
+from typing import Optional, Tuple
+import pygame
+from game_config import SCREEN_WIDTH, SCREEN_HEIGHT
+
+# Сколько столкновений разрешается обработать за один шаг
+MAX_SWEEP_ITERATIONS = 8
+
+Hit = Tuple[float, int, int]
+
+
+def round_like_rect(value: float) -> int:
+    """Округление координаты так, как это делает pygame.Rect"""
+    return int(math.copysign(math.floor(abs(value) + 0.5), value))
+
+
+def swept_aabb(x: float, y: float, w: int, h: int, dx: float, dy: float,
+               target: pygame.Rect) -> Optional[Hit]:
+    """Время входа движущегося прямоугольника в неподвижный.
+
+    Возвращает (t, normal_x, normal_y), где t в [0, 1] - доля перемещения
+    (dx, dy) до касания, а нормаль указывает, по какой оси нужно отражаться.
+    None, если за это перемещение касания нет или прямоугольник удаляется.
+    """
+    if dx > 0:
+        x_entry = target.left - (x + w)
+        x_exit = target.right - x
+    else:
+        x_entry = target.right - x
+        x_exit = target.left - (x + w)
+    if dy > 0:
+        y_entry = target.top - (y + h)
+        y_exit = target.bottom - y
+    else:
+        y_entry = target.bottom - y
+        y_exit = target.top - (y + h)
+
+    if dx == 0:
+        if x + w <= target.left or x >= target.right:
+            return None
+        tx_entry, tx_exit = -math.inf, math.inf
+    else:
+        tx_entry, tx_exit = x_entry / dx, x_exit / dx
+    if dy == 0:
+        if y + h <= target.top or y >= target.bottom:
+            return None
+        ty_entry, ty_exit = -math.inf, math.inf
+    else:
+        ty_entry, ty_exit = y_entry / dy, y_exit / dy
+
+    t_entry = max(tx_entry, ty_entry)
+    t_exit = min(tx_exit, ty_exit)
+    if t_entry > t_exit or t_entry < 0 or t_entry > 1 or t_exit <= 0:
+        return None
+    if tx_entry > ty_entry:
+        return t_entry, (-1 if dx > 0 else 1), 0
+    return t_entry, 0, (-1 if dy > 0 else 1)
+
+
+def paddle_bounce(ball, paddle) -> None:
+    """Отскок от ракетки с углом по точке попадания (как в Ball.check_collision)"""
+    relative_intersect_x = paddle.rect.centerx - (ball.x + ball.rect.width / 2)
+    normalized_intersect_x = relative_intersect_x / (paddle.rect.width / 2)
+    bounce_angle = normalized_intersect_x * (math.pi / 3)  # Макс угол 60 градусов
+
+    ball.speed_y = -abs(ball.speed_y)
+    ball.speed_x = -math.sin(bounce_angle) * 7
+
+    # Ограничение скорости
+    max_speed = 10
+    ball.speed_x = max(min(ball.speed_x, max_speed), -max_speed)
+
+
+def _sync_ball(ball) -> None:
+    """Взять позицию из rect, если его сдвинули снаружи (сброс, восстановление)"""
+    if round_like_rect(ball.x) != ball.rect.x or round_like_rect(ball.y) != ball.rect.y:
+        ball.x = float(ball.rect.x)
+        ball.y = float(ball.rect.y)
+
+
+def _wall_hit(x: float, y: float, w: int, dx: float, dy: float) -> Optional[Hit]:
+    """Самое раннее касание левой, правой или верхней стены"""
+    best = None
+    if dx < 0 and x + dx <= 0:
+        best = (max(0.0, -x / dx), 1, 0)
+    elif dx > 0 and x + w + dx >= SCREEN_WIDTH:
+        best = (max(0.0, (SCREEN_WIDTH - w - x) / dx), -1, 0)
+    if dy < 0 and y + dy <= 0:
+        t = max(0.0, -y / dy)
+        if best is None or t < best[0]:
+            best = (t, 0, 1)
+    return best
+
+
+def sweep_ball(ball, paddle, brick_grid, dt: float = 1.0, on_brick=None) -> None:
+    """Переместить мяч на dt кадров с непрерывной проверкой столкновений.
+
+    on_brick(brick, normal_x, normal_y) вызывается для каждого кирпича, в
+    который попал мяч; отражение скорости выполняется здесь.
+    """
+    if not ball.active or ball.sticky:
+        return
+    _sync_ball(ball)
+    w, h = ball.rect.width, ball.rect.height
+
+    # Ракетка наехала на мяч сбоку: отскок, как при дискретной проверке
+    if ball.speed_y > 0 and ball.rect.colliderect(paddle.rect):
+        paddle_bounce(ball, paddle)
+
+    remaining = 1.0
+    for _ in range(MAX_SWEEP_ITERATIONS):
+        dx = ball.speed_x * dt * remaining
+        dy = ball.speed_y * dt * remaining
+        if dx == 0 and dy == 0:
+            break
+
+        best = _wall_hit(ball.x, ball.y, w, dx, dy)
+        target = None
+        if ball.speed_y > 0:
+            hit = swept_aabb(ball.x, ball.y, w, h, dx, dy, paddle.rect)
+            if hit is not None and (best is None or hit[0] < best[0]):
+                best, target = hit, paddle
+
+        # Кандидаты-кирпичи из ячеек, которые накрывает путь мяча
+        path = pygame.Rect(math.floor(min(ball.x, ball.x + dx)),
+                           math.floor(min(ball.y, ball.y + dy)),
+                           math.ceil(abs(dx)) + w + 1, math.ceil(abs(dy)) + h + 1)
+        for brick in brick_grid.query(path):
+            hit = swept_aabb(ball.x, ball.y, w, h, dx, dy, brick.rect)
+            if hit is not None and (best is None or hit[0] < best[0]):
+                best, target = hit, brick
+
+        if best is None:
+            ball.x += dx
+            ball.y += dy
+            break
+
+        t, normal_x, normal_y = best
+        ball.x += dx * t
+        ball.y += dy * t
+        remaining *= 1 - t
+
+        if target is paddle:
+            paddle_bounce(ball, paddle)
+        else:
+            if normal_x:
+                ball.speed_x = abs(ball.speed_x) * normal_x
+            if normal_y:
+                ball.speed_y = abs(ball.speed_y) * normal_y
+            if target is not None and on_brick is not None:
+                on_brick(target, normal_x, normal_y)
+
+    ball.rect.x = round_like_rect(ball.x)
+    ball.rect.y = round_like_rect(ball.y)
+
+    # Проверка выхода за нижнюю границу
+    if ball.rect.top > SCREEN_HEIGHT:
+        ball.active = False
+
+
+class FixedTimestep:
+    """Аккумулятор реального времени для физики с фиксированным шагом"""
+
+    def __init__(self, step_seconds: float, max_steps: int = 8):
+        self.step_seconds = step_seconds
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def reset(self) -> None:
+        """Забыть накопленное время (после паузы или меню)"""
+        self.accumulator = 0.0
+
+    def advance(self, elapsed: float) -> int:
+        """Добавить прошедшее время и вернуть число шагов физики.
+
+        Если кадр затянулся, число шагов ограничивается max_steps, а лишнее
+        время отбрасывается, чтобы игра не уходила в спираль догоняния.
+        """
+        self.accumulator += elapsed
+        steps = int(self.accumulator // self.step_seconds)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step_seconds
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        """Доля следующего шага, прошедшая с последнего шага физики"""
+        return min(1.0, self.accumulator / self.step_seconds)
@@ -0,0 +1,138 @@
+"""Подготовка следующего уровня в фоновом потоке.
+
+Когда разрушен последний кирпич, Simulation.step строит следующий уровень
+в том же кадре: создает кирпичи, хранилище и индекс столкновений, а
+рендерер dirty заново рисует слой кирпичей. На больших раскладках (наборы
+уровней на тысячи кирпичей) этот кадр заметно дергается.
+
+LevelPrebuilder строит следующий уровень заранее, пока идет текущий:
+рабочий поток вызывает Simulation.build_level, которая не меняет
+симуляцию, и, если задан render, рисует слой кирпичей на отдельной
+поверхности. При смене уровня симуляция забирает готовый уровень через
+level_source и только подменяет ссылки на хранилище и индекс, а рендерер -
+ссылку на слой (claim_layer). Если уровень еще строится, take ждет его -
+это не дольше, чем строить заново; если готов не тот уровень (F9 вернул на
+другой), он строится в кадре, как раньше.
+
+Раскладка зависит только от номера уровня и набора, поэтому готовый уровень
+совпадает с построенным в кадре и повторы не расходятся. Цена смены уровня
+видна в профилировщике кадра как фаза level; сравнение с построением в
+кадре: python benchmark.py level.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, Optional, Tuple
+import pygame
+from game_config import SCREEN_WIDTH, SCREEN_HEIGHT
+from game_objects import Brick
+from entity_store import EntityStore
+from simulation import Simulation, PreparedLevel
+
+# Рисование кирпичей на поверхность слоя с рамкой или без; False - нарисовать
+# нельзя (нужных спрайтов нет в атласе, а дорисовывать их можно только в
+# главном потоке)
+LayerRender = Callable[[pygame.Surface, Iterable[Brick], bool], bool]
+# Пауза перед подготовкой: поток не должен отнимать время у кадра смены уровня
+# и первых кадров после нее (на одном ядре потоки делят GIL)
+START_DELAY = 0.25
+
+
+class LevelPrebuilder:
+    """Следующий уровень и его слой, построенные в рабочем потоке"""
+
+    def __init__(self, render: Optional[LayerRender] = None,
+                 size: Tuple[int, int] = (SCREEN_WIDTH, SCREEN_HEIGHT),
+                 delay: float = START_DELAY):
+        self.render = render
+        self.size = size
+        self.delay = delay
+        # Рамка и трещины кирпичей слоя (уровень качества игры)
+        self.details = True
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-prebuild")
+        self._sim: Optional[Simulation] = None
+        self._pending: Optional[Tuple[int, Future, threading.Event]] = None
+        # Слой уровня, отданного симуляции: хранилище, поверхность, details
+        self._layer: Optional[Tuple[EntityStore, pygame.Surface, bool]] = None
+
+        self.used = 0
+        self.waited = 0
+        self.missed = 0
+        self.layers = 0
+
+    def attach(self, sim: Simulation) -> None:
+        """Готовить уровни для симуляции, начиная со следующего за текущим"""
+        self.cancel()
+        self._sim = sim
+        sim.level_source = self.take
+        self.schedule(sim.level + 1)
+
+    def cancel(self) -> None:
+        """Забыть начатую подготовку"""
+        if self._pending is not None:
+            _, future, hurry = self._pending
+            future.cancel()
+            hurry.set()
+            self._pending = None
+        self._layer = None
+
+    def schedule(self, level: int) -> None:
+        """Поставить уровень в очередь рабочего потока"""
+        surface = None
+        if self.render is not None:
+            # Поверхность создается здесь: convert нужен дисплей главного потока
+            surface = pygame.Surface(self.size)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+        hurry = threading.Event()
+        future = self._executor.submit(self._build, self._sim, level, surface,
+                                       self.details, hurry)
+        self._pending = (level, future, hurry)
+
+    def _build(self, sim: Simulation, level: int, surface: Optional[pygame.Surface],
+               details: bool, hurry: threading.Event) -> Tuple[PreparedLevel, Optional[tuple]]:
+        # Пауза прерывается, если уровень понадобился раньше
+        hurry.wait(self.delay)
+        prepared = sim.build_level(level)
+        layer = None
+        if surface is not None:
+            if self.render(surface, prepared.bricks, details):
+                layer = (prepared.bricks, surface, details)
+        return prepared, layer
+
+    def take(self, level: int) -> Optional[PreparedLevel]:
+        """Готовый уровень для Simulation.level_source (None - строить в кадре)"""
+        pending, self._pending = self._pending, None
+        prepared = None
+        if pending is not None and pending[0] == level:
+            _, future, hurry = pending
+            if not future.done():
+                hurry.set()
+                self.waited += 1
+            prepared, self._layer = future.result()
+            self.used += 1
+        else:
+            if pending is not None:
+                pending[1].cancel()
+                pending[2].set()
+            self._layer = None
+            self.missed += 1
+        self.schedule(level + 1)
+        return prepared
+
+    def claim_layer(self, bricks: EntityStore, details: bool) -> Optional[pygame.Surface]:
+        """Готовый слой уровня, если его кирпичи еще не менялись (отдается один раз)"""
+        layer, self._layer = self._layer, None
+        if layer is None or layer[0] is not bricks or layer[2] != details:
+            return None
+        self.layers += 1
+        return layer[1]
+
+    def stats(self) -> dict:
+        """Счетчики: уровни из потока, из них с ожиданием, построенные в кадре, слои"""
+        return {"used": self.used, "waited": self.waited, "missed": self.missed,
+                "layers": self.layers}
+
+    def close(self) -> None:
+        """Остановить рабочий поток, не дожидаясь начатой подготовки"""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,216 @@
+"""Профилировщик кадра с графиком поверх игры и экспортом трассы.
+
+Код игры расставляет отметки profiler.mark(phase): время с предыдущей
+отметки относится к названной фазе. Отметки пишутся в кольцевые буферы
+фиксированного размера (суммы по фазам за кадр и отдельные интервалы для
+трассы), поэтому запись не выделяет память. Выключенный профилировщик
+заменяется на NULL_PROFILER, методы которого ничего не делают, и цена
+отметки сводится к пустому вызову метода.
+
+Трассу можно открыть в chrome://tracing или Perfetto (формат Trace Event).
+"""
+import json
+import time
+from typing import Dict, List, Optional
+import pygame
+from game_config import FPS, BLACK, WHITE, GRAY, GREEN, YELLOW, RED
+
+# Фазы кадра в порядке выполнения
+PHASES = ("events", "paddle", "ball", "bricks", "balls", "power_ups", "particles", "speed",
+          "level", "draw", "overlay", "flip", "capture", "idle")
+# Фазы, которые относятся к Game.update
+UPDATE_PHASES = ("paddle", "ball", "bricks", "balls", "power_ups", "particles", "speed",
+                 "level")
+
+FRAME_BUDGET_MS = 1000 / FPS
+# Раз во сколько кадров обновлять подписи с временем фаз
+LABEL_REFRESH = 30
+
+
+class NullProfiler:
+    """Выключенный профилировщик: все отметки игнорируются"""
+
+    enabled = False
+
+    def begin_frame(self) -> None:
+        pass
+
+    def mark(self, phase: str) -> None:
+        pass
+
+    def end_frame(self) -> None:
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class FrameProfiler:
+    """Замеры фаз кадра в кольцевых буферах"""
+
+    enabled = True
+
+    def __init__(self, frames: int = 600, events: int = 65536):
+        self.capacity = frames
+        self.phase_index: Dict[str, int] = {name: i for i, name in enumerate(PHASES)}
+        phase_count = len(PHASES)
+
+        # Суммы по фазам для последних кадров и время начала кадров
+        self.phase_times: List[List[float]] = [[0.0] * phase_count for _ in range(frames)]
+        self.frame_starts: List[float] = [0.0] * frames
+        self.frame_totals: List[float] = [0.0] * frames
+        self.frame_count = 0
+
+        # Отдельные интервалы для экспорта трассы
+        self.event_capacity = events
+        self.event_phase: List[int] = [0] * events
+        self.event_start: List[float] = [0.0] * events
+        self.event_duration: List[float] = [0.0] * events
+        self.event_count = 0
+
+        self._origin = time.perf_counter()
+        self._frame_start = self._origin
+        self._last = self._origin
+        self._current = self.phase_times[0]
+
+        # Поверхности графика создаются один раз и переиспользуются
+        self._panel: Optional[pygame.Surface] = None
+        self._labels: List[pygame.Surface] = []
+        self._labels_frame = 0
+        self._graph: Optional[pygame.Surface] = None
+        self._graph_frame = 0
+
+    def begin_frame(self) -> None:
+        """Начать новый кадр"""
+        now = time.perf_counter()
+        slot = self.frame_count % self.capacity
+        current = self.phase_times[slot]
+        for i in range(len(current)):
+            current[i] = 0.0
+        self._current = current
+        self.frame_starts[slot] = now
+        self._frame_start = now
+        self._last = now
+
+    def mark(self, phase: str) -> None:
+        """Отнести время с прошлой отметки к фазе"""
+        now = time.perf_counter()
+        index = self.phase_index[phase]
+        duration = now - self._last
+        self._current[index] += duration
+
+        event = self.event_count % self.event_capacity
+        self.event_phase[event] = index
+        self.event_start[event] = self._last
+        self.event_duration[event] = duration
+        self.event_count += 1
+        self._last = now
+
+    def end_frame(self) -> None:
+        """Завершить кадр"""
+        slot = self.frame_count % self.capacity
+        self.frame_totals[slot] = time.perf_counter() - self._frame_start
+        self.frame_count += 1
+
+    def _recent_slots(self, count: int) -> List[int]:
+        """Индексы последних завершенных кадров, от старых к новым"""
+        count = min(count, self.frame_count, self.capacity)
+        return [(self.frame_count - count + i) % self.capacity for i in range(count)]
+
+    def recent_frame_times(self, count: int = 300) -> List[float]:
+        """Длительности последних кадров в миллисекундах"""
+        return [self.frame_totals[slot] * 1000 for slot in self._recent_slots(count)]
+
+    def phase_averages(self, count: int = 120) -> Dict[str, float]:
+        """Среднее время фаз за последние кадры в миллисекундах"""
+        slots = self._recent_slots(count)
+        if not slots:
+            return {name: 0.0 for name in PHASES}
+        return {name: sum(self.phase_times[slot][i] for slot in slots) / len(slots) * 1000
+                for name, i in self.phase_index.items()}
+
+    def export_chrome_trace(self, path: str) -> int:
+        """Сохранить интервалы из буфера в формате Chrome Trace Event"""
+        first = max(0, self.event_count - self.event_capacity)
+        events = []
+        for n in range(first, self.event_count):
+            slot = n % self.event_capacity
+            phase = PHASES[self.event_phase[slot]]
+            events.append({
+                "name": phase,
+                "cat": "update" if phase in UPDATE_PHASES else "frame",
+                "ph": "X",
+                "ts": (self.event_start[slot] - self._origin) * 1e6,
+                "dur": self.event_duration[slot] * 1e6,
+                "pid": 1,
+                "tid": 1,
+            })
+        for slot in self._recent_slots(self.capacity):
+            events.append({
+                "name": "frame",
+                "cat": "frame",
+                "ph": "X",
+                "ts": (self.frame_starts[slot] - self._origin) * 1e6,
+                "dur": self.frame_totals[slot] * 1e6,
+                "pid": 1,
+                "tid": 0,
+            })
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+    def draw_overlay(self, screen: pygame.Surface, font: pygame.font.Font,
+                     width: int = 300, height: int = 120) -> pygame.Rect:
+        """Нарисовать график времени кадра и средние по фазам, вернуть область"""
+        rows = (len(PHASES) + 1) // 2
+        rect = pygame.Rect(screen.get_width() - width - 10, 50, width, height + 16 * rows + 4)
+        if self._panel is None or self._panel.get_size() != rect.size:
+            self._panel = pygame.Surface(rect.size)
+            self._panel.set_alpha(200)
+            self._panel.fill((20, 20, 20))
+        screen.blit(self._panel, rect)
+
+        # График: одна колонка на кадр, линия бюджета 16.6 мс посередине.
+        # Поверхность графика сдвигается влево, дорисовываются только новые кадры
+        if self._graph is None or self._graph.get_size() != (width, height):
+            self._graph = pygame.Surface((width, height))
+            self._graph.set_colorkey(BLACK)
+            self._graph_frame = max(0, self.frame_count - width)
+        new = min(width, self.frame_count - self._graph_frame)
+        if new > 0:
+            graph = self._graph
+            graph.scroll(-new, 0)
+            graph.fill(BLACK, (width - new, 0, new, height))
+            scale = height / (FRAME_BUDGET_MS * 2)
+            budget_y = height - int(FRAME_BUDGET_MS * scale)
+            x = width - new
+            for value in self.recent_frame_times(new):
+                bar = min(height, int(value * scale))
+                if value <= FRAME_BUDGET_MS:
+                    color = GREEN
+                elif value <= FRAME_BUDGET_MS * 2:
+                    color = YELLOW
+                else:
+                    color = RED
+                if bar:
+                    graph.fill(color, (x, height - bar, 1, bar))
+                graph.set_at((x, budget_y), GRAY)
+                x += 1
+            self._graph_frame = self.frame_count
+        screen.blit(self._graph, rect.topleft)
+        bottom = rect.top + height
+
+        # Подписи обновляются раз в LABEL_REFRESH кадров: иначе текст
+        # рендерился бы каждый кадр и сам попадал в замер
+        if not self._labels or self.frame_count - self._labels_frame >= LABEL_REFRESH:
+            averages = self.phase_averages()
+            self._labels = []
+            for row in range(0, len(PHASES), 2):
+                text = "  ".join(f"{name} {averages[name]:.2f}" for name in PHASES[row:row + 2])
+                self._labels.append(font.render(text, True, WHITE))
+            self._labels_frame = self.frame_count
+        y = bottom + 4
+        for label in self._labels:
+            screen.blit(label, (rect.left + 4, y))
+            y += 16
+        return rect
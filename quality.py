@@ -0,0 +1,181 @@
+"""Адаптивное качество эффектов: удержание 60 кадров/с под нагрузкой.
+
+QualityGovernor получает из Game.run занятое время каждого кадра (от начала
+кадра до ожидания в clock.tick) и раз в window кадров смотрит на 90-й
+перцентиль окна. Если он выше доли downgrade бюджета кадра (16.7 мс),
+качество опускается на уровень; если несколько окон подряд он ниже доли
+upgrade, качество поднимается. Разрыв между порогами и число спокойных окон
+для подъема - гистерезис: без него уровень скакал бы туда-обратно на
+границе бюджета. После каждой смены несколько окон не оцениваются - кадры
+сразу после смены (перестройка слоя, новые спрайты) не показательны.
+
+Уровень задает бюджеты эффектов, а не игровые правила:
+    particle_scale - доля частиц при разрушении кирпича и поимке бонуса;
+    life_scale     - доля времени жизни частиц;
+    brick_details  - рамка и трещины кирпичей (SpriteAtlas.brick_details);
+    hud_interval   - раз во сколько кадров панель может перерисоваться.
+Симуляция и повторы от уровня не зависят: частицы не входят в контрольную
+сумму. С атласом спрайтов кирпич без рамки и трещин рисуется тем же одним
+блитом, поэтому brick_details экономит в основном на рисовании новых
+спрайтов и на методе draw без атласа; основной выигрыш дают частицы.
+
+Фиксированный уровень (--quality high и т.д.) отключает подстройку -
+для замеров и сравнения кадров.
+"""
+from typing import List, NamedTuple, Optional
+import pygame
+from game_config import FPS, WHITE, GRAY, GREEN, YELLOW
+
+FRAME_BUDGET_MS = 1000 / FPS
+# Раз во сколько кадров обновлять надписи сводки
+LABEL_REFRESH = 30
+
+
+class QualityLevel(NamedTuple):
+    """Бюджеты эффектов одного уровня качества"""
+    name: str
+    particle_scale: float
+    life_scale: float
+    brick_details: bool
+    hud_interval: int
+
+
+# От лучшего к худшему
+LEVELS = (
+    QualityLevel("high", 1.0, 1.0, True, 1),
+    QualityLevel("medium", 0.6, 0.75, True, 2),
+    QualityLevel("low", 0.3, 0.5, False, 4),
+    QualityLevel("minimal", 0.0, 0.5, False, 8),
+)
+LEVEL_NAMES = tuple(level.name for level in LEVELS)
+MODES = ("auto",) + LEVEL_NAMES
+
+
+class QualityChange(NamedTuple):
+    """Запись о смене уровня"""
+    frame: int
+    old: str
+    new: str
+    p90_ms: float
+
+
+class QualityGovernor:
+    """Уровень качества по времени последних кадров с гистерезисом"""
+
+    def __init__(self, mode: str = "auto", budget_ms: float = FRAME_BUDGET_MS,
+                 window: int = 30, downgrade: float = 0.9, upgrade: float = 0.6,
+                 upgrade_windows: int = 4, cooldown: int = 2):
+        if mode not in MODES:
+            raise ValueError(f"качество {mode!r}: ожидается одно из {MODES}")
+        self.auto = mode == "auto"
+        self.index = 0 if self.auto else LEVEL_NAMES.index(mode)
+        self.budget_ms = budget_ms
+        self.window = window
+        self.downgrade = downgrade
+        self.upgrade = upgrade
+        self.upgrade_windows = upgrade_windows
+        self.cooldown = cooldown
+
+        self._samples = [0.0] * window
+        self.frames = 0
+        self.last_p90 = 0.0
+        self._calm = 0
+        self._wait = 0
+        self.changes: List[QualityChange] = []
+
+        self._panel: Optional[pygame.Surface] = None
+        self._labels: List[pygame.Surface] = []
+        self._labels_frame = -LABEL_REFRESH
+
+    @property
+    def level(self) -> QualityLevel:
+        return LEVELS[self.index]
+
+    def record(self, frame_ms: float) -> bool:
+        """Учесть занятое время кадра; возвращает True, если уровень сменился"""
+        self._samples[self.frames % self.window] = frame_ms
+        self.frames += 1
+        if self.frames % self.window:
+            return False
+        ordered = sorted(self._samples)
+        self.last_p90 = ordered[int(0.9 * (self.window - 1))]
+        if not self.auto:
+            return False
+        if self._wait:
+            self._wait -= 1
+            return False
+
+        if self.last_p90 > self.budget_ms * self.downgrade:
+            self._calm = 0
+            if self.index < len(LEVELS) - 1:
+                return self._change(self.index + 1)
+        elif self.last_p90 < self.budget_ms * self.upgrade:
+            self._calm += 1
+            if self._calm >= self.upgrade_windows and self.index > 0:
+                return self._change(self.index - 1)
+        else:
+            self._calm = 0
+        return False
+
+    def _change(self, index: int) -> bool:
+        self.changes.append(QualityChange(self.frames, LEVELS[self.index].name,
+                                          LEVELS[index].name, self.last_p90))
+        self.index = index
+        self._calm = 0
+        self._wait = self.cooldown
+        self._labels = []
+        return True
+
+    def stats(self) -> dict:
+        """Сводка: уровень, режим, последний p90 и история смен"""
+        level = self.level
+        return {
+            "level": level.name,
+            "auto": self.auto,
+            "frames": self.frames,
+            "p90_ms": self.last_p90,
+            "budget_ms": self.budget_ms,
+            "particle_scale": level.particle_scale,
+            "life_scale": level.life_scale,
+            "brick_details": level.brick_details,
+            "hud_interval": level.hud_interval,
+            "downgrades": sum(LEVEL_NAMES.index(c.new) > LEVEL_NAMES.index(c.old)
+                              for c in self.changes),
+            "upgrades": sum(LEVEL_NAMES.index(c.new) < LEVEL_NAMES.index(c.old)
+                            for c in self.changes),
+            "changes": [change._asdict() for change in self.changes],
+        }
+
+    def draw_overlay(self, screen: pygame.Surface, font: pygame.font.Font,
+                     width: int = 360) -> pygame.Rect:
+        """Нарисовать сводку качества в правом нижнем углу, вернуть область"""
+        if not self._labels or self.frames - self._labels_frame >= LABEL_REFRESH:
+            level = self.level
+            mode = "авто" if self.auto else "фиксировано"
+            details = "вкл" if level.brick_details else "выкл"
+            lines = [
+                (f"Качество: {level.name} ({mode})", GREEN if self.index == 0 else YELLOW),
+                (f"Кадр p90: {self.last_p90:.1f} мс из {self.budget_ms:.1f}", WHITE),
+                (f"Частицы x{level.particle_scale:g}, жизнь x{level.life_scale:g}, "
+                 f"детали {details}, панель 1/{level.hud_interval}", GRAY),
+            ]
+            if self.changes:
+                last = self.changes[-1]
+                lines.append((f"Смен: {len(self.changes)}, последняя: кадр {last.frame} "
+                              f"{last.old} -> {last.new} ({last.p90_ms:.1f} мс)", GRAY))
+            self._labels = [font.render(text, True, color) for text, color in lines]
+            self._labels_frame = self.frames
+
+        height = 16 * len(self._labels) + 8
+        rect = pygame.Rect(screen.get_width() - width - 10,
+                           screen.get_height() - height - 70, width, height)
+        if self._panel is None or self._panel.get_size() != rect.size:
+            self._panel = pygame.Surface(rect.size)
+            self._panel.set_alpha(200)
+            self._panel.fill((20, 20, 20))
+        screen.blit(self._panel, rect)
+        y = rect.top + 4
+        for label in self._labels:
+            screen.blit(label, (rect.left + 6, y))
+            y += 16
+        return rect
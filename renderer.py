@@ -0,0 +1,178 @@
+"""Отрисовка игрового поля с обновлением только измененных областей.
+
+Кирпичи и панель HUD меняются редко, поэтому они заранее рисуются на
+отдельный слой (статический слой). В каждом кадре рендерер восстанавливает из
+слоя области, где в прошлом кадре были подвижные объекты (мяч, ракетка,
+бонусы, дополнительные мячи, частицы, подсказка), рисует объекты заново и
+возвращает только эти области: Game передает их на экран через
+pygame.display.update(rects). Область кирпича перерисовывается в слое только
+после попадания по нему (Simulation.dirty_bricks), а весь слой целиком - при
+смене раскладки уровня; слой следующего уровня рисуется заранее в потоке
+prebuild.py, и при смене уровня он просто подменяет текущий.
+
+Сравнение с полной перерисовкой: python benchmark.py render.
+"""
+import time
+from itertools import chain
+from typing import Callable, Iterable, List, Optional
+import pygame
+from game_config import SCREEN_WIDTH, SCREEN_HEIGHT, BLACK, YELLOW
+
+
+class DirtyRectRenderer:
+    """Рендерер с кэшированным слоем кирпичей и грязными прямоугольниками"""
+
+    def __init__(self, game):
+        self.game = game
+        self.screen_rect = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        if pygame.display.get_surface() is not None:
+            self.layer = self.layer.convert()
+        self._sim = None
+        self._layout_version = -1
+        self._needs_full = True
+        self._previous: List[pygame.Rect] = []
+        self._hud_rects: List[pygame.Rect] = []
+        # Рисование поверх кадра (график профилировщика); возвращает занятую область
+        self.overlay: Optional[Callable[[pygame.Surface], pygame.Rect]] = None
+
+        # Статистика последнего кадра и накопленная
+        self.frames = 0
+        self.last_pixels = 0
+        self.total_pixels = 0
+        self.last_draw_time = 0.0
+        self.total_draw_time = 0.0
+
+    def invalidate(self) -> None:
+        """Перестроить слой и обновить весь экран в следующем кадре"""
+        self._needs_full = True
+
+    def _repaint_layer(self, rect: pygame.Rect) -> None:
+        """Перерисовать в слое прямоугольник: фон, кирпичи и панель"""
+        sim = self.game.sim
+        layer = self.layer
+        layer.set_clip(rect)
+        layer.fill(BLACK, rect)
+        self.game.sprites.draw(layer, sim.brick_grid.query(rect))
+        self.game.hud.draw(layer)
+        layer.set_clip(None)
+
+    def render_bricks(self, surface: pygame.Surface, bricks: Iterable, details: bool) -> bool:
+        """Нарисовать кирпичи слоя на поверхность (вызывается из потока prebuild.py).
+
+        Атлас дорисовывает новые спрайты только в главном потоке, поэтому
+        если какого-то вида кирпича в нем нет, возвращается False.
+        """
+        sprites = self.game.sprites
+        if any(brick.sprite_key(details) not in sprites.areas for brick in bricks):
+            return False
+        surface.fill(BLACK)
+        sprites.draw(surface, bricks, details=details)
+        return True
+
+    def _rebuild_layer(self) -> None:
+        """Нарисовать слой заново или взять слой, подготовленный заранее"""
+        sim = self.game.sim
+        # Слой отдается один раз; после попаданий он уже устарел
+        prebuilt = self.game.prebuilder.claim_layer(sim.bricks, self.game.sprites.brick_details)
+        if prebuilt is not None and not sim.dirty_bricks:
+            self.layer = prebuilt
+        else:
+            self.layer.fill(BLACK)
+            self.game.sprites.draw(self.layer, sim.bricks)
+        self.game.hud.draw(self.layer)
+        self._hud_rects = self.game.hud.rects()
+        sim.dirty_bricks.clear()
+        self._sim = sim
+        self._layout_version = sim.layout_version
+        self._needs_full = False
+
+    def draw(self) -> List[pygame.Rect]:
+        """Отрисовать кадр и вернуть области, которые нужно обновить на экране"""
+        start = time.perf_counter()
+        game = self.game
+        sim = game.sim
+        screen = game.screen
+
+        speed_info = sim.ball.speed_controller.get_current_speed_info(sim.ball)
+        hud_changed = game.hud.update(sim.paddle.score, sim.paddle.lives,
+                                      sim.level, speed_info["total"])
+
+        dirty: List[pygame.Rect] = []
+        full = (self._needs_full or sim is not self._sim or
+                sim.layout_version != self._layout_version)
+        if full:
+            self._rebuild_layer()
+            screen.blit(self.layer, (0, 0))
+            dirty.append(self.screen_rect)
+        else:
+            # Кирпичи, по которым попали (трещины выходят за прямоугольник
+            # кирпича на пару пикселей), и изменившаяся панель
+            changed = [brick.rect.inflate(4, 4) for brick in sim.dirty_bricks]
+            sim.dirty_bricks.clear()
+            if hud_changed:
+                new_hud_rects = game.hud.rects()
+                changed.extend(self._hud_rects)
+                changed.extend(new_hud_rects)
+                self._hud_rects = new_hud_rects
+            for rect in changed:
+                self._repaint_layer(rect)
+
+            # Стираем подвижные объекты прошлого кадра
+            for rect in self._previous + changed:
+                screen.blit(self.layer, rect, rect)
+            dirty.extend(self._previous)
+            dirty.extend(changed)
+
+        current = self._draw_dynamic(screen)
+        if self.overlay is not None:
+            current.append(self.overlay(screen).clip(self.screen_rect))
+        dirty.extend(current)
+        self._previous = current
+
+        self.last_pixels = self._pixels(dirty, full)
+        self.total_pixels += self.last_pixels
+        self.last_draw_time = time.perf_counter() - start
+        self.total_draw_time += self.last_draw_time
+        self.frames += 1
+        return dirty
+
+    def _draw_dynamic(self, screen: pygame.Surface) -> List[pygame.Rect]:
+        """Нарисовать подвижные объекты и вернуть занятые ими области"""
+        game = self.game
+        sim = game.sim
+        rects: List[pygame.Rect] = []
+
+        # Ракетка, мяч и бонусы - одним вызовом blits из атласа спрайтов
+        rects.extend(game.sprites.draw(screen, chain((sim.paddle, sim.ball), sim.power_ups),
+                                       collect_rects=True))
+        ball_rects: Optional[List[pygame.Rect]] = sim.balls.draw(screen, collect_rects=True)
+        if ball_rects:
+            rects.extend(ball_rects)
+        particle_rects: Optional[List[pygame.Rect]] = sim.particles.draw(screen, collect_rects=True)
+        if particle_rects:
+            rects.extend(particle_rects)
+
+        if sim.ball.sticky:
+            message = game.text.render(game.small_font,
+                                       "Нажмите ПРОБЕЛ или ЛКМ для запуска мяча", YELLOW)
+            rects.append(screen.blit(message, (SCREEN_WIDTH // 2 - 180, SCREEN_HEIGHT - 60)))
+
+        return [rect.clip(self.screen_rect) for rect in rects]
+
+    def _pixels(self, rects: List[pygame.Rect], full: bool) -> int:
+        """Число пикселей, переданных на экран (пересечения считаются повторно)"""
+        if full:
+            return SCREEN_WIDTH * SCREEN_HEIGHT
+        return min(SCREEN_WIDTH * SCREEN_HEIGHT, sum(rect.width * rect.height for rect in rects))
+
+    def stats(self) -> dict:
+        """Средние показатели отрисовки"""
+        frames = max(1, self.frames)
+        return {
+            "frames": self.frames,
+            "avg_pixels": self.total_pixels / frames,
+            "avg_draw_ms": self.total_draw_time / frames * 1000,
+            "last_pixels": self.last_pixels,
+            "last_draw_ms": self.last_draw_time * 1000,
+        }
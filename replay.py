@@ -0,0 +1,256 @@
+"""Запись ввода игрока и точный повтор сессий.
+
+Игра детерминирована при заданных зерне Simulation, длительности шага и
+последовательности FrameInput, поэтому для повтора достаточно сохранить
+только их. Файл записи компактный: ввод кадра - битовая маска, а одинаковые
+маски подряд сжимаются в серии (длина varint + маска). Минута игры, в которой
+клавиши меняются раз в несколько кадров, занимает сотни байт.
+
+Формат файла:
+    b"ARKRPL" + версия (u8)
+    сегменты, по одному на каждую игру (Simulation) сессии:
+        b"S", зерно (u64), длительность шага dt (f64), swept (u8),
+        число мячей режима хаоса (u16), сложность, скорость мяча и путь к
+        набору уровней (varint длина + utf-8, пустой - встроенный уровень),
+        серии: varint число кадров + маска (u8), ..., varint 0,
+        контрольная сумма конечного состояния (u32)
+Незавершенный последний сегмент (сбой игры) читается без контрольной суммы;
+файл, оборванный в заголовке сегмента, считается поврежденным (ValueError).
+Версия 2 добавила число мячей хаоса и бонус мультимяча, версия 3 изменила
+порядок обработки бонусов за шаг, версия 4 добавила набор уровней, версия 5
+ограничила время действия бонусов (effects.py), версия 6 перевела ракетку,
+бонусы и мяч без swept на дробные координаты, версия 7 записывает длину строк
+varint (путь к набору бывает длиннее 255 байт); записи прежних версий
+повторялись бы иначе и не читаются. Набор уровней должен лежать по тому же
+пути и не меняться после записи.
+"""
+import struct
+import time
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional, Tuple
+from simulation import Simulation, FrameInput
+from level_pack import LevelPack
+
+MAGIC = b"ARKRPL"
+VERSION = 7
+
+# Порядок битов маски соответствует полям FrameInput
+INPUT_BITS = len(FrameInput._fields)
+INPUTS = [FrameInput(*(bool(mask >> bit & 1) for bit in range(INPUT_BITS)))
+          for mask in range(1 << INPUT_BITS)]
+
+
+def pack_input(inputs: FrameInput) -> int:
+    """Ввод кадра в битовую маску"""
+    mask = 0
+    for bit, pressed in enumerate(inputs):
+        if pressed:
+            mask |= 1 << bit
+    return mask
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _write_str(out: bytearray, text: str) -> None:
+    raw = text.encode("utf-8")
+    _write_varint(out, len(raw))
+    out += raw
+
+
+def _read_str(data: bytes, pos: int) -> Tuple[str, int]:
+    length, pos = _read_varint(data, pos)
+    if pos + length > len(data):
+        raise IndexError("строка обрезана")
+    return data[pos:pos + length].decode("utf-8"), pos + length
+
+
+class ReplaySegment(NamedTuple):
+    """Одна записанная игра"""
+    seed: int
+    dt: float
+    swept: bool
+    chaos_balls: int
+    difficulty: str
+    ball_speed_setting: str
+    level_pack: str
+    masks: bytes
+    checksum: Optional[int]
+
+    def simulation(self) -> Simulation:
+        """Новая симуляция в начальном состоянии этой игры"""
+        pack = LevelPack(self.level_pack) if self.level_pack else None
+        return Simulation(self.difficulty, self.ball_speed_setting, self.swept, self.seed,
+                          self.chaos_balls, pack)
+
+    def inputs(self) -> Iterator[FrameInput]:
+        """Ввод по кадрам"""
+        for mask in self.masks:
+            yield INPUTS[mask]
+
+
+class ReplayWriter:
+    """Потоковая запись ввода сессии в файл"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file: Optional[BinaryIO] = open(path, "wb")
+        self._file.write(MAGIC + bytes([VERSION]))
+        self._sim: Optional[Simulation] = None
+        self._dt = 1.0
+        self._started = False
+        self._mask = -1
+        self._run = 0
+        self.frames = 0
+
+    def begin_segment(self, sim: Simulation, dt: float = 1.0) -> None:
+        """Начать запись новой игры (предыдущая завершается)"""
+        self.end_segment()
+        self._sim = sim
+        self._dt = dt
+        self._started = False
+        self._mask = -1
+        self._run = 0
+
+    def record(self, inputs: FrameInput) -> None:
+        """Записать ввод очередного шага симуляции"""
+        if not self._started:
+            self._write_header()
+        mask = pack_input(inputs)
+        if mask == self._mask:
+            self._run += 1
+        else:
+            self._flush_run()
+            self._mask = mask
+            self._run = 1
+        self.frames += 1
+
+    def _write_header(self) -> None:
+        sim = self._sim
+        out = bytearray(b"S")
+        out += struct.pack("<QdBH", sim.seed, self._dt, sim.swept, sim.chaos_balls)
+        _write_str(out, sim.difficulty)
+        _write_str(out, sim.ball_speed_setting)
+        _write_str(out, sim.level_pack.path if sim.level_pack is not None else "")
+        self._file.write(out)
+        self._started = True
+
+    def _flush_run(self) -> None:
+        if self._run:
+            out = bytearray()
+            _write_varint(out, self._run)
+            out.append(self._mask)
+            self._file.write(out)
+            self._run = 0
+
+    def end_segment(self) -> None:
+        """Завершить текущую игру контрольной суммой ее состояния"""
+        if self._sim is not None and self._started:
+            self._flush_run()
+            out = bytearray()
+            _write_varint(out, 0)
+            out += struct.pack("<I", self._sim.checksum())
+            self._file.write(out)
+            self._file.flush()
+        self._sim = None
+        self._started = False
+
+    def close(self) -> None:
+        """Завершить запись"""
+        if self._file is not None:
+            self.end_segment()
+            self._file.close()
+            self._file = None
+
+
+def read_replay(path: str) -> List[ReplaySegment]:
+    """Прочитать все сегменты файла записи"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data == MAGIC:
+        raise ValueError(f"{path}: поврежден заголовок файла записи")
+    if data[:len(MAGIC)] != MAGIC or data[len(MAGIC)] != VERSION:
+        raise ValueError(f"{path}: не файл записи арканоида или устаревшая версия")
+
+    segments = []
+    pos = len(MAGIC) + 1
+    header = struct.Struct("<QdBH")
+    while pos < len(data):
+        if data[pos:pos + 1] != b"S":
+            raise ValueError(f"{path}: поврежден сегмент в позиции {pos}")
+        start = pos
+        try:
+            seed, dt, swept, chaos_balls = header.unpack_from(data, pos + 1)
+            pos += 1 + header.size
+            difficulty, pos = _read_str(data, pos)
+            ball_speed_setting, pos = _read_str(data, pos)
+            level_pack, pos = _read_str(data, pos)
+        except (struct.error, IndexError, UnicodeDecodeError):
+            # Запись оборвалась в заголовке сегмента: повторять нечего
+            raise ValueError(f"{path}: поврежден сегмент в позиции {start}") from None
+
+        masks = bytearray()
+        checksum = None
+        while pos < len(data):
+            try:
+                run, pos = _read_varint(data, pos)
+            except IndexError:
+                # Запись оборвалась посреди длины серии - незавершенный сегмент
+                pos = len(data)
+                break
+            if run == 0:
+                if pos + 4 <= len(data):
+                    checksum, = struct.unpack_from("<I", data, pos)
+                pos += 4
+                break
+            if pos >= len(data):
+                break
+            masks += bytes([data[pos]]) * run
+            pos += 1
+        segments.append(ReplaySegment(seed, dt, bool(swept), chaos_balls, difficulty,
+                                      ball_speed_setting, level_pack, bytes(masks), checksum))
+    return segments
+
+
+class ReplayResult(NamedTuple):
+    """Итог безголового повтора одной игры"""
+    frames: int
+    elapsed: float
+    score: int
+    level: int
+    checksum: int
+    expected: Optional[int]
+
+    @property
+    def matches(self) -> Optional[bool]:
+        return None if self.expected is None else self.checksum == self.expected
+
+
+def run_headless(path: str) -> List[ReplayResult]:
+    """Повторить запись без окна с максимальной скоростью"""
+    results = []
+    for segment in read_replay(path):
+        sim = segment.simulation()
+        dt = segment.dt
+        step = sim.step
+        start = time.perf_counter()
+        for inputs in segment.inputs():
+            step(inputs, dt)
+        elapsed = time.perf_counter() - start
+        results.append(ReplayResult(len(segment.masks), elapsed, sim.paddle.score,
+                                    sim.level, sim.checksum(), segment.checksum))
+    return results
@@ -0,0 +1,578 @@
+"""Безголовое ядро симуляции арканоида.
+
+Состояние игры (ракетка, мячи, кирпичи, бонусы, частицы) и правила одного
+кадра собраны в классе Simulation. Модуль не открывает окно, не создает
+шрифтов и не ждет таймера, поэтому шаги можно выполнять с любой скоростью:
+для тестов, ботов и подбора баланса. Game в game.py является тонкой
+интерактивной оболочкой над ним.
+
+Производительность (python benchmark.py headless, автопилот, CPython 3.11):
+около 50 000 шагов в секунду на одном ядре (против 60 кадров/с
+интерактивной игры); с крупным шагом dt=6 - около 170 000 игровых кадров/с
+(python benchmark.py timestep).
+
+Снимок состояния (snapshot/restore) нужен ботам с перебором ходов и откату
+в сетевой игре: состояние сохраняется тысячи раз за решение, а
+copy.deepcopy объектов с pygame.Rect на это не годится (около 6.5 мс).
+SimSnapshot хранит только изменяемые поля в кортежах и массивах NumPy;
+снимок и восстановление занимают около 5 мкс каждое:
+    - хранилище кирпичей и индекс столкновений общие со снимком, пока
+      кирпич не разрушен: тогда снимку достается их копия, а игра
+      продолжает менять свои объекты (копирование при записи, _own_bricks),
+      поэтому ссылки на индекс внутри шага не устаревают; прочность
+      кирпичей сохраняется кортежем один раз на версию кирпичей;
+    - генераторы мяча и кирпичей (TrackedRandom) отмечают расход чисел,
+      поэтому медленные getstate/setstate (20 мкс) вызываются, только если
+      числа брались после прошлого снимка или восстановления;
+    - частицы сохраняются только по запросу (particles=True): на игру они
+      не влияют, а копия массивов и генератора стоит дороже всего остального.
+Снимок восстанавливается только в ту же Simulation, в которой сделан, и до
+ее reset.
+Сравнение с copy.deepcopy: python benchmark.py snapshot.
+"""
+import math
+import random
+import struct
+import zlib
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional
+import numpy as np
+from game_objects import Paddle, Ball, Brick, PowerUp
+from particles import ParticleSystem
+from balls import BallArray
+from entity_store import EntityStore
+from level_pack import LevelPack
+from spatial_grid import BrickGrid
+from physics import sweep_ball, round_like_rect
+from profiler import NULL_PROFILER
+from effects import EffectScheduler
+from game_config import (GameConfig, SCREEN_WIDTH, SCREEN_HEIGHT,
+                         RED, ORANGE, YELLOW, GREEN, BLUE, PURPLE)
+
+
+class FrameInput(NamedTuple):
+    """Ввод игрока за один кадр"""
+    left: bool = False
+    right: bool = False
+    launch: bool = False
+    speed_up: bool = False
+    speed_down: bool = False
+
+
+NO_INPUT = FrameInput()
+
+
+class TrackedRandom(random.Random):
+    """random.Random, который отмечает расход чисел для дешевых снимков"""
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.used = True
+        self._state: Optional[tuple] = None
+
+    # Переопределены оба метода, поэтому choice и randrange идут через
+    # getrandbits, как у random.Random, и последовательность чисел та же
+    def random(self) -> float:
+        self.used = True
+        return super().random()
+
+    def getrandbits(self, k: int) -> int:
+        self.used = True
+        return super().getrandbits(k)
+
+    def snapshot(self) -> tuple:
+        """Состояние генератора; без расхода с прошлого раза - прежний кортеж"""
+        if self.used:
+            self._state = self.getstate()
+            self.used = False
+        return self._state
+
+    def restore(self, state: tuple) -> None:
+        """Вернуть состояние из snapshot()"""
+        if self.used or state is not self._state:
+            self.setstate(state)
+            self._state = state
+            self.used = False
+
+
+class SimSnapshot(NamedTuple):
+    """Изменяемая часть состояния Simulation (Simulation.snapshot)"""
+    frame: int
+    level: int
+    game_over: bool
+    counters: tuple
+    previous_positions: tuple
+    paddle: tuple
+    ball: tuple
+    ball_rng: tuple
+    brick_rng: tuple
+    bricks: list
+    brick_version: int
+    healths: tuple
+    power_ups: Optional[EntityStore]
+    power_up_y: tuple
+    balls: tuple
+    effects: tuple
+    particles: Optional[tuple]
+
+# Цвет и прочность кирпичей по рядам встроенной раскладки
+BRICK_COLORS = [
+    (RED, 1), (ORANGE, 1), (YELLOW, 1),
+    (GREEN, 2), (BLUE, 2), (PURPLE, 3)
+]
+
+
+class PreparedLevel(NamedTuple):
+    """Построенный уровень: кирпичи уже в хранилище и индексе (Simulation.build_level)"""
+    level: int
+    bricks: EntityStore
+    grid: BrickGrid
+
+
+class Simulation:
+    """Чистое состояние игры и правила одного кадра"""
+
+    def __init__(self, difficulty: str = "normal", ball_speed_setting: str = "medium",
+                 swept: bool = True, seed: Optional[int] = None, chaos_balls: int = 0,
+                 level_pack: Optional[LevelPack] = None):
+        self.difficulty = difficulty
+        self.ball_speed_setting = ball_speed_setting
+        # swept=False - прежняя дискретная проверка столкновений (Ball.move)
+        self.swept = swept
+        # Зерно есть у любой игры, поэтому записать и повторить можно каждую
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(63)
+        # Режим хаоса: при каждом запуске мяча вылетает веер из chaos_balls мячей
+        self.chaos_balls = chaos_balls
+        # Набор уровней; без него используется встроенная раскладка 6x10
+        self.level_pack = level_pack
+        self.frame = 0
+        # Замеры фаз шага; по умолчанию выключены (profiler.py)
+        self.profiler = NULL_PROFILER
+        # Источник заранее построенных уровней (prebuild.py): номер уровня ->
+        # PreparedLevel или None, тогда уровень строится в кадре
+        self.level_source: Optional[Callable[[int], Optional[PreparedLevel]]] = None
+        self.reset()
+
+    def _seed_streams(self) -> None:
+        """Отдельные потоки случайных чисел для мяча, кирпичей и частиц"""
+        master = random.Random(self.seed)
+        self.ball_rng = TrackedRandom(master.getrandbits(64))
+        self.brick_rng = TrackedRandom(master.getrandbits(64))
+        self.particle_rng = np.random.default_rng(master.getrandbits(64))
+
+    def reset(self) -> None:
+        """Сброс состояния игры"""
+        settings = GameConfig.get_difficulty_settings(self.difficulty)
+        self._seed_streams()
+
+        self.paddle = Paddle(SCREEN_WIDTH // 2 - 50, SCREEN_HEIGHT - 50, settings["paddle_speed"])
+        self.paddle.lives = settings["initial_lives"]
+
+        self.ball = Ball(self.paddle.rect.centerx, self.paddle.rect.top - 10, self.ball_rng)
+        self.ball.sticky = True
+
+        # Временные эффекты бонусов; мяч регистрирует в нем изменения скорости
+        self.effects = EffectScheduler()
+        self.ball.speed_controller.effects = self.effects
+
+        # Устанавливаем выбранную скорость
+        self.ball.speed_controller.set_ball_speed(self.ball, self.ball_speed_setting)
+        # Дополнительные мячи (мультимяч, хаос)
+        self.balls = BallArray()
+
+        self.bricks: EntityStore[Brick] = EntityStore()
+        self.brick_grid = BrickGrid(80, 40, origin=(15, 50))
+        # Версия кирпичей меняется при любом изменении (номера не повторяются
+        # и после восстановления снимка). Хранилище и индекс могут быть общими
+        # со снимками через список [хранилище, индекс]; перед изменением
+        # снимки получают в этом списке копии
+        self._brick_serial = 0
+        self.brick_version = 0
+        self._shared_bricks: Optional[list] = None
+        self._healths: tuple = ()
+        self._healths_version = -1
+        # Кирпичи, по которым попали с момента последней отрисовки, и номер
+        # раскладки уровня: по ним рендерер обновляет кэшированный слой
+        self.dirty_bricks: List[Brick] = []
+        self.layout_version = 0
+        self.power_ups: EntityStore[PowerUp] = EntityStore()
+        self.particles = ParticleSystem(rng=self.particle_rng)
+
+        self.level = 1
+        self.frame = 0
+        # Счетчики для статистики прогонов (sweep.py)
+        self.bricks_destroyed = 0
+        self.power_ups_dropped = 0
+        self.power_ups_caught = 0
+        self.previous_positions = self._positions()
+        self.game_over = False
+        self.create_level()
+
+    def create_level(self) -> None:
+        """Создание уровня с кирпичами"""
+        prepared = self.level_source(self.level) if self.level_source is not None else None
+        if prepared is None:
+            prepared = self.build_level(self.level)
+        self.install_level(prepared)
+
+    def build_level(self, level: int) -> PreparedLevel:
+        """Построить кирпичи уровня, не меняя симуляцию (можно из другого потока).
+
+        Раскладка зависит только от номера уровня и набора, поэтому уровень,
+        построенный заранее, совпадает с построенным в кадре.
+        """
+        if self.level_pack is not None:
+            # После последнего уровня набор идет по кругу с прочностью выше на 1
+            count = len(self.level_pack)
+            data = self.level_pack.level((level - 1) % count)
+            bricks = data.bricks(self.brick_rng, (level - 1) // count)
+            grid = data.grid()
+        else:
+            bricks = []
+            for row in range(6):
+                color, health = BRICK_COLORS[row]
+                for col in range(10):
+                    brick_x = col * 80 + 15
+                    brick_y = row * 40 + 50
+                    bricks.append(Brick(brick_x, brick_y, color, health + level - 1,
+                                        self.brick_rng))
+            grid = BrickGrid(80, 40, origin=(15, 50))
+        store: EntityStore[Brick] = EntityStore()
+        for brick in bricks:
+            brick.handle = store.add(brick)
+            grid.insert(brick)
+        return PreparedLevel(level, store, grid)
+
+    def install_level(self, prepared: PreparedLevel) -> None:
+        """Сделать построенный уровень текущим: подменяются только ссылки"""
+        # Прежние хранилище и индекс больше не меняются, поэтому снимки
+        # могут и дальше ссылаться на них без копии
+        self._shared_bricks = None
+        self._touch_bricks()
+        self.dirty_bricks.clear()
+        self.layout_version += 1
+        self.bricks = prepared.bricks
+        self.brick_grid = prepared.grid
+
+    def load_bricks(self, bricks: Iterable[Brick], grid: Optional[BrickGrid] = None) -> None:
+        """Заменить кирпичи уровня произвольной раскладкой.
+
+        Без grid сетка индекса подбирается по размеру самого крупного кирпича.
+        """
+        bricks = list(bricks)
+        self._own_bricks()
+        self._touch_bricks()
+        self.bricks.clear()
+        self.dirty_bricks.clear()
+        self.layout_version += 1
+        if grid is None:
+            grid = BrickGrid(max((brick.rect.width for brick in bricks), default=80),
+                             max((brick.rect.height for brick in bricks), default=40))
+        else:
+            grid.clear()
+        self.brick_grid = grid
+        for brick in bricks:
+            self.add_brick(brick)
+
+    def _touch_bricks(self) -> None:
+        """Новая версия кирпичей перед изменением"""
+        self._brick_serial += 1
+        self.brick_version = self._brick_serial
+
+    def _own_bricks(self) -> None:
+        """Отдать снимкам копию хранилища и индекса кирпичей перед изменением"""
+        shared = self._shared_bricks
+        if shared is not None:
+            shared[0] = self.bricks.copy()
+            shared[1] = self.brick_grid.copy()
+            self._shared_bricks = None
+
+    def add_brick(self, brick: Brick) -> None:
+        """Добавить кирпич на уровень и в индекс столкновений"""
+        self._own_bricks()
+        self._touch_bricks()
+        brick.handle = self.bricks.add(brick)
+        self.brick_grid.insert(brick)
+
+    def remove_brick(self, brick: Brick) -> None:
+        """Убрать кирпич за O(1): последний кирпич хранилища встает на его место"""
+        self._own_bricks()
+        self._touch_bricks()
+        self.bricks.remove(brick.handle)
+        self.brick_grid.remove(brick)
+
+    def add_power_up(self, power_up: PowerUp) -> None:
+        """Добавить падающий бонус"""
+        power_up.handle = self.power_ups.add(power_up)
+
+    def spawn_particles(self, x: int, y: int, color: tuple, count: int = 10) -> None:
+        """Создание частиц эффектов"""
+        self.particles.spawn(x, y, color, count)
+
+    def step(self, inputs: FrameInput = NO_INPUT, dt: float = 1.0) -> None:
+        """Выполнить один шаг симуляции длительностью dt кадров (1/60 с)"""
+        if self.game_over:
+            return
+        profiler = self.profiler
+        self.frame += 1
+        self.previous_positions = self._positions()
+
+        # Команды, которые в интерактивной игре приходят событиями
+        if inputs.launch:
+            if self.ball.sticky and self.chaos_balls:
+                self.launch_chaos()
+            self.ball.launch()
+        if inputs.speed_up:
+            self.ball.speed_controller.increase_speed(self.ball)
+        if inputs.speed_down:
+            self.ball.speed_controller.decrease_speed(self.ball)
+
+        # Управление ракеткой
+        if inputs.left:
+            self.paddle.move(-1, dt)
+        if inputs.right:
+            self.paddle.move(1, dt)
+
+        # Если мяч прилип, двигаем его вместе с ракеткой
+        if self.ball.sticky:
+            self.ball.reset(self.paddle)
+        profiler.mark("paddle")
+
+        if self.swept:
+            # Непрерывная проверка: стены, ракетка и все кирпичи на пути мяча
+            on_brick = self._profiled_hit_brick if profiler.enabled else self._hit_brick
+            sweep_ball(self.ball, self.paddle, self.brick_grid, dt, on_brick)
+            profiler.mark("ball")
+        else:
+            # Обновление мяча
+            self.ball.move(dt)
+
+            # Проверка столкновения мяча с ракеткой
+            self.ball.check_collision(self.paddle)
+            profiler.mark("ball")
+
+            # Проверка столкновения мяча с кирпичами
+            brick = self.brick_grid.first_collision(self.ball.rect) if self.ball.active else None
+            if brick is not None:
+                self._hit_brick(brick)
+
+                # Отскок мяча
+                self.ball.speed_y *= -1
+            profiler.mark("bricks")
+
+        # Дополнительные мячи обновляются одним векторным шагом
+        self.balls.update(self.paddle, self.brick_grid, dt, self._hit_brick)
+        profiler.mark("balls")
+
+        # Окончание временных эффектов: только истекающие в этом шаге
+        self.effects.advance(dt)
+
+        # Обновление бонусов: удаленный бонус заменяется последним, который
+        # обрабатывается следующим на том же месте
+        power_ups = self.power_ups
+        i = 0
+        while i < len(power_ups):
+            power_up = power_ups.items[i]
+            power_up.move(dt)
+
+            if not power_up.active:
+                power_ups.remove_at(i)
+                continue
+            if power_up.rect.colliderect(self.paddle.rect):
+                self.power_ups_caught += 1
+                power_up.apply(self.paddle, self.ball, self.effects)
+                if power_up.type == "multi_ball":
+                    self.balls.split(self.ball)
+                power_ups.remove_at(i)
+
+                # Эффект подбора бонуса
+                self.spawn_particles(power_up.rect.centerx, power_up.rect.centery,
+                                     power_up.colors[power_up.type], 8)
+                continue
+            i += 1
+        profiler.mark("power_ups")
+
+        # Обновление частиц
+        self.particles.update()
+        profiler.mark("particles")
+
+        # Увеличиваем скорость с каждым уровнем
+        self.ball.speed_controller.calculate_level_speed_increase(self.ball, self.level)
+
+        profiler.mark("speed")
+
+        # Проверка условий завершения уровня
+        if not self.bricks:
+            self.level += 1
+            self.effects.cancel_key("power_ball")
+            self.ball.reset(self.paddle)
+            self.balls.clear()
+            self.create_level()
+
+        # Проверка потери мяча: жизнь теряется вместе с последним мячом
+        if not self.ball.active and self.balls.count:
+            self.balls.promote(self.ball)
+        if not self.ball.active:
+            self.effects.cancel_key("power_ball")
+            self.paddle.lives -= 1
+            if self.paddle.lives <= 0:
+                self.game_over = True
+            else:
+                self.ball.reset(self.paddle)
+        # Смена уровня и потеря жизни - одна фаза: обе меняют ход игры
+        profiler.mark("level")
+
+    def launch_chaos(self) -> None:
+        """Выпустить веер дополнительных мячей с ракетки"""
+        ball = self.ball
+        speed = math.hypot(ball.speed_x, ball.speed_y)
+        self.balls.spawn_fan(ball.x, ball.y, speed, self.chaos_balls - self.balls.count)
+
+    def _profiled_hit_brick(self, brick: Brick, normal_x: int = 0, normal_y: int = 0) -> None:
+        """_hit_brick с отдельным замером: путь мяча до удара относится к фазе ball"""
+        self.profiler.mark("ball")
+        self._hit_brick(brick, normal_x, normal_y)
+        self.profiler.mark("bricks")
+
+    def _hit_brick(self, brick: Brick, normal_x: int = 0, normal_y: int = 0,
+                   paddle: Optional[Paddle] = None) -> None:
+        """Попадание мяча по кирпичу: урон, очки, частицы и бонус.
+
+        paddle - чьи очки (по умолчанию единственного игрока).
+        """
+        self._touch_bricks()
+        destroyed, power_up_type = brick.hit()
+        self.dirty_bricks.append(brick)
+
+        if destroyed:
+            self.remove_brick(brick)
+            self.bricks_destroyed += 1
+            (paddle or self.paddle).score += brick.max_health * 10
+
+            # Создание эффекта разрушения
+            self.spawn_particles(brick.rect.centerx, brick.rect.centery, brick.color, 15)
+
+            # Создание бонуса
+            if power_up_type:
+                self.power_ups_dropped += 1
+                self.add_power_up(
+                    PowerUp(brick.rect.centerx - 15, brick.rect.centery, power_up_type)
+                )
+
+    def checksum(self) -> int:
+        """Контрольная сумма состояния для проверки точного повтора"""
+        ball = self.ball
+        data = struct.pack("<4d8q", ball.x, ball.y, ball.speed_x, ball.speed_y,
+                           ball.rect.x, ball.rect.y, self.frame, self.level,
+                           self.paddle.score, self.paddle.lives,
+                           self.paddle.rect.x, self.paddle.rect.width)
+        health = bytes(min(255, max(0, brick.health)) for brick in self.bricks)
+        crc = zlib.crc32(health, zlib.crc32(data))
+        balls = self.balls
+        n = balls.count
+        for array in (balls.x, balls.y, balls.speed_x, balls.speed_y):
+            crc = zlib.crc32(array[:n].tobytes(), crc)
+        return crc
+
+    def snapshot(self, particles: bool = False) -> SimSnapshot:
+        """Снимок состояния для restore; particles=True - вместе с частицами"""
+        paddle, ball = self.paddle, self.ball
+        if self._healths_version != self.brick_version:
+            self._healths = tuple([brick.health for brick in self.bricks.items])
+            self._healths_version = self.brick_version
+        if self._shared_bricks is None:
+            self._shared_bricks = [self.bricks, self.brick_grid]
+        power_ups = self.power_ups
+        return SimSnapshot(
+            self.frame, self.level, self.game_over,
+            (self.bricks_destroyed, self.power_ups_dropped, self.power_ups_caught),
+            self.previous_positions,
+            (paddle.x, paddle.rect.x, paddle.rect.width, paddle.lives, paddle.score),
+            (ball.x, ball.y, ball.rect.x, ball.rect.y, ball.speed_x, ball.speed_y,
+             ball.active, ball.sticky, ball.power_ball,
+             ball.speed_controller.current_speed_multiplier),
+            self.ball_rng.snapshot(), self.brick_rng.snapshot(),
+            self._shared_bricks, self.brick_version, self._healths,
+            power_ups.copy() if power_ups else None,
+            tuple([power_up.y for power_up in power_ups.items]),
+            self.balls.snapshot(), self.effects.snapshot(),
+            self.particles.snapshot() if particles else None)
+
+    def restore(self, snapshot: SimSnapshot) -> None:
+        """Вернуть состояние из снимка, сделанного snapshot() этой симуляции"""
+        (self.frame, self.level, self.game_over, counters, self.previous_positions,
+         paddle_state, ball_state, ball_rng, brick_rng, shared_bricks, brick_version,
+         healths, power_ups, power_up_y, balls, effects, particles) = snapshot
+        self.bricks_destroyed, self.power_ups_dropped, self.power_ups_caught = counters
+
+        paddle = self.paddle
+        paddle.x, paddle.rect.x, paddle.rect.width, paddle.lives, paddle.score = paddle_state
+        ball = self.ball
+        (ball.x, ball.y, ball.rect.x, ball.rect.y, ball.speed_x, ball.speed_y,
+         ball.active, ball.sticky, ball.power_ball,
+         ball.speed_controller.current_speed_multiplier) = ball_state
+        self.ball_rng.restore(ball_rng)
+        self.brick_rng.restore(brick_rng)
+
+        # Кирпичи: без изменений после снимка восстанавливать нечего
+        if brick_version != self.brick_version:
+            for brick, health in zip(shared_bricks[0].items, healths):
+                brick.health = health
+            self.brick_version = brick_version
+            self._healths = healths
+            self._healths_version = brick_version
+            # Рендерер перестроит слой кирпичей целиком
+            self.layout_version += 1
+            self.dirty_bricks.clear()
+        self.bricks, self.brick_grid = shared_bricks
+        self._shared_bricks = shared_bricks
+
+        # Хранилище бонусов снимка может понадобиться снова, поэтому копия
+        self.power_ups = power_ups.copy() if power_ups is not None else EntityStore()
+        for power_up, y in zip(self.power_ups.items, power_up_y):
+            power_up.y = y
+            power_up.rect.y = round_like_rect(y)
+            power_up.active = True
+
+        self.balls.restore(balls)
+        self.effects.restore(effects)
+        if particles is not None:
+            self.particles.restore(particles)
+
+    def _positions(self) -> tuple:
+        """Положение мяча и ракетки для интерполяции между шагами"""
+        return self.ball.rect.x, self.ball.rect.y, self.paddle.rect.x
+
+    @contextmanager
+    def interpolated(self, alpha: float) -> Iterator[None]:
+        """Временно поставить мяч и ракетку между прошлым и текущим шагом.
+
+        alpha=1 - текущее состояние, alpha=0 - состояние до последнего шага.
+        Используется только для отрисовки; после блока позиции возвращаются.
+        """
+        if alpha >= 1.0:
+            yield
+            return
+        ball, paddle = self.ball.rect, self.paddle.rect
+        current = (ball.x, ball.y, paddle.x)
+        previous = self.previous_positions
+        # Мяч телепортировали (сброс на ракетку) - не размазываем его по экрану
+        if abs(previous[0] - ball.x) + abs(previous[1] - ball.y) > 100:
+            previous = (ball.x, ball.y, previous[2])
+        ball.x, ball.y, paddle.x = (round_like_rect(p + (c - p) * alpha)
+                                    for p, c in zip(previous, current))
+        try:
+            yield
+        finally:
+            ball.x, ball.y, paddle.x = current
+
+
+def autopilot_input(sim: Simulation) -> FrameInput:
+    """Простой бот: держит ракетку под мячом и сразу запускает его"""
+    paddle_x = sim.paddle.rect.centerx
+    ball_x = sim.ball.rect.centerx
+    return FrameInput(
+        left=ball_x < paddle_x - 10,
+        right=ball_x > paddle_x + 10,
+        launch=sim.ball.sticky,
+    )
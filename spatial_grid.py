@@ -0,0 +1,206 @@
+"""Равномерная сетка для поиска столкновений мяча с кирпичами.
+
+Кирпичи раскладываются по корзинам-ячейкам фиксированного размера. Запрос
+по прямоугольнику мяча перебирает только ячейки, которые он накрывает, поэтому
+стоимость проверки не зависит от числа кирпичей на уровне. Кирпич, который
+пересекает несколько ячеек (произвольная раскладка, крупные кирпичи), лежит в
+каждой из них. Удаление выполняется за O(1) на каждую занятую ячейку.
+
+Для пакетных запросов (сотни мячей за шаг) сетка лениво упаковывается в
+массивы NumPy: прямоугольники кирпичей и список кирпичей каждой ячейки
+подряд (CSR). first_collisions отвечает на запросы всех мячей сразу.
+Удаление кирпича только снимает флаг в упаковке, добавление сбрасывает ее.
+"""
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pygame
+
+Cell = Tuple[int, int]
+
+
+class BrickGrid:
+    """Индекс кирпичей на равномерной сетке"""
+
+    def __init__(self, cell_width: int = 80, cell_height: int = 40,
+                 origin: Tuple[int, int] = (0, 0)):
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.origin = origin
+        # Ячейка -> кирпичи в ней (dict используется как упорядоченное множество)
+        self.cells: Dict[Cell, Dict[object, int]] = {}
+        # Кирпич -> (порядковый номер, занятые ячейки)
+        self._entries: Dict[object, Tuple[int, List[Cell]]] = {}
+        self._next_order = 0
+        # Упаковка для пакетных запросов (строится при первом запросе)
+        self._packed: Optional[List] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, brick) -> bool:
+        return brick in self._entries
+
+    def _cell_range(self, rect: pygame.Rect) -> Tuple[range, range]:
+        """Диапазоны столбцов и строк, которые накрывает прямоугольник"""
+        ox, oy = self.origin
+        col0 = (rect.left - ox) // self.cell_width
+        col1 = (rect.right - 1 - ox) // self.cell_width
+        row0 = (rect.top - oy) // self.cell_height
+        row1 = (rect.bottom - 1 - oy) // self.cell_height
+        return range(col0, col1 + 1), range(row0, row1 + 1)
+
+    def insert(self, brick) -> None:
+        """Добавить кирпич во все ячейки, которые он накрывает"""
+        cols, rows = self._cell_range(brick.rect)
+        cells = [(col, row) for row in rows for col in cols]
+        order = self._next_order
+        self._next_order += 1
+        for cell in cells:
+            self.cells.setdefault(cell, {})[brick] = order
+        self._entries[brick] = (order, cells)
+        self._packed = None
+
+    def remove(self, brick) -> None:
+        """Убрать кирпич из индекса"""
+        _, cells = self._entries.pop(brick)
+        for cell in cells:
+            bucket = self.cells[cell]
+            del bucket[brick]
+            if not bucket:
+                del self.cells[cell]
+        if self._packed is not None:
+            self._alive[self._packed_index[brick]] = False
+
+    def copy(self) -> "BrickGrid":
+        """Независимая копия индекса с теми же кирпичами (и упаковкой)"""
+        grid = BrickGrid.__new__(BrickGrid)
+        grid.__dict__.update(self.__dict__)
+        grid.cells = {cell: bucket.copy() for cell, bucket in self.cells.items()}
+        grid._entries = self._entries.copy()
+        # Упаковка неизменна, кроме флагов удаленных кирпичей
+        if self._packed is not None:
+            grid._alive = self._alive.copy()
+        return grid
+
+    def clear(self) -> None:
+        """Очистить индекс"""
+        self.cells.clear()
+        self._entries.clear()
+        self._next_order = 0
+        self._packed = None
+
+    def query(self, rect: pygame.Rect) -> List:
+        """Кирпичи из ячеек, накрытых прямоугольником (без проверки пересечения)"""
+        cols, rows = self._cell_range(rect)
+        found = {}
+        for row in rows:
+            for col in cols:
+                bucket = self.cells.get((col, row))
+                if bucket:
+                    found.update(bucket)
+        return list(found)
+
+    def first_collision(self, rect: pygame.Rect) -> Optional[object]:
+        """Первый по порядку добавления кирпич, пересекающий прямоугольник.
+
+        Порядок добавления совпадает с порядком списка кирпичей уровня, поэтому
+        результат тот же, что и у последовательного перебора с colliderect.
+        """
+        cols, rows = self._cell_range(rect)
+        best = None
+        best_order = -1
+        for row in rows:
+            for col in cols:
+                bucket = self.cells.get((col, row))
+                if not bucket:
+                    continue
+                for brick, order in bucket.items():
+                    if (best is None or order < best_order) and rect.colliderect(brick.rect):
+                        best = brick
+                        best_order = order
+        return best
+
+    @property
+    def packed_bricks(self) -> List:
+        """Кирпичи в порядке добавления; индексы first_collisions указывают сюда"""
+        if self._packed is None:
+            self._pack()
+        return self._packed
+
+    def _pack(self) -> None:
+        """Упаковать кирпичи и ячейки в массивы для пакетных запросов"""
+        # _entries хранит кирпичи в порядке добавления
+        bricks = list(self._entries)
+        self._packed = bricks
+        self._packed_index = {brick: i for i, brick in enumerate(bricks)}
+        rects = np.array([tuple(brick.rect) for brick in bricks], dtype=np.int64).reshape(-1, 4)
+        self._left = rects[:, 0]
+        self._top = rects[:, 1]
+        self._right = rects[:, 0] + rects[:, 2]
+        self._bottom = rects[:, 1] + rects[:, 3]
+        self._alive = np.ones(len(bricks), dtype=bool)
+
+        pairs = np.array([(col, row, i) for i, brick in enumerate(bricks)
+                          for col, row in self._entries[brick][1]], dtype=np.int64).reshape(-1, 3)
+        if len(pairs) == 0:
+            self._col_min = self._row_min = 0
+            self._cols = self._rows = 0
+            self._cell_start = self._cell_count = self._cell_bricks = np.zeros(0, dtype=np.int64)
+            self._max_per_cell = 0
+            return
+        self._col_min = int(pairs[:, 0].min())
+        self._row_min = int(pairs[:, 1].min())
+        self._cols = int(pairs[:, 0].max()) - self._col_min + 1
+        self._rows = int(pairs[:, 1].max()) - self._row_min + 1
+        cell_id = (pairs[:, 1] - self._row_min) * self._cols + (pairs[:, 0] - self._col_min)
+        order = np.lexsort((pairs[:, 2], cell_id))
+        self._cell_bricks = pairs[order, 2]
+        self._cell_count = np.bincount(cell_id, minlength=self._cols * self._rows)
+        self._cell_start = np.cumsum(self._cell_count) - self._cell_count
+        self._max_per_cell = int(self._cell_count.max())
+
+    def first_collisions(self, xs: np.ndarray, ys: np.ndarray, width: int,
+                         height: int) -> np.ndarray:
+        """Пакетный first_collision для прямоугольников одного размера.
+
+        xs, ys - целые координаты левых верхних углов. Возвращает для каждого
+        индекс первого по порядку добавления пересеченного кирпича в
+        packed_bricks или -1.
+        """
+        bricks = self.packed_bricks
+        count = len(bricks)
+        best = np.full(len(xs), count, dtype=np.int64)
+        if count == 0 or len(xs) == 0:
+            return best - count - 1
+
+        ox, oy = self.origin
+        col0 = (xs - ox) // self.cell_width
+        col1 = (xs + width - 1 - ox) // self.cell_width
+        row0 = (ys - oy) // self.cell_height
+        row1 = (ys + height - 1 - oy) // self.cell_height
+        left, top, right, bottom = self._left, self._top, self._right, self._bottom
+
+        # Прямоугольник накрывает не больше span_rows x span_cols ячеек
+        span_cols = (width - 1) // self.cell_width + 2
+        span_rows = (height - 1) // self.cell_height + 2
+        for dr in range(span_rows):
+            row = row0 + dr - self._row_min
+            row_valid = (row0 + dr <= row1) & (row >= 0) & (row < self._rows)
+            for dc in range(span_cols):
+                col = col0 + dc - self._col_min
+                valid = row_valid & (col0 + dc <= col1) & (col >= 0) & (col < self._cols)
+                if not valid.any():
+                    continue
+                cell = np.where(valid, row * self._cols + col, 0)
+                start = self._cell_start[cell]
+                in_cell = np.where(valid, self._cell_count[cell], 0)
+                for j in range(self._max_per_cell):
+                    has = in_cell > j
+                    if not has.any():
+                        break
+                    index = self._cell_bricks[np.where(has, start + j, 0)]
+                    hit = (has & self._alive[index] & (index < best) &
+                           (xs < right[index]) & (xs + width > left[index]) &
+                           (ys < bottom[index]) & (ys + height > top[index]))
+                    best = np.where(hit, index, best)
+        return np.where(best < count, best, -1)
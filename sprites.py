@@ -0,0 +1,148 @@
+"""Атлас спрайтов игровых объектов и пакетная отрисовка.
+
+Кирпич, ракетка, мяч и бонус рисуются методом draw несколькими вызовами
+pygame.draw (заливка, рамка, трещины, эллипсы, символ бонуса) - на уровне
+из 60 кирпичей это около 200 вызовов в каждом кадре. SpriteAtlas рисует
+каждое видимое состояние объекта один раз в общую поверхность-атлас, а кадр
+собирается одним Surface.blits на слой из троек (атлас, позиция, область).
+
+Вид объекта задает его sprite_key(): кирпич - цвет, поврежден ли и размер,
+ракетка - цвет и размер (бонусы expand/shrink меняют ширину шагами по 10),
+мяч - обычный или силовой, бонус - тип с символом. Известные состояния
+готовятся при запуске (prepare), остальные (палитра набора уровней,
+нестандартный размер кирпича) дорисовываются при первой встрече.
+Рамку и трещины кирпичей задает brick_details атласа (уровень качества
+quality.py): у каждой игры свой атлас, поэтому игры в одном процессе не
+меняют качество друг другу.
+
+Спрайт рисуется тем же методом draw объекта, поэтому кадр совпадает с
+прежним попиксельно. Трещины кирпича выходят за его прямоугольник, поэтому
+у спрайтов есть поле MARGIN, а фон атласа прозрачен (цвет-ключ COLORKEY,
+который не должен встречаться в цветах объектов). RLEACCEL для атласа не
+годится: вырезку области из RLE-поверхности SDL ищет, проходя строки
+сверху, и 2000 мелких кирпичей рисовались в 3 раза медленнее, чем draw.
+
+Сравнение с рисованием методами draw: python benchmark.py sprites.
+"""
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+import pygame
+from game_objects import Paddle, Ball, Brick, PowerUp, POWER_UP_TYPES
+
+ATLAS_WIDTH = 1024
+MARGIN = 2
+COLORKEY = (255, 0, 255)
+# Ширины ракетки, которые дают бонусы expand и shrink
+PADDLE_WIDTHS = range(50, 151, 10)
+
+Blit = Tuple[pygame.Surface, Tuple[int, int], pygame.Rect]
+
+
+class SpriteAtlas:
+    """Спрайты всех видов объектов на одной поверхности"""
+
+    def __init__(self, height: int = 256):
+        self.surface = self._new_surface(height)
+        self.areas: Dict[tuple, pygame.Rect] = {}
+        # Рамка и трещины кирпичей (уровень качества)
+        self.brick_details = True
+        # Полочная упаковка: текущая полка и место на ней
+        self._x = 0
+        self._y = 0
+        self._shelf_height = 0
+
+    @staticmethod
+    def _new_surface(height: int) -> pygame.Surface:
+        surface = pygame.Surface((ATLAS_WIDTH, height))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        surface.fill(COLORKEY)
+        surface.set_colorkey(COLORKEY)
+        return surface
+
+    def prepare(self, brick_colors: Iterable[Tuple[int, int, int]],
+                brick_sizes: Iterable[Tuple[int, int]] = ((75, 30),)) -> None:
+        """Нарисовать заранее виды объектов, которые встретятся в игре"""
+        samples: List[object] = []
+        for width, height in brick_sizes:
+            for color in brick_colors:
+                for health in (1, 2):
+                    brick = Brick(0, 0, color, 2)
+                    brick.rect.size = (width, height)
+                    brick.health = health
+                    samples.append(brick)
+        for width in PADDLE_WIDTHS:
+            paddle = Paddle(0, 0)
+            paddle.rect.width = width
+            samples.append(paddle)
+        for power_ball in (False, True):
+            # Свой генератор, чтобы не сдвигать общий поток random
+            ball = Ball(0, 0, random.Random(0))
+            ball.power_ball = power_ball
+            samples.append(ball)
+        samples.extend(PowerUp(0, 0, kind) for kind in POWER_UP_TYPES)
+        for sample in samples:
+            self.area(sample, sample.sprite_key())
+
+    def _allocate(self, width: int, height: int) -> pygame.Rect:
+        """Место под спрайт; атлас растет вниз, когда места не хватает"""
+        if self._x + width > ATLAS_WIDTH:
+            self._x = 0
+            self._y += self._shelf_height
+            self._shelf_height = 0
+        if self._y + height > self.surface.get_height():
+            grown = self._new_surface(max(self.surface.get_height() * 2, self._y + height))
+            grown.blit(self.surface, (0, 0))
+            self.surface = grown
+        rect = pygame.Rect(self._x, self._y, width, height)
+        self._x += width
+        self._shelf_height = max(self._shelf_height, height)
+        return rect
+
+    def area(self, obj, key: tuple) -> pygame.Rect:
+        """Область спрайта объекта в атласе (рисуется при первом запросе)"""
+        area = self.areas.get(key)
+        if area is None:
+            width, height = obj.rect.size
+            area = self._allocate(width + 2 * MARGIN, height + 2 * MARGIN)
+            # Объект рисует себя сам на отдельной поверхности без цвета-ключа
+            # (смешивание сглаженного текста с атласом дает другие оттенки),
+            # затем спрайт копируется в атлас
+            cell = pygame.Surface(area.size)
+            if pygame.display.get_surface() is not None:
+                cell = cell.convert()
+            cell.fill(COLORKEY)
+            saved = obj.rect.topleft
+            obj.rect.topleft = (MARGIN, MARGIN)
+            if type(obj) is Brick:
+                # Без рамки у ключа нет признака трещин (sprite_key)
+                obj.draw(cell, key[2] is not None)
+            else:
+                obj.draw(cell)
+            obj.rect.topleft = saved
+            self.surface.blit(cell, area)
+            self.areas[key] = area
+        return area
+
+    def blit_list(self, objects: Iterable, details: Optional[bool] = None) -> List[Blit]:
+        """Тройки для Surface.blits в порядке объектов; невидимые пропускаются"""
+        blits = []
+        areas = self.areas
+        if details is None:
+            details = self.brick_details
+        for obj in objects:
+            key = obj.sprite_key(details) if type(obj) is Brick else obj.sprite_key()
+            if key is None:
+                continue
+            area = areas.get(key) or self.area(obj, key)
+            rect = obj.rect
+            blits.append((self.surface, (rect.x - MARGIN, rect.y - MARGIN), area))
+        return blits
+
+    def draw(self, screen: pygame.Surface, objects: Iterable, collect_rects: bool = False,
+             details: Optional[bool] = None) -> Optional[List[pygame.Rect]]:
+        """Нарисовать объекты одним вызовом Surface.blits.
+
+        С collect_rects=True возвращает занятые области (с полями спрайтов).
+        """
+        return screen.blits(self.blit_list(objects, details), doreturn=collect_rects)
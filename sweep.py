@@ -0,0 +1,255 @@
+"""Прогон сетки настроек сложности и скорости мяча для подбора баланса.
+
+Для каждой пары (сложность, скорость мяча) выполняются тысячи безголовых игр
+Simulation с ботом вместо игрока. Игры режутся на пакеты по --chunk штук и
+раздаются пулу процессов: пакеты независимы и возвращают только короткие
+итоги игр, поэтому прогон масштабируется по ядрам почти линейно. Каждый
+готовый пакет дописывается в файл контрольной точки (JSON Lines), и
+прерванный прогон продолжается с того же места при повторном запуске.
+
+Итог по каждой паре: время жизни, пройденные уровни, распределение очков и
+частота выпадения и подбора бонусов - в CSV и JSON.
+
+    python sweep.py --games 2000 --out balance
+    python sweep.py --difficulties normal hard --speeds medium fast --bot reactive
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import time
+from collections import deque
+from multiprocessing import Pool
+from typing import Callable, Dict, Iterable, List, NamedTuple, Tuple
+from game_config import GameConfig, FPS
+from simulation import Simulation, FrameInput, autopilot_input
+from stats import percentile
+
+# Пакет: сложность, скорость мяча, номера первой и следующей за последней игр
+Task = Tuple[str, str, int, int]
+
+
+class GameResult(NamedTuple):
+    """Итог одной игры"""
+    frames: int
+    levels_cleared: int
+    score: int
+    bricks_destroyed: int
+    power_ups_dropped: int
+    power_ups_caught: int
+    timed_out: bool
+
+
+def reactive_bot(seed: int, reaction: int = 6, error: int = 30) -> Callable[[Simulation], FrameInput]:
+    """Бот с задержкой реакции и промахом, похожий на живого игрока.
+
+    Видит мяч с опозданием на reaction шагов и целится в точку со случайным
+    смещением до error пикселей, которое меняется после каждого отскока.
+    """
+    rng = random.Random(seed)
+    seen = deque(maxlen=reaction + 1)
+    state = {"offset": 0, "speed_y": 0}
+
+    def policy(sim: Simulation) -> FrameInput:
+        ball = sim.ball
+        if (ball.speed_y < 0) != (state["speed_y"] < 0):
+            state["offset"] = rng.randint(-error, error)
+        state["speed_y"] = ball.speed_y
+        seen.append(ball.rect.centerx)
+        target = seen[0] + state["offset"]
+        paddle_x = sim.paddle.rect.centerx
+        return FrameInput(left=target < paddle_x - 10, right=target > paddle_x + 10,
+                          launch=ball.sticky)
+
+    return policy
+
+
+BOTS = {
+    "autopilot": lambda seed: autopilot_input,
+    "reactive": reactive_bot,
+}
+
+
+def game_seed(base_seed: int, difficulty: str, speed: str, game: int) -> int:
+    """Зерно игры не зависит от разбиения на пакеты и числа процессов"""
+    return random.Random(f"{base_seed}:{difficulty}:{speed}:{game}").getrandbits(63)
+
+
+def play_game(difficulty: str, speed: str, seed: int, bot: str,
+              max_frames: int, dt: float) -> GameResult:
+    """Одна безголовая игра до окончания или до max_frames кадров"""
+    sim = Simulation(difficulty, speed, seed=seed)
+    policy = BOTS[bot](seed)
+    step = sim.step
+    max_steps = int(max_frames / dt)
+    while not sim.game_over and sim.frame < max_steps:
+        step(policy(sim), dt)
+    return GameResult(round(sim.frame * dt), sim.level - 1, sim.paddle.score,
+                      sim.bricks_destroyed, sim.power_ups_dropped,
+                      sim.power_ups_caught, not sim.game_over)
+
+
+def run_chunk(args: tuple) -> Tuple[Task, List[GameResult]]:
+    """Задача пула: пакет игр одной пары настроек"""
+    task, base_seed, bot, max_frames, dt = args
+    difficulty, speed, first, end = task
+    results = [play_game(difficulty, speed, game_seed(base_seed, difficulty, speed, game),
+                         bot, max_frames, dt)
+               for game in range(first, end)]
+    return task, results
+
+
+def load_checkpoint(path: str, config: Dict) -> Dict[Task, List[GameResult]]:
+    """Готовые пакеты из файла контрольной точки (оборванная строка пропускается).
+
+    Первая строка файла - параметры прогона; продолжать можно только прогон
+    с теми же параметрами.
+    """
+    done: Dict[Task, List[GameResult]] = {}
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"config": config}) + "\n")
+        return done
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("config") != config:
+            raise SystemExit(f"{path}: контрольная точка другого прогона "
+                             f"({header.get('config')}); запустите с --fresh")
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            done[tuple(record["task"])] = [GameResult(*game) for game in record["games"]]
+    return done
+
+
+def aggregate(results: Iterable[GameResult]) -> Dict:
+    """Сводка по играм одной пары настроек"""
+    results = list(results)
+    games = len(results)
+    if not games:
+        return {"games": 0}
+    seconds = [r.frames / FPS for r in results]
+    scores = [r.score for r in results]
+    levels = [r.levels_cleared for r in results]
+    dropped = sum(r.power_ups_dropped for r in results)
+    caught = sum(r.power_ups_caught for r in results)
+    bricks = sum(r.bricks_destroyed for r in results)
+    return {
+        "games": games,
+        "survival_s_mean": sum(seconds) / games,
+        "survival_s_p10": percentile(seconds, 10),
+        "survival_s_p50": percentile(seconds, 50),
+        "survival_s_p90": percentile(seconds, 90),
+        "levels_cleared_mean": sum(levels) / games,
+        "levels_cleared_max": max(levels),
+        "score_mean": sum(scores) / games,
+        "score_p10": percentile(scores, 10),
+        "score_p50": percentile(scores, 50),
+        "score_p90": percentile(scores, 90),
+        "score_max": max(scores),
+        "power_ups_per_game": dropped / games,
+        "power_up_drop_rate": dropped / bricks if bricks else 0.0,
+        "power_up_catch_rate": caught / dropped if dropped else 0.0,
+        "timeouts": sum(r.timed_out for r in results),
+    }
+
+
+def write_reports(summary: Dict[Tuple[str, str], Dict], meta: Dict, out: str) -> None:
+    """Сохранить сводку в out.csv и out.json"""
+    rows = [{"difficulty": d, "ball_speed": s, **stats} for (d, s), stats in summary.items()]
+    # Поля - по самой полной строке: у пары без игр есть только games
+    fields = max((list(row) for row in rows), key=len, default=["difficulty", "ball_speed"])
+    with open(out + ".csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, restval="")
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(out + ".json", "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": rows}, f, ensure_ascii=False, indent=2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Прогон сетки настроек сложности")
+    parser.add_argument("--difficulties", nargs="+",
+                        default=GameConfig.get_available_difficulties())
+    parser.add_argument("--speeds", nargs="+", default=GameConfig.get_available_ball_speeds())
+    parser.add_argument("--games", type=int, default=1000, help="игр на каждую пару настроек")
+    parser.add_argument("--chunk", type=int, default=25, help="игр в одной задаче пула")
+    parser.add_argument("--bot", choices=sorted(BOTS), default="reactive")
+    parser.add_argument("--max-minutes", type=float, default=10.0,
+                        help="предел длительности игры в игровых минутах")
+    parser.add_argument("--dt", type=float, default=1.0, help="шаг симуляции в кадрах")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default="sweep", help="префикс отчетов .csv и .json")
+    parser.add_argument("--checkpoint", help="файл контрольной точки (по умолчанию <out>.ckpt.jsonl)")
+    parser.add_argument("--fresh", action="store_true", help="начать заново, удалив контрольную точку")
+    args = parser.parse_args()
+    if args.games < 1 or args.chunk < 1:
+        parser.error("--games и --chunk должны быть не меньше 1")
+
+    checkpoint = args.checkpoint or args.out + ".ckpt.jsonl"
+    if args.fresh and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    max_frames = int(args.max_minutes * 60 * FPS)
+    # Пакеты с одинаковыми номерами игр дают одни и те же игры только при
+    # тех же боте, зерне, пределе длительности, шаге и размере пакета
+    config = {"bot": args.bot, "seed": args.seed, "max_frames": max_frames,
+              "dt": args.dt, "chunk": args.chunk}
+    done = load_checkpoint(checkpoint, config)
+
+    tasks = []
+    wanted: List[tuple] = []
+    for difficulty in args.difficulties:
+        for speed in args.speeds:
+            for first in range(0, args.games, args.chunk):
+                task = (difficulty, speed, first, min(first + args.chunk, args.games))
+                wanted.append(task)
+                if task not in done:
+                    tasks.append((task, args.seed, args.bot, max_frames, args.dt))
+    total = len(wanted)
+    if total > len(tasks):
+        print(f"контрольная точка {checkpoint}: готово {total - len(tasks)} из {total} пакетов")
+
+    start_time = time.perf_counter()
+    played = frames = 0
+    with open(checkpoint, "a", encoding="utf-8") as log, Pool(args.workers) as pool:
+        for number, (task, results) in enumerate(pool.imap_unordered(run_chunk, tasks), 1):
+            done[task] = results
+            log.write(json.dumps({"task": task, "games": results}) + "\n")
+            log.flush()
+            os.fsync(log.fileno())
+            played += len(results)
+            frames += sum(r.frames for r in results)
+            elapsed = time.perf_counter() - start_time
+            print(f"\r{total - len(tasks) + number}/{total} пакетов, {played / elapsed:,.0f} игр/с, "
+                  f"{frames / elapsed:,.0f} кадров/с", end="", flush=True)
+    elapsed = time.perf_counter() - start_time
+    print()
+
+    # Сводка только по пакетам этого запуска: пакеты прошлого запуска с
+    # другим --games (например, 20-30 при --games 25) в нее не попадают
+    grouped: Dict[Tuple[str, str], List[GameResult]] = {}
+    for task in wanted:
+        grouped.setdefault(task[:2], []).extend(done[task])
+    summary = {key: aggregate(results) for key, results in grouped.items()}
+
+    meta = {"bot": args.bot, "games": args.games, "seed": args.seed, "dt": args.dt,
+            "max_minutes": args.max_minutes, "workers": args.workers,
+            "elapsed_s": elapsed, "games_per_s": played / elapsed if elapsed else 0.0}
+    write_reports(summary, meta, args.out)
+
+    print(f"{'сложность':<10}{'скорость':<11}{'жизнь p50 с':>12}{'уровней':>9}"
+          f"{'очки p50':>10}{'очки p90':>10}{'бонусов':>9}{'поймано':>9}")
+    for (difficulty, speed), stats in summary.items():
+        print(f"{difficulty:<10}{speed:<11}{stats['survival_s_p50']:>12.1f}"
+              f"{stats['levels_cleared_mean']:>9.2f}{stats['score_p50']:>10.0f}"
+              f"{stats['score_p90']:>10.0f}{stats['power_ups_per_game']:>9.2f}"
+              f"{stats['power_up_catch_rate']:>9.0%}")
+    print(f"отчеты: {args.out}.csv, {args.out}.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Кэш отрисованного текста.
+
+Font.render заметно дороже блита готовой поверхности, а большая часть надписей
+в игре (меню, символы бонусов, HUD) из кадра в кадр не меняется. TextCache
+хранит шрифты и готовые поверхности по ключу (шрифт, строка, цвет) с
+вытеснением давно неиспользованных записей (LRU) и счетчиками попаданий.
+"""
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import pygame
+
+Color = Tuple[int, int, int]
+
+
+class TextCache:
+    """LRU-кэш поверхностей с текстом"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._fonts: Dict[Tuple[Optional[str], int], pygame.font.Font] = {}
+        self._surfaces: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.font_loads = 0
+
+    def font(self, name: Optional[str], size: int) -> pygame.font.Font:
+        """Получить шрифт, создав его только при первом обращении"""
+        key = (name, size)
+        font = self._fonts.get(key)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = pygame.font.Font(name, size)
+            self._fonts[key] = font
+            self.font_loads += 1
+        return font
+
+    def render(self, font: pygame.font.Font, text: str, color: Color,
+               antialias: bool = True) -> pygame.Surface:
+        """Поверхность с текстом; повторный запрос берется из кэша"""
+        key = (font, text, color, antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self) -> None:
+        """Очистить кэш поверхностей (шрифты сохраняются)"""
+        self._surfaces.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Счетчики кэша"""
+        return {
+            "entries": len(self._surfaces),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "font_loads": self.font_loads,
+        }
+
+
+# Общий кэш для игры, меню и объектов
+text_cache = TextCache()